@@ -7,9 +7,20 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from .models import User
+from .images import ImageTooLarge, check_dimensions
 
 # ModelForm: forms.ModelForm을 상속, Form: forms.Form을 상속
 
+# 프로필 사진 검증 - 가로/세로 크기 제한 (account/images.py)
+## 이미지 header만 읽어서 확인 -> 큰 이미지를 decode 하지 않는다.
+def clean_profile_img(profile_img):
+    if profile_img and hasattr(profile_img, "content_type"): # 새로 업로드한 파일
+        try:
+            check_dimensions(profile_img)
+        except ImageTooLarge as e:
+            raise forms.ValidationError(str(e))
+    return profile_img
+
 # UserCreationForm 에 정의된 Form필드: username, password1, password2
 # CustomUserCreationForm: UserCreationForm의 form필드 + name, email, birthday
 class CustomUserCreationForm(UserCreationForm): 
@@ -50,6 +61,9 @@ class CustomUserCreationForm(UserCreationForm):
             raise forms.ValidationError("사용자 이름은 두글자 이상 입력하세요.")
         
         return name
+
+    def clean_profile_img(self):
+        return clean_profile_img(self.cleaned_data['profile_img'])
         
 # 회원정보 수정 폼 - ModelForm
 class CustomUserChangeForm(UserChangeForm):
@@ -69,4 +83,7 @@ class CustomUserChangeForm(UserChangeForm):
         if len(name) < 2:
             raise forms.ValidationError("사용자 이름은 두글자 이상 입력하세요.")
         
-        return name
\ No newline at end of file
+        return name
+
+    def clean_profile_img(self):
+        return clean_profile_img(self.cleaned_data['profile_img'])
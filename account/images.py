@@ -0,0 +1,159 @@
+# account/images.py - 프로필 사진 변환본(variant) 생성
+#
+# 업로드한 원본(User.profile_img)을 그대로 보여주면 작은 프로필 사진에도 원본 크기(수 MB)를 전송/decode 한다.
+#  => 고정 크기의 작은 변환본을 만들어서 template에서 사용. (원본은 다운로드 링크로만 사용)
+#
+# 변환본: settings.ACCOUNT_PROFILE_VARIANTS 의 크기(정사각형) x 형식(WebP, JPEG)
+#  - 경로: variants/<원본 경로>.<크기>.<webp|jpg>  (원본 경로로 정해짐 -> 원본이 바뀌면 새 경로)
+#  - 업로드할 때 생성 (account/signals.py) -> User.profile_variants_for 에 원본 경로를 저장
+#  - 원본을 바꾸거나 지우면(회원 탈퇴 포함) 이전 원본의 변환본을 삭제 (account/signals.py)
+#  - 예전에 업로드한 원본 등 변환본이 없으면 처음 요청할 때 생성 (account.views.profile_image)
+#    같은 변환본을 동시에 요청해도 한번만 생성: 프로세스 안에서는 threading.Lock,
+#    프로세스 사이에서는 cache.add() lock -> 다른 요청은 생성이 끝나기를 기다렸다가 결과 파일을 사용.
+#
+# 변환
+#  - 원본 크기 제한: 가로/세로 settings.ACCOUNT_PROFILE_MAX_DIMENSION px 이하 (header만 읽어서 확인 - 가입/수정 폼 검증)
+#  - JPEG은 draft()로 필요한 크기에 가깝게 줄여서 decode (메모리/시간 절약)
+#  - EXIF 회전 정보를 적용한 후 EXIF는 저장하지 않는다. (위치 정보 등 제거)
+
+import hashlib
+import threading
+import time
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpg": ("JPEG", {"quality": 85, "optimize": True})}
+LOCK_TIMEOUT = 30  # 다른 프로세스의 생성을 기다리는 최대 시간(초)
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def variant_sizes():
+    # {이름: 크기(px)}
+    return getattr(settings, "ACCOUNT_PROFILE_VARIANTS", {"small": 64, "medium": 256})
+
+
+def max_dimension():
+    return getattr(settings, "ACCOUNT_PROFILE_MAX_DIMENSION", 6000)
+
+
+def image_version(name):
+    # 원본 경로의 짧은 hash - 변환본 view url에 넣는다. (원본이 바뀌면 url도 바뀐다 -> 오래 cache 가능)
+    return hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def variant_name(name, size_name, ext):
+    # 원본 파일 이름 -> 변환본 파일 이름
+    return str(PurePosixPath("variants") / f"{name}.{variant_sizes()[size_name]}.{ext}")
+
+
+def check_dimensions(file):
+    # 원본 이미지의 가로/세로 확인 (header만 읽는다). 너무 크면 ImageTooLarge
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except (UnidentifiedImageError, OSError):
+        raise ValueError("이미지 파일이 아닙니다.")
+    finally:
+        file.seek(0)
+    if max(width, height) > max_dimension():
+        raise ImageTooLarge(f"이미지는 가로/세로 {max_dimension()}px 이하만 등록할 수 있습니다.")
+    return width, height
+
+
+def _open(file, size):
+    # 원본을 열어서 size x size 이상인 가장 작은 크기로 decode
+    image = Image.open(file)
+    if max(image.size) > max_dimension():
+        raise ImageTooLarge(f"이미지 크기 {image.size} 가 너무 큽니다.")
+    image.draft("RGB", (size, size))  # JPEG: 1/2, 1/4, 1/8 크기로 decode
+    image = ImageOps.exif_transpose(image)  # EXIF 회전 적용
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    return image
+
+
+def render_variant(file, size, ext):
+    # 원본 file -> size x size 변환본 (bytes). 가운데를 기준으로 정사각형으로 자른다.
+    file.seek(0)
+    with _open(file, size) as image:
+        thumb = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    image_format, options = FORMATS[ext]
+    if image_format == "JPEG" and thumb.mode == "RGBA":
+        background = Image.new("RGB", thumb.size, "white")
+        background.paste(thumb, mask=thumb.getchannel("A"))
+        thumb = background
+    output = BytesIO()
+    thumb.save(output, image_format, **options)  # exif를 넘기지 않는다 -> EXIF 제거
+    return output.getvalue()
+
+
+def generate_variants(name, storage=default_storage):
+    # 원본(name)의 모든 변환본을 생성(이미 있으면 건너뛴다). 반환: 생성한 변환본 이름 list
+    created = []
+    with storage.open(name, "rb") as f:
+        original = BytesIO(f.read())
+    for size_name, size in variant_sizes().items():
+        for ext in FORMATS:
+            target = variant_name(name, size_name, ext)
+            if storage.exists(target):
+                continue
+            storage.save(target, ContentFile(render_variant(original, size, ext)))
+            created.append(target)
+    return created
+
+
+def has_variants(name, storage=default_storage):
+    # 원본(name)의 변환본이 모두 있는지
+    return all(storage.exists(variant_name(name, size_name, ext)) for size_name in variant_sizes() for ext in FORMATS)
+
+
+def delete_variants(name, storage=default_storage):
+    for size_name in variant_sizes():
+        for ext in FORMATS:
+            storage.delete(variant_name(name, size_name, ext))
+
+
+def _process_lock(key):
+    with _locks_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def ensure_variant(name, size_name, ext, storage=default_storage):
+    # 변환본이 없으면 생성 (thundering herd 방지). 반환: 변환본 이름
+    target = variant_name(name, size_name, ext)
+    if storage.exists(target):
+        return target
+    with _process_lock(target):
+        if storage.exists(target):
+            return target
+        lock_key = f"account:variant-lock:{target}"
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        # 다른 프로세스가 생성중이면 기다린다. (끝나지 않으면 직접 생성)
+        locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        while not locked and not storage.exists(target) and time.monotonic() < deadline:
+            time.sleep(0.05)
+            locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        try:
+            if not storage.exists(target):
+                with storage.open(name, "rb") as f:
+                    data = render_variant(BytesIO(f.read()), variant_sizes()[size_name], ext)
+                storage.save(target, ContentFile(data))
+        finally:
+            if locked:
+                cache.delete(lock_key)
+    with _locks_lock:
+        _locks.pop(target, None)
+    return target
@@ -0,0 +1,78 @@
+# account/management/commands/bench_profile_images.py
+# python manage.py bench_profile_images [--image 경로] [--width 4000 --height 3000] [--repeat 5]
+#
+# 프로필 사진 원본 vs 변환본(account/images.py) 비교
+#  - 전송 크기(bytes): 원본 파일 / 변환본 파일
+#  - decode 시간: 브라우저가 받은 이미지를 decode 하는 비용 (Pillow Image.load())
+#  - 생성 시간: 원본 -> 변환본 (draft() 로 줄여서 decode 하는 경우)
+#  --image 를 주지 않으면 사진 같은(잡음 + 그라데이션) JPEG을 만들어서 사용. (EXIF 포함)
+
+import statistics
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from account.images import FORMATS, render_variant, variant_sizes
+
+
+def sample_image(width, height):
+    # 잡음 + 그라데이션 JPEG (휴대폰 사진 정도의 압축률)
+    noise = Image.effect_noise((width, height), 40).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    image = Image.blend(noise, gradient, 0.5)
+    exif = Image.Exif()
+    exif[0x0112] = 6        # Orientation: 90도 회전
+    exif[0x010F] = "bench"  # Make
+    output = BytesIO()
+    image.save(output, "JPEG", quality=90, exif=exif)
+    return output.getvalue()
+
+
+def timed(func, repeat):
+    # 실행 시간(ms)의 중앙값
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def decode(data):
+    with Image.open(BytesIO(data)) as image:
+        image.load()
+
+
+class Command(BaseCommand):
+    help = "프로필 사진 원본과 변환본의 전송 크기, decode 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--image", help="원본 이미지 경로 (없으면 만들어서 사용)")
+        parser.add_argument("--width", type=int, default=4000)
+        parser.add_argument("--height", type=int, default=3000)
+        parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (중앙값)")
+
+    def handle(self, *args, **options):
+        if options["image"]:
+            with open(options["image"], "rb") as f:
+                original = f.read()
+        else:
+            original = sample_image(options["width"], options["height"])
+        repeat = options["repeat"]
+        with Image.open(BytesIO(original)) as image:
+            size = image.size
+
+        decode_ms = timed(lambda: decode(original), repeat)
+        self.stdout.write(f"원본 {size[0]}x{size[1]}: {len(original):,} bytes, decode {decode_ms:.1f}ms")
+        for size_name, pixels in variant_sizes().items():
+            for ext in FORMATS:
+                data = render_variant(BytesIO(original), pixels, ext)
+                render_ms = timed(lambda: render_variant(BytesIO(original), pixels, ext), repeat)
+                decode_variant_ms = timed(lambda: decode(data), repeat)
+                self.stdout.write(
+                    f"{size_name}({pixels}px).{ext}: {len(data):,} bytes "
+                    f"({len(data) / len(original):.2%}), decode {decode_variant_ms:.2f}ms, "
+                    f"생성 {render_ms:.1f}ms"
+                )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_user_profile_img_alter_user_email_alter_user_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_variants_for',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+    ]
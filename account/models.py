@@ -1,6 +1,7 @@
 # account/models.py
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.urls import reverse
 
 # User 모델 등록
 ## AbstractUser를 상속받아서 확장 User모델로 정의
@@ -25,11 +26,44 @@ class User(AbstractUser):
         null=True,
         blank=True
     )
+    # 변환본(account/images.py)이 모두 생성된 원본 경로 - profile_img와 같으면 변환본 파일이 있다.
+    #  (page 마다 storage.exists()로 확인하지 않는다. account/signals.py, account.views.profile_image 에서 저장)
+    profile_variants_for = models.CharField(max_length=100, blank=True, editable=False)
     
     # 모델이 변경 -> python manage.py makemigrations -> migrate
     def __str__(self):
         return f"{self.username} - {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # 조회한 시점의 profile_img 경로 - 변경/삭제하면 이전 변환본을 지운다. (account/signals.py)
+        instance = super().from_db(db, field_names, values)
+        loaded = instance.__dict__.get("profile_img")
+        instance._loaded_profile_img = getattr(loaded, "name", loaded) or ""
+        return instance
+
+    def profile_variant_url(self, size_name, ext):
+        # 프로필 사진 변환본의 url (account/images.py)
+        #  - 변환본이 모두 생성되었으면(profile_variants_for) MEDIA_URL 경로
+        #  - 아니면 처음 요청할 때 생성해서 응답하는 view (account:profile_image - url에 원본 경로의 hash)
+        from .images import image_version, variant_name
+        if self.profile_variants_for and self.profile_variants_for == self.profile_img.name:
+            return self.profile_img.storage.url(variant_name(self.profile_img.name, size_name, ext))
+        return reverse("account:profile_image",
+                       args=[self.pk, image_version(self.profile_img.name), size_name, ext])
+
+    @property
+    def profile_variants(self):
+        # template용 {"small": JPEG url, "small_webp": WebP url, "medium": .., "medium_webp": ..}
+        from .images import variant_sizes
+        if not self.profile_img:
+            return {}
+        urls = {}
+        for size_name in variant_sizes():
+            urls[size_name] = self.profile_variant_url(size_name, "jpg")
+            urls[f"{size_name}_webp"] = self.profile_variant_url(size_name, "webp")
+        return urls
+
 # settings.py에 사용자 정의 User 모델 등록
 # database 삭제 (db.sqlite3 파일)
 # python manage.py makemigrations
@@ -0,0 +1,62 @@
+# account/signals.py - 모델 signal 처리
+#  - AccountConfig.ready() 에서 import 해서 등록.
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .images import delete_variants, generate_variants
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+def mark_variants_ready(user_id, name):
+    # 변환본이 모두 생성됨 -> 이후 template은 storage.exists() 없이 MEDIA_URL 경로를 사용 (User.profile_variant_url)
+    #  - 그 사이에 원본이 바뀌었으면 저장하지 않는다.
+    User.objects.filter(pk=user_id, profile_img=name).update(profile_variants_for=name)
+
+
+def _delete_variants_on_commit(name):
+    def delete():
+        try:
+            delete_variants(name)
+        except OSError:
+            logger.exception("프로필 사진 변환본 삭제 실패: %s", name)
+    transaction.on_commit(delete)
+
+
+# 프로필 사진을 업로드하면 변환본(thumbnail/WebP)을 생성 (account/images.py)
+#  - commit 된 후에 생성. 로그인(last_login만 UPDATE) 등 profile_img를 저장하지 않는 경우는 제외.
+#  - 생성에 실패하면 처음 요청할 때 다시 생성한다. (account.views.profile_image)
+#  - 원본을 바꾸거나 지우면 이전 원본의 변환본을 삭제 (User.from_db 에서 조회 시점의 경로를 기억)
+@receiver(post_save, sender=User)
+def create_profile_variants(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "profile_img" not in update_fields:
+        return
+    name = instance.profile_img.name if instance.profile_img else ""
+    previous = getattr(instance, "_loaded_profile_img", "")
+    instance._loaded_profile_img = name
+    if previous and previous != name:
+        _delete_variants_on_commit(previous)
+    if not name:
+        return
+    user_id = instance.pk
+
+    def generate():
+        try:
+            generate_variants(name)
+        except (OSError, ValueError):
+            logger.exception("프로필 사진 변환본 생성 실패: %s", name)
+        else:
+            mark_variants_ready(user_id, name)
+    transaction.on_commit(generate)
+
+
+# 회원 탈퇴 -> 변환본 삭제
+@receiver(post_delete, sender=User)
+def delete_profile_variants(sender, instance, **kwargs):
+    if instance.profile_img:
+        _delete_variants_on_commit(instance.profile_img.name)
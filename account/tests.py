@@ -1,3 +1,132 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .images import image_version, render_variant, variant_name
+from .models import User
 
 # Create your tests here.
+
+# python manage.py test account
+
+
+def make_jpeg(width, height, orientation=None):
+    image = Image.new("RGB", (width, height), "red")
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    exif[0x010F] = "camera"
+    output = BytesIO()
+    image.save(output, "JPEG", exif=exif)
+    return output.getvalue()
+
+
+class ProfileImageTest(TestCase):
+    # 프로필 사진 변환본 (account/images.py)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user("profile", password="pw", name="홍길동")
+        self.client.force_login(self.user)
+
+    def upload(self, data):
+        return self.client.post(reverse("account:update"), {
+            "name": "홍길동", "email": "a@a.com",
+            "profile_img": SimpleUploadedFile("photo.jpg", data, content_type="image/jpeg"),
+        })
+
+    def test_render_variant(self):
+        # EXIF 회전 적용 후 정사각형으로 자르고, EXIF는 저장하지 않는다.
+        data = render_variant(BytesIO(make_jpeg(300, 100, orientation=6)), 64, "webp")
+        with Image.open(BytesIO(data)) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (64, 64)))
+            self.assertFalse(image.getexif())
+
+    def test_upload_creates_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(make_jpeg(800, 600))
+        self.user.refresh_from_db()
+        for size_name in ("small", "medium"):
+            for ext in ("webp", "jpg"):
+                self.assertTrue(default_storage.exists(variant_name(self.user.profile_img.name, size_name, ext)))
+        response = self.client.get(reverse("account:detail"))
+        self.assertContains(response, self.user.profile_variants["medium_webp"])
+        self.assertNotContains(response, f'<img src="{self.user.profile_img.url}"')
+
+    def test_lazy_variant(self):
+        # 변환본이 없으면 처음 요청할 때 생성
+        self.upload(make_jpeg(800, 600)) # on_commit 미실행 -> 변환본 없음
+        self.user.refresh_from_db()
+        url = self.user.profile_variants["small_webp"]
+        self.assertEqual(url, reverse("account:profile_image",
+                                      args=[self.user.pk, image_version(self.user.profile_img.name), "small", "webp"]))
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        for variant_url in self.user.profile_variants.values():
+            self.client.get(variant_url)
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.profile_variants["small_webp"], url) # 모두 생성된 후에는 MEDIA_URL 경로
+
+    def test_lazy_url_changes_with_image(self):
+        # 변환본 view는 오래 cache -> 사진을 바꾸면 url도 바뀌고, 이전 url은 현재 사진으로 redirect
+        self.upload(make_jpeg(800, 600))
+        self.user.refresh_from_db()
+        old_url = self.user.profile_variants["small_webp"]
+        self.assertIn("max-age=2592000", self.client.get(old_url)["Cache-Control"])
+        self.upload(make_jpeg(400, 300))
+        self.user.refresh_from_db()
+        new_url = self.user.profile_variants["small_webp"]
+        self.assertNotEqual(new_url, old_url)
+        response = self.client.get(old_url)
+        self.assertRedirects(response, new_url, fetch_redirect_response=False)
+        self.assertFalse(response.has_header("Cache-Control"))
+
+    def test_variants_without_storage_lookup(self):
+        # 변환본이 생성된 후에는 page 마다 storage.exists()를 호출하지 않는다.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(make_jpeg(800, 600))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_variants_for, self.user.profile_img.name)
+        with mock.patch.object(default_storage, "exists") as exists:
+            urls = self.user.profile_variants
+        exists.assert_not_called()
+        self.assertEqual(urls["small"], default_storage.url(variant_name(self.user.profile_img.name, "small", "jpg")))
+
+    def test_replace_and_clear_delete_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(make_jpeg(800, 600))
+        self.user.refresh_from_db()
+        first = self.user.profile_img.name
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(make_jpeg(400, 300))
+        self.user.refresh_from_db()
+        second = self.user.profile_img.name
+        self.assertNotEqual(first, second)
+        self.assertFalse(default_storage.exists(variant_name(first, "small", "webp")))
+        self.assertTrue(default_storage.exists(variant_name(second, "small", "webp")))
+        # 사진 삭제(clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("account:update"), {
+                "name": "홍길동", "email": "a@a.com", "profile_img-clear": "on",
+            })
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_img)
+        self.assertFalse(default_storage.exists(variant_name(second, "small", "webp")))
+
+    @override_settings(ACCOUNT_PROFILE_MAX_DIMENSION=500)
+    def test_too_large(self):
+        response = self.upload(make_jpeg(800, 600))
+        self.assertContains(response, "500px 이하만")
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_img)
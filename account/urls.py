@@ -14,5 +14,6 @@ urlpatterns = [
     path("password_change", views.password_change, name="password_change"),
     path("update", views.user_update, name="update"),
     path('delete', views.user_delete, name="delete"),
+    path("profile_img/<int:user_id>/<str:version>/<str:size_name>.<str:ext>", views.profile_image, name="profile_image"),
 
 ]
\ No newline at end of file
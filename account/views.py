@@ -1,6 +1,8 @@
 # account/views.py
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
 from django.contrib.auth.forms import (
     AuthenticationForm, # 로그인 폼
     PasswordChangeForm  # 비밀번호 변경 폼
@@ -15,6 +17,9 @@ from django.contrib.auth import (
 from django.contrib.auth.decorators import login_required 
 
 from .forms import CustomUserCreationForm, CustomUserChangeForm
+from .images import FORMATS, ImageTooLarge, ensure_variant, has_variants, image_version, variant_sizes
+from .models import User
+from .signals import mark_variants_ready
 
 
 #######################################
@@ -180,6 +185,36 @@ def user_delete(request):
     logout(request)
     return redirect(reverse("home"))
 
+########################################
+# 프로필 사진 변환본 (account/images.py)
+#  요청 url: /account/profile_img/<user_id>/<원본 경로의 hash>/<크기 이름>.<webp|jpg>
+#  view함수: profile_image
+#  응답: 변환본 이미지 파일
+#  - 변환본이 없을 때만 사용하는 url (User.profile_variant_url) -> 처음 요청할 때 생성.
+#    (생성 후에는 MEDIA_URL 경로로 바로 요청)
+#  - 원본이 바뀌면 hash가 바뀐다 -> 이전 url은 현재 사진의 url로 redirect (cache 하지 않음)
+def profile_image(request, user_id, version, size_name, ext):
+    if size_name not in variant_sizes() or ext not in FORMATS:
+        raise Http404("변환본이 없습니다.")
+    user = get_object_or_404(User.objects.only("profile_img", "profile_variants_for"), pk=user_id)
+    if not user.profile_img:
+        raise Http404("프로필 사진이 없습니다.")
+    if version != image_version(user.profile_img.name):
+        return redirect(user.profile_variant_url(size_name, ext))
+    try:
+        name = ensure_variant(user.profile_img.name, size_name, ext)
+    except (OSError, ValueError, ImageTooLarge):
+        # 원본 파일이 없거나 변환할 수 없는 이미지
+        raise Http404("프로필 사진을 변환할 수 없습니다.")
+    if user.profile_variants_for != user.profile_img.name and has_variants(user.profile_img.name):
+        # 모든 변환본이 생성됨 -> 이후에는 MEDIA_URL 경로로 요청
+        mark_variants_ready(user.pk, user.profile_img.name)
+    response = FileResponse(user.profile_img.storage.open(name, "rb"),
+                            content_type="image/webp" if ext == "webp" else "image/jpeg")
+    # 원본이 바뀌면 url(원본 경로의 hash)도 바뀐다 -> 오래 cache
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 30)
+    return response
+
 # 일반데이터를 삭제하는 경우(제품, 게시판글 삭제...)
 # 1. 삭제할 데이터의 PK값을 요청파라미터/Path 파라미터로 받는다.
 # 2. Model이용해서 삭제할 데이터를 조회(1의 PK을 이용해서)
@@ -0,0 +1,28 @@
+# config/apps.py - 프로젝트 공통 app
+#  - 특정 app에 속하지 않는 management 명령 (config/management/commands/collectstatic.py)
+#  - settings.INSTALLED_APPS 에서 django.contrib.staticfiles 보다 앞에 있어야 한다. (system check)
+
+from django.apps import AppConfig, apps
+from django.core import checks
+
+
+def check_app_order(app_configs, **kwargs):
+    # 같은 이름의 명령은 INSTALLED_APPS 에서 앞에 있는 app의 것이 사용된다.
+    #  -> config가 staticfiles 뒤에 있으면 증분 collectstatic 대신 기본 collectstatic이 실행된다.
+    names = [app_config.name for app_config in apps.get_app_configs()]
+    if "django.contrib.staticfiles" in names and names.index("config") > names.index("django.contrib.staticfiles"):
+        return [checks.Error(
+            "'config' 는 INSTALLED_APPS 에서 'django.contrib.staticfiles' 보다 앞에 있어야 합니다.",
+            hint="config/management/commands/collectstatic.py 가 staticfiles의 collectstatic을 대신합니다.",
+            obj="config",
+            id="config.E001",
+        )]
+    return []
+
+
+class ConfigConfig(AppConfig):
+    name = 'config'
+    verbose_name = "프로젝트 설정"
+
+    def ready(self):
+        checks.register(check_app_order)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# ASGI 서버에서는 읽기 View들을 async View로 실행 (polls/urls.py)
+os.environ.setdefault('POLLS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
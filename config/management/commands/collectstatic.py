@@ -0,0 +1,46 @@
+# config/management/commands/collectstatic.py
+# python manage.py collectstatic
+#  - django.contrib.staticfiles 의 collectstatic + 증분 복사
+#    기본 collectstatic은 수정일시로 변경 여부를 판단 -> git checkout 등으로 수정일시만 바뀌어도 다시 복사.
+#    => STATIC_ROOT에 있는 파일과 내용(hash)이 같으면 건너뛰고, 다르면 수정일시와 상관없이 다시 복사.
+#  - hash 이름 사본/압축본 생성은 config/static_assets.py (CompressedManifestStaticFilesStorage)
+#  - 같은 이름의 명령은 settings.INSTALLED_APPS 에서 앞에 있는 app의 것이 사용된다.
+#    => config가 django.contrib.staticfiles 보다 앞에 있어야 한다. (순서가 바뀌면 system check 오류 - config/apps.py)
+
+import hashlib
+
+from django.contrib.staticfiles.management.commands import collectstatic
+
+
+def file_hash(storage, name):
+    digest = hashlib.md5(usedforsecurity=False)
+    with storage.open(name) as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class Command(collectstatic.Command):
+    help = "static 파일들을 STATIC_ROOT에 모읍니다. (내용이 같은 파일은 건너뜀)"
+
+    def delete_file(self, path, prefixed_path, source_storage):
+        if not self.symlink and self.storage.exists(prefixed_path):
+            try:
+                same = (self.storage.size(prefixed_path) == source_storage.size(path)
+                        and file_hash(self.storage, prefixed_path) == file_hash(source_storage, path))
+            except (OSError, NotImplementedError):
+                # 내용을 비교할 수 없는 storage -> 기본 동작(수정일시 비교)
+                return super().delete_file(path, prefixed_path, source_storage)
+            if same:
+                if prefixed_path not in self.unmodified_files:
+                    self.unmodified_files.append(prefixed_path)
+                self.log("Skipping '%s' (내용 동일)" % path)
+                return False
+            # 내용이 다르면 수정일시와 상관없이 다시 복사
+            if self.dry_run:
+                self.log("Pretending to delete '%s'" % path)
+            else:
+                self.log("Deleting '%s'" % path)
+                self.storage.delete(prefixed_path)
+            return True
+        return super().delete_file(path, prefixed_path, source_storage)
@@ -0,0 +1,164 @@
+# config/media.py - 업로드 파일(MEDIA) 응답 view
+#
+# django.conf.urls.static.static() 은 DEBUG에서만 동작하고, Range/검증값(ETag)/cache header가 없다.
+# => 운영에서도 사용할 수 있는 media 응답 view (config/urls.py 에서 MEDIA_URL 에 연결)
+#  - FileResponse로 파일을 나눠서 전송. WSGI 서버가 wsgi.file_wrapper(sendfile)를 지원하면 zero-copy 전송.
+#  - 검증값: ETag("크기-수정시각"), Last-Modified -> If-None-Match/If-Modified-Since 이면 304
+#  - Range: "bytes=시작-끝" 하나의 구간 -> 206 (If-Range가 맞지 않으면 전체). 범위 밖이면 416
+#  - Cache-Control
+#     - 파일 이름에 내용 hash가 있는 파일(settings.MEDIA_IMMUTABLE_PATTERN): 1년 + immutable
+#     - 나머지: settings.MEDIA_CACHE_MAX_AGE 초
+#  - settings.MEDIA_ACCEL_REDIRECT (ex "/protected-media/") 를 설정하면
+#    파일 전송은 nginx에 넘긴다. (X-Accel-Redirect header - nginx의 internal location에 MEDIA_ROOT 설정)
+
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    # 파일의 [start, start + length) 구간만 읽는 file 객체 (FileResponse 용)
+    #  - fileno(): sendfile을 지원하는 WSGI 서버는 현재 위치(start)부터 Content-Length 만큼 전송
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    # Range header -> (start, end) (end 포함). 하나의 구간만 지원 -> 그 외는 None (전체 응답)
+    # 범위를 만족할 수 없으면 ValueError
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if size == 0:
+        # 빈 파일에는 만족할 수 있는 구간이 없다. (bytes=-N 도 416)
+        raise ValueError("빈 파일")
+    if first == "":
+        # bytes=-500 : 마지막 500 bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("빈 구간")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("범위 밖의 구간")
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    # If-Range 가 없거나 현재 파일의 검증값과 같으면 True (Range 적용)
+    if_range = request.headers.get("If-Range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def is_immutable(path):
+    # 파일 이름에 내용 hash가 있는지 여부 (내용이 바뀌면 이름도 바뀐다)
+    return re.search(getattr(settings, "MEDIA_IMMUTABLE_PATTERN", r"\.[0-9a-f]{12}\.[^/.]+$"), path) is not None
+
+
+def file_response(request, fullpath, immutable=False, max_age=None, content_type=None, encoding=None,
+                  accel_path=None):
+    # fullpath 파일의 응답 (조건부 요청, Range, Cache-Control). static 파일 응답에서도 사용 (config/static_assets.py)
+    #  - immutable: 1년 + immutable, 아니면 max_age 초 (없으면 settings.MEDIA_CACHE_MAX_AGE)
+    #  - content_type/encoding: 없으면 파일 이름으로 추측
+    #  - accel_path: 있으면 전송은 nginx에 넘긴다. (X-Accel-Redirect)
+    try:
+        st = os.stat(fullpath)
+    except (OSError, ValueError):
+        raise Http404("파일이 없습니다.")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("파일이 없습니다.")
+
+    size = st.st_size
+    last_modified = int(st.st_mtime)
+    etag = f'"{size:x}-{st.st_mtime_ns:x}"'
+    if content_type is None:
+        content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or "application/octet-stream"
+
+    # 1. 조건부 요청: 바뀌지 않았으면 304 (파일을 열지 않는다)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if accel_path:
+            # 2-1. 전송은 nginx가 처리 (Range 포함)
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = accel_path
+        else:
+            # 2-2. Range 요청이면 해당 구간만 전송
+            byte_range = None
+            range_header = request.headers.get("Range")
+            if range_header and _if_range_matches(request, etag, last_modified):
+                try:
+                    byte_range = parse_range(range_header, size)
+                except ValueError:
+                    response = HttpResponse(status=416)
+                    response["Content-Range"] = f"bytes */{size}"
+                    return response
+            file = open(fullpath, "rb")
+            if byte_range is None:
+                response = FileResponse(file, content_type=content_type)
+            else:
+                start, end = byte_range
+                response = FileResponse(RangeFile(file, start, end - start + 1), content_type=content_type,
+                                        status=206)
+                response["Content-Length"] = end - start + 1
+                response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Accept-Ranges"] = "bytes"
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    if immutable:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        if max_age is None:
+            max_age = getattr(settings, "MEDIA_CACHE_MAX_AGE", 3600)
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404("파일이 없습니다.")
+    accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT", None)
+    # X-Accel-Redirect 는 percent-encoding (한글 등 latin-1이 아닌 이름은 Django가 =?utf-8?b?..?= 로 바꿔서 nginx가 찾지 못한다)
+    return file_response(request, fullpath, immutable=is_immutable(path),
+                         accel_path=accel_prefix.rstrip("/") + "/" + quote(path) if accel_prefix else None)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +42,9 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # 프로젝트 공통 app (config/apps.py) - collectstatic 명령 재정의(config/management/commands/collectstatic.py)
+    #  같은 이름의 명령은 앞에 있는 app의 것이 사용된다 -> 반드시 django.contrib.staticfiles 보다 앞 (system check로 확인)
+    'config',
     'django.contrib.staticfiles',
     'polls',
     'account',
@@ -47,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'polls.routers.ReplicaRoutingMiddleware', # 요청별 primary/replica DB 선택 (polls/routers.py)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,10 +88,89 @@ WSGI_APPLICATION = 'config.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get("POLLS_DB_NAME", BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# SQLite 운영 설정 (환경변수 POLLS_SQLITE_PROFILE=production 으로 실행할 때만 사용. 설정하지 않으면 Django 기본 설정)
+## 운영 서버에서 선택 (개발/테스트 환경의 DB 파일을 WAL 모드로 바꾸지 않도록 기본값은 Django 기본 설정)
+## - WAL 모드: 읽기와 쓰기가 서로 기다리지 않는다. synchronous=NORMAL: commit마다 fsync 하지 않음(WAL과 함께 사용)
+## - mmap_size/cache_size: DB 파일을 memory map(256MB), page cache 64MB
+## - timeout(busy timeout): 다른 connection이 lock을 가지고 있으면 바로 "database is locked" 오류 대신 최대 20초 대기
+## - transaction_mode IMMEDIATE: transaction(atomic) 시작시 쓰기 lock을 잡는다.
+##     (DEFERRED는 읽기 lock -> 쓰기 lock 으로 올릴때 다른 쓰기와 deadlock 이 되면 busy timeout 없이 바로 실패)
+## - CONN_MAX_AGE: 요청마다 connection을 새로 만들지 않고 재사용, CONN_HEALTH_CHECKS: 재사용 전에 connection 확인
+SQLITE_PRODUCTION_OPTIONS = {
+    "init_command": (
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA mmap_size=268435456;"
+        "PRAGMA cache_size=-65536;"
+        "PRAGMA temp_store=MEMORY;"
+    ),
+    "timeout": 20,
+    "transaction_mode": "IMMEDIATE",
+}
+if os.environ.get("POLLS_SQLITE_PROFILE", "default") == "production":
+    DATABASES['default'].update({
+        'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# 읽기 전용 replica DB (polls/routers.py)
+## 환경변수 POLLS_DB_REPLICA에 SQLite 파일 경로를 설정하면 "replica" alias를 추가.
+##  - primary와 같은 파일: 별도 connection으로 조회 (WAL 모드 권장)
+##  - 다른 파일: python manage.py sync_replica 로 primary를 복사
+## 조회만 하는 connection -> 쓰기 설정(WAL/synchronous, transaction_mode IMMEDIATE) 없이 읽기 설정만 사용
+##  - query_only: 실수로 쓰기를 하면 오류 (쓰기는 router가 primary로 보낸다)
+SQLITE_REPLICA_OPTIONS = {
+    "init_command": (
+        "PRAGMA query_only=ON;"
+        "PRAGMA mmap_size=268435456;"
+        "PRAGMA cache_size=-65536;"
+        "PRAGMA temp_store=MEMORY;"
+    ),
+    "timeout": 20,
+}
+if os.environ.get("POLLS_DB_REPLICA"):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ["POLLS_DB_REPLICA"],
+        'OPTIONS': SQLITE_REPLICA_OPTIONS,
+        'CONN_MAX_AGE': DATABASES['default'].get('CONN_MAX_AGE', 0),
+        'CONN_HEALTH_CHECKS': DATABASES['default'].get('CONN_HEALTH_CHECKS', False),
+        'TEST': {'MIRROR': 'default'}, # 테스트시 default DB를 같이 사용
+    }
+
+# Question/Choice 조회를 replica로, 쓰기는 primary로 보내는 router
+DATABASE_ROUTERS = ["polls.routers.PrimaryReplicaRouter"]
+# 투표후 redirect된 결과 페이지 등에서 자신이 쓴 데이터가 보이도록 primary를 사용할 시간(초)
+POLLS_REPLICA_STICKY_SECONDS = 10
+
+# Cache - 여러 프로세스(worker, flush_votes 명령 ..)가 같이 사용하는 cache
+## 페이지 cache의 version, 질문/보기 정보 cache는 모든 프로세스가 같은 값을 봐야 한다. (한 프로세스의 변경 -> 모두 무효화)
+## (기본값 LocMemCache는 프로세스마다 따로 -> 다른 프로세스의 무효화가 보이지 않는다)
+##  - 환경변수 POLLS_REDIS_URL (ex "redis://127.0.0.1:6379/0") 설정: Redis (여러 서버가 같이 사용, pip install redis)
+##  - 설정하지 않으면: 파일 cache (BASE_DIR/cache - 같은 서버의 프로세스들이 같이 사용)
+if os.environ.get("POLLS_REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ["POLLS_REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+# python manage.py test 는 임시 디렉토리의 cache를 사용 (실제 cache를 지우지 않도록 - config/test_runner.py)
+TEST_RUNNER = 'config.test_runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,6 +213,14 @@ STATICFILES_DIRS = [BASE_DIR / 'staticfiles'] #/static/imgs/survey.jpg
 
 STATIC_ROOT = BASE_DIR / 'statics'
 # python manage.py collectstatic  실행하면 모든 static 파일들을 STATIC_ROOT 경로에 모아준다.
+## 파일 이름에 내용 hash를 붙인 사본 + 압축본(.gz, .br) 생성, staticfiles.json (config/static_assets.py)
+## DEBUG=False 이면 {% static %} 이 staticfiles.json 을 사용 -> 배포 전에 collectstatic 실행
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "config.static_assets.CompressedManifestStaticFilesStorage"},
+}
+STATIC_BROTLI = True       # brotli 모듈이 설치되어 있으면 .br 압축본도 생성 (pip install brotli)
+STATIC_CACHE_MAX_AGE = 60  # hash 이름이 아닌 static 파일의 브라우저 cache 시간(초) (hash 이름: 1년 + immutable)
 
 
 # Default primary key field type
@@ -156,4 +249,127 @@ MEDIA_ROOT = BASE_DIR / "media"
 # Client가 업로드된 파일을 요청할 때 사용할 (시작)url 설정
 MEDIA_URL = "/media/"
 
-# "/media/xxxxx" url로 요청하면 MEDIA_ROOT 경로에서 찾아서 응답.
\ No newline at end of file
+# "/media/xxxxx" url로 요청하면 MEDIA_ROOT 경로에서 찾아서 응답. (config/media.py)
+MEDIA_CACHE_MAX_AGE = 3600                           # 브라우저 cache 시간(초)
+MEDIA_IMMUTABLE_PATTERN = r"\.[0-9a-f]{12}\.[^/.]+$"  # 내용 hash가 이름에 있는 파일 -> 1년 + immutable
+# nginx에 파일 전송을 넘기는 경우 internal location 경로 (None: Django가 전송)
+##  location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+MEDIA_ACCEL_REDIRECT = None
+
+# 프로필 사진 변환본 (account/images.py) - MEDIA_ROOT/variants 에 저장
+ACCOUNT_PROFILE_VARIANTS = {"small": 64, "medium": 256}  # {이름: 정사각형 크기(px)} x WebP/JPEG
+ACCOUNT_PROFILE_MAX_DIMENSION = 6000                     # 업로드 이미지의 최대 가로/세로(px)
+
+############################################
+# 투표수 카운터 설정 (polls/counters.py)
+############################################
+# 1: Choice.votes 컬럼을 원자적으로 증가 (UPDATE ... SET votes = votes + 1)
+# N(2 이상): Choice당 N개의 샤드 카운터 row에 나눠서 증가 -> 인기 설문의 row lock 경합 분산.
+#            읽을 때 합산(Choice.vote_count). python manage.py fold_vote_shards 로 votes에 합친다.
+POLLS_VOTE_SHARDS = 1
+
+
+############################################
+# 투표 처리 방식 (polls/vote_buffer.py)
+############################################
+# "sync": 투표 요청마다 DB UPDATE
+# "buffered": 투표를 로컬 로그 파일에 기록하고 바로 응답. flusher가 모아서 DB에 반영.
+POLLS_VOTE_INGEST = "sync"
+POLLS_VOTE_LOG_DIR = BASE_DIR / "vote_log"   # 로그 파일 디렉토리
+POLLS_VOTE_LOG_FSYNC_EVERY = 64              # fsync 할 기록 수
+POLLS_VOTE_LOG_FSYNC_INTERVAL = 0.2          # fsync 할 시간 간격(초)
+POLLS_VOTE_LOG_ROTATE_BYTES = 1024 * 1024    # active 로그 파일을 봉인(segment)하는 크기
+POLLS_VOTE_LOG_ROTATE_SECONDS = 5.0          # active 로그 파일을 봉인하는 시간(초) - flush_votes 명령은 봉인된 파일만 반영
+POLLS_VOTE_FLUSHER_THREAD = True             # 서버 프로세스 안에서 flusher thread 실행 여부 (False: flush_votes --loop 실행)
+POLLS_VOTE_FLUSH_INTERVAL = 1.0              # flusher thread 반영 주기(초)
+POLLS_VOTE_SEGMENT_RETENTION = timedelta(hours=1)  # 반영한 segment 기록(VoteLogSegment) 보관 기간
+# vote_result의 투표수
+# "flushed": DB에 반영된 투표수, "merged": 로그에 있는 미반영 투표수까지 합산.
+POLLS_RESULT_READ = "flushed"
+
+
+############################################
+# 설문 목록 paging 방식 (polls/pagination.py)
+############################################
+# "cursor": keyset paging - pk 기준으로 바로 찾아간다. 페이지 깊이와 관계없이 비용 일정, COUNT(*) 없음.
+# "offset": Paginator 이용 - 페이지마다 COUNT(*) + OFFSET 조회.
+POLLS_LIST_PAGINATION = "cursor"
+
+
+############################################
+# 목록 전체 개수 cache (polls/counts.py)
+############################################
+POLLS_COUNT_CACHE_TIMEOUT = 300            # cache 유지 시간(초)
+POLLS_COUNT_ESTIMATE_THRESHOLD = 100_000   # 이 개수 이상이면 COUNT(*) 대신 DB 통계의 추정 개수 사용
+
+
+############################################
+# JSON API (polls/views.py api_*)
+############################################
+POLLS_API_LIST_MAX_AGE = 30  # 질문 목록 응답의 Cache-Control max-age(초)
+
+
+############################################
+# 투표 결과 실시간 전송 (polls/live.py)
+############################################
+POLLS_LIVE_INTERVAL = 0.5  # 결과 전송 최소 간격(초). 그 사이의 투표들은 한번의 전송으로 합쳐진다.
+
+
+############################################
+# async View 사용 여부 (polls/urls.py)
+############################################
+# True: 목록/설문폼/결과 View를 async View로 실행. config/asgi.py 가 환경변수 POLLS_ASYNC_VIEWS=1 을 설정.
+POLLS_ASYNC_VIEWS = os.environ.get("POLLS_ASYNC_VIEWS", "0") == "1"
+
+
+############################################
+# 페이지 cache (polls/page_cache.py)
+############################################
+# 로그인 안한 사용자: 목록/설문폼/결과 페이지 전체, 로그인 사용자: 질문목록/보기/결과 부분(fragment)을 cache.
+# 설문 등록/수정, 투표가 있으면 해당 페이지의 version을 증가시켜서 무효화 -> 유지 시간은 메모리 정리용.
+# 공유 cache(CACHES)가 아니면(LocMemCache, DummyCache) 사용하지 않는다. (다른 프로세스의 무효화가 보이지 않으므로)
+POLLS_PAGE_CACHE = True
+POLLS_PAGE_CACHE_TIMEOUT = 3600  # cache 유지 시간(초)
+
+
+############################################
+# 질문/보기 정보 cache (polls/metadata.py)
+############################################
+# 질문 내용/보기 문장: 프로세스 LRU cache -> 공유 cache(CACHES) -> DB 순으로 조회. 투표수는 매번 DB 조회.
+POLLS_METADATA_LRU_SIZE = 512        # 프로세스 cache에 저장할 최대 질문 수
+POLLS_METADATA_CACHE_TIMEOUT = 3600  # 공유 cache 유지 시간(초)
+POLLS_METADATA_VERSION_TTL = 1.0     # 질문 version을 프로세스 안에서 재사용하는 시간(초) - 다른 프로세스의 수정은 이만큼 늦게 보인다 (0: 매번 조회)
+
+
+############################################
+# 인기 급상승 설문 순위 (polls/trending.py)
+############################################
+# 투표 한건 = 1점, 반감기마다 점수가 절반으로 감소. 메모리에서 순위를 유지하고 주기적으로 DB에 저장.
+POLLS_TRENDING_HALF_LIFE = 3600          # 점수 반감기(초)
+POLLS_TRENDING_CAPACITY = 10000          # 메모리에 유지할 최대 질문 수
+POLLS_TRENDING_SNAPSHOT_THREAD = True    # 서버 프로세스 안에서 snapshot thread 실행 여부
+POLLS_TRENDING_SNAPSHOT_INTERVAL = 60    # DB 저장 주기(초)
+POLLS_TRENDING_MIN_SCORE = 0.01          # 이 점수보다 작아진 질문은 DB에서 삭제
+
+
+############################################
+# 시간대별 투표수 집계 (polls/rollups.py)
+############################################
+# 분 단위로 기록 -> 보관 기간이 지나면 시간 단위, 일 단위로 합친다. (python manage.py compact_rollups)
+POLLS_ROLLUP_MINUTE_RETENTION = timedelta(days=1)    # 분 단위 보관 기간
+POLLS_ROLLUP_HOUR_RETENTION = timedelta(days=30)     # 시간 단위 보관 기간
+POLLS_ROLLUP_DAY_RETENTION = None                    # 일 단위 보관 기간 (None: 계속 보관)
+
+
+############################################
+# 투표한 질문 쿠키 (polls/voted_cookie.py)
+############################################
+# 투표한 질문 ID를 서명된 bitset으로 저장. 크기를 넘으면 ID가 작은(오래된) 질문부터 제외 -> Vote 테이블로 확인.
+POLLS_VOTED_COOKIE_MAX_BYTES = 512   # bitmap 최대 크기(byte) - 질문 ID 4096개 범위
+
+
+############################################
+# 설문 모드 (polls/survey.py)
+############################################
+# 여러 질문을 한 페이지에서 투표. 한번의 POST로 받는 최대 질문 수.
+POLLS_SURVEY_MAX_QUESTIONS = 50
@@ -0,0 +1,125 @@
+# config/static_assets.py - static 파일 저장(collectstatic)/응답
+#
+# STATIC_ROOT(statics/)의 파일 이름이 항상 같으면 브라우저는 계속 변경 여부를 확인(재검증)해야 한다.
+# => 파일 이름에 내용 hash를 붙이고(내용이 바뀌면 이름도 바뀐다) 1년 + immutable 로 cache.
+#
+# CompressedManifestStaticFilesStorage (settings.STORAGES["staticfiles"])
+#  - ManifestStaticFilesStorage: collectstatic 때 "base.<hash>.css" 사본 + staticfiles.json(원본 -> hash 이름)
+#    {% static %} 은 hash 이름의 url을 만든다. (DEBUG 에서는 원본 이름)
+#    manifest에 없으면(collectstatic 전) 원본 이름 -> STATIC_CACHE_MAX_AGE 의 짧은 cache
+#  - hash 이름 파일의 압축본을 같이 저장: .gz (gzip), .br (brotli 모듈이 설치되어 있고 settings.STATIC_BROTLI)
+#    압축 대상: COMPRESS_EXTENSIONS, 압축해도 크기가 거의 줄지 않으면 저장하지 않는다.
+#  - 증분(incremental): hash 이름은 내용으로 정해진다 -> 이미 있는 hash 파일/압축본은 다시 만들지 않는다.
+#    (원본 사본 복사도 내용 hash가 같으면 건너뛴다 - config/management/commands/collectstatic.py)
+#
+# serve_static: STATIC_URL 요청 응답 (config/urls.py - DEBUG 에서는 runserver가 먼저 응답)
+#  - Accept-Encoding에 따라 .br -> .gz -> 원본 순으로 선택 (Vary: Accept-Encoding)
+#  - hash 이름 파일은 1년 + immutable, 그 외는 settings.STATIC_CACHE_MAX_AGE 초
+#  - 조건부 요청/Range 처리는 media 응답과 같다. (config/media.py file_response)
+
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from .media import file_response, is_immutable
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 사항 (pip install brotli)
+    brotli = None
+
+COMPRESS_EXTENSIONS = (".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt", ".html", ".xml", ".ico", ".ttf", ".eot")
+MIN_COMPRESS_SIZE = 256  # 이보다 작은 파일은 압축하지 않는다 (bytes)
+SERVE_ENCODINGS = ((".br", "br"), (".gz", "gzip"))  # 응답 선택 순서 (brotli 모듈이 없어도 .br 파일이 있으면 응답)
+
+
+def _encoders():
+    # [(확장자, Content-Encoding, 압축 함수)]
+    encoders = []
+    if brotli is not None and getattr(settings, "STATIC_BROTLI", True):
+        encoders.append((".br", "br", lambda data: brotli.compress(data, quality=11)))
+    encoders.append((".gz", "gzip", lambda data: gzip.compress(data, compresslevel=9, mtime=0)))
+    return encoders
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        # manifest(staticfiles.json)에 없는 파일 -> hash 없는 원본 이름
+        #  (hash 이름 사본/staticfiles.json 은 git에 없다 -> collectstatic 전의 checkout에서도 page가 동작)
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if name.endswith(COMPRESS_EXTENSIONS):
+                for compressed_name in self._compress(name):
+                    yield name, compressed_name, True
+
+    def _compress(self, name):
+        # hash 이름 파일의 압축본 저장. 반환: 새로 저장한 압축본 이름 list
+        created = []
+        data = None
+        for suffix, _, compress in _encoders():
+            compressed_name = name + suffix
+            if self.exists(compressed_name): # 같은 hash -> 같은 내용
+                continue
+            if data is None:
+                with self.open(name) as f:
+                    data = f.read()
+                if len(data) < MIN_COMPRESS_SIZE:
+                    return created
+            compressed = compress(data)
+            if len(compressed) < len(data) * 0.95:
+                self._save(compressed_name, ContentFile(compressed))
+                created.append(compressed_name)
+        return created
+
+
+def accepted_encodings(header):
+    # Accept-Encoding header -> 받을 수 있는 encoding set (q=0 제외)
+    encodings = set()
+    for item in header.split(","):
+        encoding, _, params = item.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            encodings.add(encoding.strip().lower())
+    return encodings
+
+
+@require_safe
+def serve_static(request, path):
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404("파일이 없습니다.")
+    content_type, _ = mimetypes.guess_type(fullpath)
+    immutable = is_immutable(path)
+    max_age = getattr(settings, "STATIC_CACHE_MAX_AGE", 60)
+    accept_encoding = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+    compressible = path.endswith(COMPRESS_EXTENSIONS)
+    response = None
+    if compressible:
+        for suffix, encoding in SERVE_ENCODINGS:
+            if encoding in accept_encoding and os.path.isfile(fullpath + suffix):
+                response = file_response(request, fullpath + suffix, immutable=immutable, max_age=max_age,
+                                         content_type=content_type, encoding=encoding)
+                break
+    if response is None:
+        response = file_response(request, fullpath, immutable=immutable, max_age=max_age)
+    if compressible:
+        patch_vary_headers(response, ["Accept-Encoding"])
+    return response
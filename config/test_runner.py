@@ -0,0 +1,32 @@
+# config/test_runner.py - python manage.py test 실행기 (settings.TEST_RUNNER)
+#  - 기본 CACHES(BASE_DIR/cache 파일 cache, Redis)는 서버 프로세스들이 같이 사용하는 실제 cache
+#    => 테스트는 임시 디렉토리의 파일 cache를 사용한다. (테스트의 cache.clear()가 실제 cache를 지우지 않도록)
+#    공유 cache 여야 page/metadata cache가 동작한다. (polls/page_cache.py cache_is_shared) -> LocMemCache는 사용하지 않는다.
+#  - 프로세스 안의 version 재사용(POLLS_METADATA_VERSION_TTL)은 끈다.
+#    (테스트마다 cache.clear() 후 DB rollback으로 같은 질문 id가 다시 사용된다 -> 이전 테스트의 version이 남지 않도록)
+
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_dir = tempfile.mkdtemp(prefix="mypoll-test-cache-")
+        self._cache_override = override_settings(POLLS_METADATA_VERSION_TTL=0, CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self._cache_dir,
+                'OPTIONS': {'MAX_ENTRIES': 10000},
+            }
+        })
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,205 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command, get_commands
+from django.core.files.storage import default_storage
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .apps import check_app_order
+from .media import parse_range
+
+# python manage.py test config
+
+
+class TestCacheTest(SimpleTestCase):
+    # 테스트는 실제 cache(BASE_DIR/cache, Redis)가 아닌 임시 cache를 사용 (config/test_runner.py)
+
+    def test_cache_location(self):
+        location = settings.CACHES["default"]["LOCATION"]
+        self.assertTrue(str(location).startswith(tempfile.gettempdir()))
+        self.assertNotEqual(str(location), str(settings.BASE_DIR / "cache"))
+
+
+class SQLiteProfileTest(SimpleTestCase):
+    # SQLite 운영 설정 (config/settings.py SQLITE_PRODUCTION_OPTIONS) - 환경변수로 선택할 때만 사용
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, "profile.sqlite3")
+
+    def connect(self, options):
+        # 테스트 DB가 아닌 임시 파일의 connection (설정의 기본값은 ConnectionHandler가 채운다)
+        handler = ConnectionHandler({
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": self.path, "OPTIONS": options},
+        })
+        connection = DatabaseWrapper(handler.settings["default"], alias="sqlite_profile")
+        self.addCleanup(connection.close)
+        return connection
+
+    def test_default_profile(self):
+        # POLLS_SQLITE_PROFILE을 설정하지 않으면 Django 기본 설정
+        self.assertNotIn("transaction_mode", settings.DATABASES["default"].get("OPTIONS", {}))
+        with self.connect({}).cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "delete")
+
+    def test_production_profile(self):
+        connection = self.connect(settings.SQLITE_PRODUCTION_OPTIONS)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("CREATE TABLE t (x INTEGER)")
+        # transaction 시작시 쓰기 lock (BEGIN IMMEDIATE) -> 다른 connection은 쓰기 transaction을 시작할 수 없다.
+        connection.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        other = sqlite3.connect(self.path, timeout=0.05)
+        try:
+            with self.assertRaisesMessage(sqlite3.OperationalError, "locked"):
+                other.execute("BEGIN IMMEDIATE")
+            # WAL: 쓰기 transaction 중에도 읽기는 가능
+            self.assertEqual(other.execute("SELECT count(*) FROM t").fetchone()[0], 0)
+        finally:
+            other.close()
+            connection.rollback()
+            connection.set_autocommit(True)
+
+
+class MediaServeTest(TestCase):
+    # 업로드 파일 응답 view (config/media.py) - Range, 조건부 요청, Cache-Control
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.data = bytes(range(256)) * 40
+        default_storage.save("images/data.bin", BytesIO(self.data))
+        self.url = reverse("media", args=["images/data.bin"])
+
+    def test_full_and_conditional(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        response = self.client.get(self.url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, headers={"If-Modified-Since": response["Last-Modified"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=100-199"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(b"".join(response.streaming_content), self.data[100:200])
+        response = self.client.get(self.url, headers={"Range": "bytes=-10"})
+        self.assertEqual(b"".join(response.streaming_content), self.data[-10:])
+        response = self.client.get(self.url, headers={"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual(response.status_code, 416)
+        # If-Range가 현재 파일과 다르면 전체 응답
+        response = self.client.get(self.url, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_empty_file(self):
+        default_storage.save("images/empty.bin", BytesIO(b""))
+        url = reverse("media", args=["images/empty.bin"])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        for header in ("bytes=-10", "bytes=0-"):
+            response = self.client.get(url, headers={"Range": header})
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response["Content-Range"], "bytes */0")
+        self.assertRaises(ValueError, parse_range, "bytes=-10", 0)
+
+    def test_immutable_and_accel(self):
+        default_storage.save("images/photo.0123456789ab.jpg", BytesIO(b"jpeg"))
+        url = reverse("media", args=["images/photo.0123456789ab.jpg"])
+        self.assertIn("immutable", self.client.get(url)["Cache-Control"])
+        with override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/"):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/images/photo.0123456789ab.jpg")
+        self.assertEqual(response.content, b"")
+        # 한글 파일 이름 -> percent-encoding
+        default_storage.save("images/프로필 사진.jpg", BytesIO(b"jpeg"))
+        with override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/"):
+            response = self.client.get(reverse("media", args=["images/프로필 사진.jpg"]))
+        self.assertEqual(response["X-Accel-Redirect"],
+                         "/protected-media/images/%ED%94%84%EB%A1%9C%ED%95%84%20%EC%82%AC%EC%A7%84.jpg")
+
+    def test_not_found(self):
+        self.assertEqual(self.client.get(reverse("media", args=["../config/settings.py"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("media", args=["images"])).status_code, 404)
+
+
+class StaticAssetsTest(TestCase):
+    # hash 이름 + 압축본 static 파일 (config/static_assets.py)
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.source = os.path.join(directory, "source")
+        os.makedirs(os.path.join(self.source, "css"))
+        self.css = b"body { color: red; }\n" * 100
+        with open(os.path.join(self.source, "css", "site.css"), "wb") as f:
+            f.write(self.css)
+        settings_override = override_settings(
+            STATIC_ROOT=os.path.join(directory, "root"), STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def collectstatic(self):
+        stdout = StringIO()
+        call_command("collectstatic", interactive=False, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_collect_and_serve(self):
+        self.collectstatic()
+        hashed = staticfiles_storage.stored_name("css/site.css")
+        self.assertRegex(hashed, r"^css/site\.[0-9a-f]{12}\.css$")
+        self.assertTrue(staticfiles_storage.exists(hashed + ".gz"))
+
+        url = reverse("static", args=[hashed])
+        response = self.client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.css)
+        # gzip을 받지 않는 client -> 원본
+        response = self.client.get(url, headers={"Accept-Encoding": "gzip;q=0"})
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), self.css)
+
+    def test_without_manifest(self):
+        # collectstatic 전(staticfiles.json 없음) + DEBUG=False -> {% static %} 은 hash 없는 원본 이름
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f'src="{settings.STATIC_URL}imgs/survey.png"')
+
+    def test_incremental(self):
+        self.collectstatic()
+        # 수정일시만 바뀐 파일은 내용(hash)이 같으면 다시 복사하지 않는다.
+        os.utime(os.path.join(self.source, "css", "site.css"))
+        self.assertIn("0 static files copied", self.collectstatic())
+        with open(os.path.join(self.source, "css", "site.css"), "ab") as f:
+            f.write(b"a { color: blue; }\n")
+        self.assertIn("1 static file copied", self.collectstatic())
+
+    def test_incremental_command(self):
+        # 증분 collectstatic (config/management/commands/collectstatic.py) 이 staticfiles의 명령을 대신한다.
+        self.assertEqual(get_commands()["collectstatic"], "config")
+        self.assertEqual(check_app_order(None), [])
+        with self.modify_settings(INSTALLED_APPS={"remove": "config", "append": "config"}):
+            self.assertEqual([error.id for error in check_app_order(None)], ["config.E001"])
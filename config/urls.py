@@ -27,15 +27,19 @@ urlpatterns = [
     path("polls/", include('polls.urls')),
     path("account/", include("account.urls")),
 ]
-from django.conf.urls.static import static
-from . import settings
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+from django.conf import settings
+from . import media, static_assets
+urlpatterns += [
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", media.serve_media, name="media"),
+    # static 파일 (hash 이름 + 압축본). DEBUG 에서는 runserver가 앱의 static 폴더에서 먼저 응답한다.
+    path(f"{settings.STATIC_URL.lstrip('/')}<path:path>", static_assets.serve_static, name="static"),
+]
 
 # 파일 업로드관련 설정. "MEDIA_URL" 로 요청이 들어오면 
 #     어느 경로(MEDIA_ROOT)의 파일들을 제공할 것인지 설정.
-# Django 개발서버에서 필요한 설정.
+# static() 은 DEBUG에서만 동작 -> config/media.py 의 view로 응답 (Range, ETag, Cache-Control)
 # 운영시 웹서버(HTTP서버) 와 django 실행 환경(wsgi)을 분리해서 운영환경을 정의 할 경우
-# 웹 서버에게 MEDIA_ROOT 경로를 설정하는 것으도 대신한다.
+# 웹 서버에게 MEDIA_ROOT 경로를 설정하는 것으도 대신한다. (settings.MEDIA_ACCEL_REDIRECT)
 
 
 # path('polls/welcome', views.welcome_poll, name="welcome"),
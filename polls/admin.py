@@ -1,10 +1,18 @@
 # polls/admin.py
 from django.contrib import admin
 # from polls.models import Question, Choice
-from .models import Question, Choice
+from .models import Question, Choice, Vote, ArchivedPoll
 # .models -> 상대경로로 import. 
 #            models.py와 admin.py가 같은 패키지에 있는 모듈.
+from .counts import CachedCountPaginator
+
+# 목록 화면의 전체 개수를 COUNT(*) 대신 cache된 개수/추정 개수로 조회.
+class CachedCountAdmin(admin.ModelAdmin):
+    paginator = CachedCountPaginator
+    show_full_result_count = False # 검색/필터시 전체 개수 COUNT(*) 를 하지 않는다.
 
 # Model 클래스들을 admin  app에서 관리할 수있도록 등록
-admin.site.register(Question)
-admin.site.register(Choice)
+admin.site.register(Question, CachedCountAdmin)
+admin.site.register(Choice, CachedCountAdmin)
+admin.site.register(Vote)
+admin.site.register(ArchivedPoll) # 보관된 설문 (python manage.py archive_polls)
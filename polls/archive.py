@@ -0,0 +1,114 @@
+# polls/archive.py - 마감된 설문 보관(archive)
+#
+# 설문은 삭제되지 않고 계속 쌓인다 -> 목록 paging/개수 조회, index가 계속 커진다.
+# => 마감 후 오래된 설문은 결과를 ArchivedPoll 의 JSON snapshot 한 row로 저장하고
+#    Question(+ Choice, Vote, 샤드 카운터, 시간대별 집계 등 CASCADE)을 삭제한다.
+#  - 보관 대상: closed=True 이거나 end_date가 지난 설문 중 마감(수정)된 지 older_than 이상 지난 설문
+#  - batch_size 개씩 하나의 transaction으로 처리 (snapshot INSERT + 삭제)
+#    -> 중간에 중단되어도 처리한 batch까지는 완료, 다시 실행하면 나머지를 처리.
+#  - 삭제는 테이블별 DELETE SQL 한번씩 (참조하는 테이블부터). ORM delete()는 Question/Choice의 signal 때문에
+#    row마다 객체를 조회하고 signal(질문 version 변경, cache 무효화)을 실행한다 -> batch 크기만큼 query.
+#    => signal 없이 삭제하고, signal이 하던 처리(전체 개수 cache, 페이지 cache 무효화)는 commit 후 batch 단위로 한번에.
+#  - DB는 router의 쓰기 DB (using으로 지정 가능). 조회도 같은 DB에서. (replica는 commit 전의 변경을 볼 수 없다)
+#  - 보관된 설문도 vote_result 에서 snapshot으로 결과를 볼 수 있다. (polls/views.py get_result_question_or_404)
+#  - 사용: python manage.py archive_polls
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counts import adjust_row_count
+from .models import (
+    ArchivedPoll, Choice, ChoiceVoteShard, Question, TrendingScore, Vote,
+    VoteRollupDay, VoteRollupHour, VoteRollupMinute,
+)
+from .page_cache import bump_version
+
+
+def archivable_questions(older_than, now=None, using=None):
+    # 보관 대상 질문들 - 마감(closed 또는 end_date 경과) 후 older_than(timedelta) 이상 지난 질문
+    cutoff = (now or timezone.now()) - older_than
+    return Question.objects.db_manager(using).filter(
+        Q(closed=True, modified_at__lt=cutoff) | Q(end_date__lt=cutoff)
+    )
+
+
+def snapshot_polls(question_ids, using=None):
+    # 질문들의 결과를 ArchivedPoll 객체로 만든다. (저장하지 않는다)
+    choices = Choice.objects.db_manager(using).filter(question_id__in=question_ids).with_shard_votes() \
+                            .order_by("question_id", "pk") \
+                            .values_list("question_id", "pk", "choice_text", "votes", "shard_votes")
+    results = {question_id: [] for question_id in question_ids}
+    for question_id, choice_id, choice_text, votes, shard_votes in choices:
+        results[question_id].append([choice_id, choice_text, votes + shard_votes])
+    questions = Question.objects.db_manager(using).filter(pk__in=question_ids) \
+                                .values_list("pk", "question_text", "pub_date", "end_date")
+    return [
+        ArchivedPoll(id=pk, question_text=question_text, pub_date=pub_date, end_date=end_date,
+                     results=results[pk])
+        for pk, question_text, pub_date, end_date in questions
+    ]
+
+
+def _column(model, field_name):
+    return model._meta.get_field(field_name).column
+
+
+def delete_polls(question_ids, using=None):
+    # 질문들과 참조하는 row들을 테이블별 DELETE 한번씩으로 삭제. 호출한 쪽의 transaction 안에서 실행.
+    #  - ORM delete() 대신 SQL: 삭제할 객체 조회와 pre/post_delete signal(row마다 version 변경)을 하지 않는다.
+    #    (signal이 하던 처리는 아래 on_commit 에서 batch 단위로)
+    # 반환: (삭제한 질문 수, 삭제한 보기 수)
+    if not question_ids:
+        return 0, 0
+    using = using or router.db_for_write(Question)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    in_questions = "IN (%s)" % ", ".join(["%s"] * len(question_ids))
+    choice_ids = "SELECT %s FROM %s WHERE %s %s" % (
+        qn(Choice._meta.pk.column), qn(Choice._meta.db_table), qn(_column(Choice, "question")), in_questions)
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM %s WHERE %s IN (%s)" % (
+            qn(ChoiceVoteShard._meta.db_table), qn(_column(ChoiceVoteShard, "choice")), choice_ids), question_ids)
+        for model in (Vote, TrendingScore, VoteRollupMinute, VoteRollupHour, VoteRollupDay):
+            cursor.execute("DELETE FROM %s WHERE %s %s" % (
+                qn(model._meta.db_table), qn(_column(model, "question")), in_questions), question_ids)
+        cursor.execute("DELETE FROM %s WHERE %s %s" % (
+            qn(Choice._meta.db_table), qn(_column(Choice, "question")), in_questions), question_ids)
+        deleted_choices = cursor.rowcount
+        cursor.execute("DELETE FROM %s WHERE %s %s" % (
+            qn(Question._meta.db_table), qn(Question._meta.pk.column), in_questions), question_ids)
+        deleted_questions = cursor.rowcount
+
+    def on_commit():
+        adjust_row_count(Question, -deleted_questions)
+        adjust_row_count(Choice, -deleted_choices)
+        bump_version("list", "list:votes",
+                     *(f"{prefix}:{question_id}" for question_id in question_ids
+                       for prefix in ("question", "results")))
+    transaction.on_commit(on_commit, using=using)
+    return deleted_questions, deleted_choices
+
+
+def archive_polls(older_than, batch_size=500, now=None, progress=None, using=None):
+    # 보관 대상 설문들을 batch_size 개씩 snapshot 저장 + 삭제.
+    # progress: batch 하나를 처리할 때마다 호출할 함수 (처리한 개수 합계)
+    # 반환: 보관한 설문 수
+    using = using or router.db_for_write(Question)
+    archived = 0
+    while True:
+        with transaction.atomic(using=using):
+            question_ids = list(
+                archivable_questions(older_than, now, using).order_by("pk")
+                                                           .values_list("pk", flat=True)[:batch_size]
+            )
+            if not question_ids:
+                return archived
+            polls = snapshot_polls(question_ids, using)
+            # 이미 보관된 id(같은 id가 다시 사용된 경우 등)는 새 snapshot으로 교체
+            ArchivedPoll.objects.using(using).filter(pk__in=question_ids).delete()
+            ArchivedPoll.objects.using(using).bulk_create(polls)
+            delete_polls(question_ids, using)
+        archived += len(question_ids)
+        if progress is not None:
+            progress(archived)
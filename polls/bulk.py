@@ -0,0 +1,74 @@
+# polls/bulk.py - 설문(질문 + 보기들) 등록
+#
+# Question.save() 후 보기마다 Choice.save() -> 보기 개수 + 1 번의 INSERT (autocommit이면 INSERT마다 commit)
+#  - 중간에 오류가 나면 보기 일부만 저장된 설문이 남는다.
+# => 하나의 transaction에서 Choice는 bulk_create로 한번에 INSERT.
+#
+# create_polls(): 여러 설문을 한번에 등록 (admin, 데이터 import 등에서 사용)
+#  - Question, Choice 모두 bulk_create
+#    (한번의 INSERT 개수는 bulk_create가 DB의 query 파라미터 개수 제한에 맞춰서 나눈다)
+
+from django.db import connections, router, transaction
+
+from .counts import adjust_row_count
+from .models import Choice, Question
+from .page_cache import bump_version
+
+
+def _adjust_counts_on_commit(question_count, choice_count, using):
+    # bulk_create는 post_save signal이 발생하지 않는다. -> cache된 전체 개수를 직접 변경.
+    # 목록 페이지 cache도 직접 무효화 (polls/page_cache.py)
+    def adjust():
+        adjust_row_count(Question, question_count)
+        adjust_row_count(Choice, choice_count)
+        bump_version("list")
+    transaction.on_commit(adjust, using=using)
+
+
+def create_poll(question_text, choice_texts):
+    # 설문 하나 등록. 질문 INSERT 1번 + 보기들 INSERT 1번(bulk_create)
+    # 반환: 저장한 Question
+    using = router.db_for_write(Question)
+    with transaction.atomic(using=using):
+        choice_texts = [*choice_texts]
+        # bulk_create는 signal이 발생하지 않는다 -> 보기 개수(choice_count)를 질문 INSERT때 같이 저장.
+        question = Question.objects.using(using).create(
+            question_text=question_text, choice_count=len(choice_texts)
+        )
+        choices = [Choice(question=question, choice_text=text) for text in choice_texts]
+        Choice.objects.using(using).bulk_create(choices)
+        _adjust_counts_on_commit(0, len(choices), using)  # 질문은 save()의 signal에서 변경.
+    return question
+
+
+def create_polls(polls, using=None):
+    # 여러 설문을 한번에 등록
+    #  polls: [(질문, [보기1, 보기2, ..]), ...]
+    #  반환: 저장한 Question 리스트
+    using = using or router.db_for_write(Question)
+    polls = [(text, [*choice_texts]) for text, choice_texts in polls]
+    connection = connections[using]
+
+    with transaction.atomic(using=using):
+        questions = [
+            Question(question_text=text, choice_count=len(choice_texts)) for text, choice_texts in polls
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            # INSERT ... RETURNING id -> bulk_create 후 Question.pk 가 설정된다.
+            Question.objects.using(using).bulk_create(questions)
+        else:
+            # bulk_create로 pk를 받을 수 없는 DB -> 질문은 하나씩 저장.
+            for question in questions:
+                question.save(using=using, force_insert=True)
+
+        choices = [
+            Choice(question=question, choice_text=text)
+            for question, (_, choice_texts) in zip(questions, polls)
+            for text in choice_texts
+        ]
+        Choice.objects.using(using).bulk_create(choices)
+        if connection.features.can_return_rows_from_bulk_insert:
+            _adjust_counts_on_commit(len(questions), len(choices), using)
+        else:
+            _adjust_counts_on_commit(0, len(choices), using)  # 질문은 save()의 signal에서 변경.
+    return questions
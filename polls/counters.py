@@ -0,0 +1,141 @@
+# polls/counters.py - 투표수 증가 처리
+#
+# choice = Choice.objects.get(pk=..); choice.votes += 1; choice.save()
+#   - 조회 -> 증가 -> 저장(read-modify-write) 사이에 다른 요청이 투표하면 투표수가 유실된다.
+#   - save()는 모든 컬럼을 UPDATE 한다.
+# => DB에서 원자적으로 증가시킨다: UPDATE polls_choice SET votes = votes + 1 WHERE id = ..
+#    (F() 표현식 - 파이썬에서 값을 읽지 않고 DB가 현재 값을 기준으로 계산)
+#
+# settings.POLLS_VOTE_SHARDS 가 2 이상이면 샤드 카운터 모드
+#   - Choice 하나당 N개의 ChoiceVoteShard row 중 임의의 하나를 증가 -> row lock 경합 분산.
+#   - 읽을 때 합산: Choice.vote_count
+#   - fold_vote_shards(): 샤드에 쌓인 값을 Choice.votes로 옮긴다.(python manage.py fold_vote_shards)
+#
+# 투표수가 바뀌면 Question.version 증가 (bump_question_version) -> JSON API의 ETag
+#  + Question.total_votes 도 같은 UPDATE로 증가 (목록의 "투표 많은 순" 정렬)
+#  recompute_question_totals(): total_votes/choice_count를 보기들로 다시 계산 (python manage.py repair_question_totals)
+
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, Now
+
+from .models import Choice, ChoiceVoteShard, Question
+from .page_cache import bump_version
+
+
+def get_vote_shards():
+    # 설정된 샤드 개수. (1 이하 -> 샤드를 사용하지 않음)
+    return getattr(settings, "POLLS_VOTE_SHARDS", 1)
+
+
+def increment_choice_votes(choice_id, question_id=None, amount=1):
+    # choice_id 보기의 투표수를 amount 만큼 원자적으로 증가.
+    # question_id를 주면 그 질문의 보기인지도 같이 확인.
+    # 반환: 증가 처리가 되었으면 True, 해당 보기가 없으면 False
+    choices = Choice.objects.filter(pk=choice_id)
+    if question_id is not None:
+        choices = choices.filter(question_id=question_id)
+
+    shards = get_vote_shards()
+    if shards <= 1:
+        # UPDATE polls_choice SET votes = votes + 1 WHERE id = ..  (votes 컬럼만 UPDATE)
+        if choices.update(votes=F("votes") + amount) != 1:
+            return False
+        # 같은 transaction에서 Question.total_votes 증가
+        bump_question_version(question_id=question_id, choice_id=choice_id, votes=amount)
+        return True
+
+    # 샤드 모드는 Question.version, total_votes를 변경하지 않는다. (질문 row에 다시 lock 경합이 생기므로)
+    #  -> 결과 변경 확인(ETag)에 샤드 count 합계를 같이 사용. (polls/views.py question_validators)
+    #  -> total_votes는 fold_vote_shards() 때 반영.
+    if not choices.exists():
+        return False
+    shard = random.randrange(shards)
+    updated = ChoiceVoteShard.objects.filter(choice_id=choice_id, shard=shard) \
+                                     .update(count=F("count") + amount)
+    if updated == 0:
+        # 샤드 row가 아직 없는 경우 -> 생성.
+        # 동시에 다른 요청이 먼저 생성했으면(unique 제약 위반) 다시 UPDATE.
+        try:
+            with transaction.atomic():
+                ChoiceVoteShard.objects.create(choice_id=choice_id, shard=shard, count=amount)
+        except IntegrityError:
+            ChoiceVoteShard.objects.filter(choice_id=choice_id, shard=shard) \
+                                   .update(count=F("count") + amount)
+    return True
+
+
+def increment_votes_bulk(choice_ids):
+    # 여러 보기(서로 다른 질문)의 투표수를 1씩 증가 - 설문 모드의 일괄 투표 (polls/survey.py)
+    #  - 보기: UPDATE polls_choice SET votes = votes + 1 WHERE id IN (..)   (한번의 UPDATE)
+    #  - 질문: UPDATE polls_question SET total_votes = total_votes + 1, .. WHERE id IN (..)
+    # 샤드 모드는 보기마다 샤드 row를 증가 (increment_choice_votes)
+    # 반환: 증가한 보기 수
+    if get_vote_shards() > 1:
+        return sum(1 for choice_id in choice_ids if increment_choice_votes(choice_id))
+    updated = Choice.objects.filter(pk__in=choice_ids).update(votes=F("votes") + 1)
+    Question.objects.filter(pk__in=Choice.objects.filter(pk__in=choice_ids).values("question_id")).update(
+        version=F("version") + 1, modified_at=Now(), total_votes=F("total_votes") + 1,
+    )
+    return updated
+
+
+def bump_question_version(question_id=None, choice_id=None, votes=0, choices=0):
+    # 질문의 결과가 변경되었음을 기록. version + 1, modified_at = 현재일시
+    # question_id 대신 choice_id를 주면 그 보기의 질문.
+    # votes, choices: total_votes, choice_count 증가(감소)량(정수 또는 query 표현식) - 같은 UPDATE 문으로 변경.
+    if question_id is not None:
+        questions = Question.objects.filter(pk=question_id)
+    else:
+        questions = Question.objects.filter(
+            pk__in=Choice.objects.filter(pk=choice_id).values("question_id")
+        )
+    changes = {"version": F("version") + 1, "modified_at": Now()}
+    if votes:
+        changes["total_votes"] = F("total_votes") + votes
+    if choices:
+        changes["choice_count"] = F("choice_count") + choices
+    questions.update(**changes)
+
+
+def fold_vote_shards():
+    # 샤드 카운터에 쌓인 투표수를 Choice.votes 로 옮긴다.
+    # 샤드의 count를 읽은 값만큼만 빼기 때문에, 처리 중에 들어온 투표는 유실되지 않는다.
+    # 반환: 옮긴 투표수 합계
+    folded = 0
+    with transaction.atomic():
+        shard_rows = ChoiceVoteShard.objects.select_for_update() \
+                                            .filter(count__gt=0) \
+                                            .values_list("pk", "choice_id", "count")
+        for pk, choice_id, count in shard_rows:
+            Choice.objects.filter(pk=choice_id).update(votes=F("votes") + count)
+            ChoiceVoteShard.objects.filter(pk=pk).update(count=F("count") - count)
+            bump_question_version(choice_id=choice_id, votes=count)
+            folded += count
+        if folded:
+            # total_votes가 바뀌었다 -> "투표 많은 순" 목록 페이지 cache 무효화
+            transaction.on_commit(lambda: bump_version("list:votes"))
+    return folded
+
+
+def recompute_question_totals(batch_size=500):
+    # 보기들을 GROUP BY 한번으로 집계해서 total_votes, choice_count가 다른 질문들만 다시 저장.
+    #  total_votes = 보기 votes 합계 (샤드에 남아 있는 투표수는 fold_vote_shards() 후 반영)
+    # 반환: 수정한 질문 수
+    with transaction.atomic():
+        rows = Question.objects.annotate(
+            votes_sum=Coalesce(Sum("choice__votes"), 0), choices=Count("choice"),
+        ).exclude(
+            total_votes=F("votes_sum"), choice_count=F("choices"),
+        ).values_list("pk", "votes_sum", "choices")
+        questions = [
+            Question(pk=pk, total_votes=votes_sum, choice_count=choices)
+            for pk, votes_sum, choices in rows
+        ]
+        Question.objects.bulk_update(questions, ["total_votes", "choice_count"], batch_size=batch_size)
+    if questions:
+        transaction.on_commit(lambda: bump_version("list:votes"))
+    return len(questions)
@@ -0,0 +1,82 @@
+# polls/counts.py - 목록 paging에 사용할 전체 데이터 개수(row count) 제공
+#
+# Paginator.count 는 요청마다 SELECT COUNT(*) 를 실행한다. (테이블 전체 scan)
+#  - 모델별 전체 개수를 cache에 저장해서 재사용.
+#  - insert/delete 될 때 cache의 값을 증가/감소 (polls/signals.py, bulk 처리는 adjust_row_count())
+#  - 테이블이 큰 경우(settings.POLLS_COUNT_ESTIMATE_THRESHOLD 이상) COUNT(*) 대신
+#    DB 통계의 추정 개수를 사용. (SQLite: sqlite_stat1 - ANALYZE 필요, PostgreSQL: pg_class.reltuples)
+#  - 조건(filter)이 있는 조회는 정확한 COUNT(*) 를 실행.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+
+def _cache_key(model):
+    return f"polls:count:{model._meta.label_lower}"
+
+
+def estimated_row_count(model, using="default"):
+    # DB 통계 정보의 추정 row 개수. 통계가 없으면 None
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                # stat 컬럼: "전체row수 index컬럼별평균row수 ..."
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [table])
+                row = cursor.fetchone()
+                return int(row[0]) if row and row[0] >= 0 else None
+    except DatabaseError:
+        # sqlite_stat1 테이블이 없는 경우(ANALYZE를 한번도 실행하지 않음) 등
+        return None
+    return None
+
+
+def row_count(model, using="default"):
+    # model 테이블의 전체 row 개수. cache -> 추정 개수 -> COUNT(*) 순으로 조회.
+    key = _cache_key(model)
+    count = cache.get(key)
+    if count is not None:
+        return count
+
+    threshold = getattr(settings, "POLLS_COUNT_ESTIMATE_THRESHOLD", 100_000)
+    count = estimated_row_count(model, using)
+    if count is None or count < threshold:
+        count = model._default_manager.using(using).count()
+    cache.set(key, count, getattr(settings, "POLLS_COUNT_CACHE_TIMEOUT", 300))
+    return count
+
+
+def adjust_row_count(model, delta):
+    # insert(+)/delete(-) 된 개수만큼 cache의 개수를 변경. cache에 없으면 다음 조회때 다시 계산.
+    try:
+        if delta >= 0:
+            cache.incr(_cache_key(model), delta)
+        else:
+            cache.decr(_cache_key(model), -delta)
+    except ValueError: # cache에 값이 없는 경우
+        pass
+
+
+def invalidate_row_count(model):
+    cache.delete(_cache_key(model))
+
+
+class CachedCountPaginator(Paginator):
+    # 조건 없이 전체를 조회하는 QuerySet이면 row_count()의 값을 사용하는 Paginator
+    # - 설문 목록(offset 방식), admin 목록화면(ModelAdmin.paginator)에서 사용.
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where and not query.distinct and query.low_mark == 0 \
+                and query.high_mark is None:
+            return row_count(self.object_list.model, self.object_list.db)
+        return super().count
@@ -0,0 +1,92 @@
+# polls/export.py - 설문 결과 내보내기 (CSV / JSONL)
+#
+#  - Question LEFT JOIN Choice 를 한번의 query로 조회.
+#  - .iterator(chunk_size=..) : 결과를 chunk_size 개씩 DB에서 가져오면서 처리
+#                               (QuerySet cache를 만들지 않는다 -> 데이터 양과 관계없이 메모리 사용량 일정)
+#  - since: 그 일시 이후 등록/수정(Question.modified_at)되었거나 투표가 있었던 질문만 내보낸다. (매일 증분 동기화용)
+#  - 사용: polls.views.export_results (StreamingHttpResponse), python manage.py export_results
+
+import csv
+import json
+from datetime import datetime, time
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .counters import get_vote_shards
+from .models import Question, Vote
+
+EXPORT_FORMATS = ("csv", "jsonl")
+CSV_HEADER = ["question_id", "question_text", "pub_date", "choice_id", "choice_text", "votes"]
+
+
+def parse_since(value):
+    # "YYYY-MM-DD" 또는 "YYYY-MM-DDTHH:MM:SS" -> timezone 정보가 있는 datetime. 형식 오류면 ValueError
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError("since 형식: YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS")
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def result_rows(since=None, chunk_size=2000):
+    # (question_id, question_text, pub_date, choice_id, choice_text, votes) 를 질문/보기 순서로 반환.
+    # 보기가 없는 질문은 choice_id, choice_text, votes가 None
+    questions = Question.objects.all()
+    if since is not None:
+        voted_question_ids = Vote.objects.filter(voted_at__gte=since).values("question_id")
+        questions = questions.filter(
+            Q(pub_date__gte=since) | Q(modified_at__gte=since) | Q(pk__in=voted_question_ids)
+        )
+
+    rows = questions.values_list(
+        "pk", "question_text", "pub_date", "choice__pk", "choice__choice_text", "choice__votes"
+    ).order_by("pk", "choice__pk")
+    if get_vote_shards() > 1:
+        # 샤드 카운터 합계 포함 (Choice.vote_count)
+        rows = rows.annotate(shard_votes=Sum("choice__vote_shards__count"))
+        for *row, votes, shard_votes in rows.iterator(chunk_size=chunk_size):
+            yield (*row, None if votes is None else votes + (shard_votes or 0))
+    else:
+        yield from rows.iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    # csv.writer가 쓴 문자열을 그대로 반환 -> 한 행씩 문자열로 변환할 때 사용.
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    # 한 행(보기 하나)씩 CSV 문자열을 반환하는 generator
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for question_id, question_text, pub_date, choice_id, choice_text, votes in rows:
+        yield writer.writerow([question_id, question_text, pub_date.isoformat(),
+                               choice_id, choice_text, votes])
+
+
+def jsonl_lines(rows):
+    # 질문 하나(보기들 포함)씩 JSON 한줄을 반환하는 generator
+    # rows는 질문 순서로 정렬되어 있다 -> 질문 id가 바뀌면 이전 질문을 출력.
+    current = None
+    for question_id, question_text, pub_date, choice_id, choice_text, votes in rows:
+        if current is None or current["id"] != question_id:
+            if current is not None:
+                yield json.dumps(current, ensure_ascii=False) + "\n"
+            current = {"id": question_id, "question_text": question_text,
+                       "pub_date": pub_date.isoformat(), "choices": []}
+        if choice_id is not None:
+            current["choices"].append({"id": choice_id, "choice_text": choice_text, "votes": votes})
+    if current is not None:
+        yield json.dumps(current, ensure_ascii=False) + "\n"
+
+
+def export_lines(file_format, since=None, chunk_size=2000):
+    rows = result_rows(since, chunk_size)
+    return csv_lines(rows) if file_format == "csv" else jsonl_lines(rows)
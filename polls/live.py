@@ -0,0 +1,133 @@
+# polls/live.py - 투표 결과 실시간 전송 (Server-Sent Events)
+#
+# 결과 페이지를 새로고침(polling)하면 요청마다 DB를 조회한다.
+# => 질문별로 구독(subscribe)한 client들에게 변경된 결과를 push.
+#   - vote 가 투표 후 publish(question_id) -> 질문의 결과가 변경되었다고 표시(dirty)
+#   - 질문당 하나의 broadcaster task가 DB를 한번 조회해서 모든 구독자에게 전달. (조회 1번 -> N명)
+#   - 전달 후 settings.POLLS_LIVE_INTERVAL(초) 동안 대기 -> 그 사이의 투표들은 다음 전달 한번으로 합쳐진다.
+#   - 구독자 queue에는 최신 결과 하나만 유지 (느린 client는 중간 결과를 건너뛴다)
+#
+# ResultHub는 프로세스 안에서만 동작 (같은 프로세스에서 처리된 투표만 전달).
+# 구독 상태(Queue, Event, task)는 event loop별로 따로 저장 -> publish는 구독자가 있는 모든 event loop에 전달.
+# SSE 응답은 ASGI 서버(uvicorn, daphne ..)로 실행해야 한다. (config/asgi.py - WSGI에서는 204 응답)
+
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Question
+
+
+class _LoopState:
+    # event loop 하나의 구독 상태 (asyncio 객체는 만든 event loop에서만 사용할 수 있다)
+
+    def __init__(self):
+        self.subscribers = {}   # {question_id: set(asyncio.Queue)}
+        self.dirty = {}         # {question_id: asyncio.Event} - 결과 변경 표시
+        self.tasks = {}         # {question_id: broadcaster task}
+        self.latest = {}        # {question_id: 마지막으로 전달한 결과}
+
+    def mark_dirty(self, question_id):
+        event = self.dirty.get(question_id)
+        if event is not None:
+            event.set()
+
+
+class ResultHub:
+    # ASGI 서버가 event loop를 여러개 실행할 수 있다 -> event loop별로 구독 상태를 따로 유지.
+
+    def __init__(self):
+        self.states = {}        # {event loop: _LoopState}
+        self.lock = threading.Lock()
+
+    def publish(self, question_id):
+        # question_id 질문의 결과가 변경되었음을 알린다. (어느 thread에서 호출해도 된다)
+        with self.lock:
+            states = list(self.states.items())
+        for loop, state in states:
+            if loop.is_closed():
+                with self.lock:
+                    self.states.pop(loop, None)
+                continue
+            loop.call_soon_threadsafe(state.mark_dirty, int(question_id))
+
+    async def subscribe(self, question_id):
+        # 구독 -> 결과를 받을 Queue 반환
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            state = self.states.setdefault(loop, _LoopState())
+        queue = asyncio.Queue(maxsize=1)
+        state.subscribers.setdefault(question_id, set()).add(queue)
+        if question_id in state.latest:
+            queue.put_nowait(state.latest[question_id])
+        if question_id not in state.tasks:
+            state.dirty[question_id] = asyncio.Event()
+            state.tasks[question_id] = asyncio.create_task(self._broadcast(state, question_id))
+            if question_id not in state.latest:
+                state.dirty[question_id].set()  # 처음 구독 -> 바로 조회
+        return queue
+
+    def unsubscribe(self, question_id, queue):
+        # 구독한 event loop에서 호출
+        loop = asyncio.get_running_loop()
+        state = self.states.get(loop)
+        subscribers = state.subscribers.get(question_id) if state else None
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            # 구독자가 없으면 broadcaster 종료
+            del state.subscribers[question_id]
+            state.dirty.pop(question_id, None)
+            state.latest.pop(question_id, None)
+            task = state.tasks.pop(question_id, None)
+            if task is not None:
+                task.cancel()
+            if not state.subscribers:
+                with self.lock:
+                    self.states.pop(loop, None)
+
+    async def _broadcast(self, state, question_id):
+        interval = getattr(settings, "POLLS_LIVE_INTERVAL", 0.5)
+        event = state.dirty[question_id]
+        while True:
+            await event.wait()
+            event.clear()
+            try:
+                question = await Question.objects.awith_choices(question_id, with_votes=True)
+            except Question.DoesNotExist:
+                data = None # 삭제된 질문
+            else:
+                data = json.dumps(question.results_data(), cls=DjangoJSONEncoder, ensure_ascii=False)
+            state.latest[question_id] = data
+            for queue in state.subscribers.get(question_id, ()):
+                if queue.full():
+                    queue.get_nowait() # 전달되지 않은 이전 결과는 버린다.
+                queue.put_nowait(data)
+            await asyncio.sleep(interval)
+
+
+hub = ResultHub()
+
+
+async def result_events(question_id):
+    # SSE 응답 본문 generator
+    #  - 결과가 바뀔 때마다 "data: {결과 json}\n\n"
+    #  - 15초 동안 변경이 없으면 연결 유지용 주석(": keepalive")
+    queue = await hub.subscribe(question_id)
+    try:
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if data is None:
+                yield "event: closed\ndata: {}\n\n"
+                return
+            yield f"data: {data}\n\n"
+    finally:
+        hub.unsubscribe(question_id, queue)
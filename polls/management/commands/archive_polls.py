@@ -0,0 +1,30 @@
+# polls/management/commands/archive_polls.py
+# python manage.py archive_polls [--days 30] [--batch-size 500]
+#  - 마감 후 --days 일이 지난 설문의 결과를 ArchivedPoll(JSON snapshot)로 옮기고 질문/보기를 삭제한다.
+#  - batch 단위 transaction -> 중단되면 다시 실행.
+#  - buffered 투표 모드면 flush_votes 를 먼저 실행해서 미반영 투표를 반영한다.
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from polls import vote_buffer
+from polls.archive import archive_polls
+
+
+class Command(BaseCommand):
+    help = "마감된 오래된 설문을 보관 테이블(snapshot)로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="마감 후 보관할 때까지의 기간(일)")
+        parser.add_argument("--batch-size", type=int, default=500, help="transaction 하나에 처리할 설문 수")
+
+    def handle(self, *args, **options):
+        if vote_buffer.is_buffered():
+            # 투표 로그에 남아있는 투표를 먼저 반영 -> snapshot에 포함
+            self.stdout.write(f"미반영 투표 {vote_buffer.flush_vote_log()}표를 반영했습니다.")
+        archived = archive_polls(
+            timedelta(days=options["days"]), batch_size=options["batch_size"],
+            progress=lambda count: self.stdout.write(f"{count}개 보관"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"완료: {archived}개 설문을 보관했습니다."))
@@ -0,0 +1,137 @@
+# polls/management/commands/bench_views.py
+# python manage.py bench_views [--server both|wsgi|asgi] [--requests 2000] [--concurrency 50]
+#
+# 읽기 View(목록/설문폼/결과)의 처리량 비교
+#  - wsgi: config.wsgi.application (sync View) 을 thread pool로 동시 요청
+#  - asgi: config.asgi.application (async View) 을 asyncio로 동시 요청
+#  - 네트워크/웹서버 없이 application을 직접 호출 -> Django 처리 비용만 측정.
+#  - 서버 종류마다 별도 프로세스로 실행 (urls.py 가 시작할때 sync/async View를 선택하므로)
+#  - 현재 DB(settings.DATABASES)의 설문을 조회만 한다. 설문이 없으면 import_polls로 먼저 등록.
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.models import Question
+
+
+def _paths(question_ids, count):
+    # 목록/설문폼/결과 url을 번갈아 요청
+    paths = []
+    for i in range(count):
+        question_id = question_ids[i % len(question_ids)]
+        paths.append(("/polls/vote_list", f"/polls/vote_form/{question_id}",
+                      f"/polls/vote_result/{question_id}")[i % 3])
+    return paths
+
+
+def bench_wsgi(paths, concurrency):
+    from config.wsgi import application
+
+    def request(path):
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "",
+            "SERVER_NAME": "127.0.0.1", "SERVER_PORT": "80", "HTTP_HOST": "127.0.0.1",
+            "wsgi.input": BytesIO(), "wsgi.url_scheme": "http", "wsgi.errors": sys.stderr,
+        }
+        status = []
+        started = time.perf_counter()
+        body = b"".join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+        elapsed = time.perf_counter() - started
+        return status[0].startswith("200"), elapsed, len(body)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        results = list(executor.map(request, paths))
+    return time.perf_counter() - started, results
+
+
+def bench_asgi(paths, concurrency):
+    from config.asgi import application
+
+    async def request(path, semaphore):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "", "headers": [(b"host", b"127.0.0.1")],
+            "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+        }
+        messages = []
+        received = []
+        finished = asyncio.Event()
+
+        async def receive():
+            # 첫번째: 요청 본문, 그 다음: 응답이 끝날 때까지 대기 후 연결 종료
+            if not received:
+                received.append(True)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                finished.set()
+
+        async with semaphore:
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            elapsed = time.perf_counter() - started
+        status = messages[0]["status"]
+        size = sum(len(m.get("body", b"")) for m in messages[1:])
+        return status == 200, elapsed, size
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request(path, semaphore) for path in paths))
+        return time.perf_counter() - started, results
+
+    return asyncio.run(run())
+
+
+class Command(BaseCommand):
+    help = "읽기 View의 처리량을 WSGI(sync)/ASGI(async)로 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", choices=["both", "wsgi", "asgi"], default="both")
+        parser.add_argument("--requests", type=int, default=2000, help="전체 요청 수")
+        parser.add_argument("--concurrency", type=int, default=50, help="동시 요청 수")
+
+    def handle(self, *args, **options):
+        if options["server"] == "both":
+            # 서버 종류마다 새 프로세스로 실행
+            for server in ("wsgi", "asgi"):
+                env = {**os.environ, "POLLS_ASYNC_VIEWS": "1" if server == "asgi" else "0"}
+                subprocess.run(
+                    [sys.executable, sys.argv[0], "bench_views", "--server", server,
+                     "--requests", str(options["requests"]),
+                     "--concurrency", str(options["concurrency"])],
+                    env=env, check=True,
+                )
+            return
+
+        question_ids = list(Question.objects.order_by("-pk").values_list("pk", flat=True)[:100])
+        if not question_ids:
+            raise CommandError("설문이 없습니다. python manage.py import_polls 로 먼저 등록하세요.")
+        paths = _paths(question_ids, options["requests"])
+
+        bench = bench_asgi if options["server"] == "asgi" else bench_wsgi
+        bench(paths[:50], options["concurrency"]) # warm up
+        elapsed, results = bench(paths, options["concurrency"])
+
+        latencies = sorted(r[1] * 1000 for r in results)
+        failures = sum(1 for ok, _, _ in results if not ok)
+        self.stdout.write(
+            f"[{options['server']}] {len(results)}건, 동시 {options['concurrency']} "
+            f"- {len(results) / elapsed:.0f} req/s, "
+            f"p50 {statistics.median(latencies):.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms, 실패 {failures}건"
+        )
@@ -0,0 +1,115 @@
+# polls/management/commands/bench_votes.py
+# python manage.py bench_votes [--profile both|default|production] [--votes 2000] [--concurrency 16]
+#
+# 동시 투표 처리량 비교 (SQLite 설정)
+#  - default: Django 기본 sqlite3 설정 (rollback journal, busy timeout 5초, DEFERRED transaction, 요청마다 connection)
+#  - production: config/settings.py 의 SQLITE_PRODUCTION_OPTIONS (WAL, pragma, IMMEDIATE, 영구 connection)
+#  - 설정마다 별도 프로세스 + 임시 DB 파일로 실행 (현재 DB는 사용하지 않는다)
+#  - cache도 임시 디렉토리의 파일 cache를 사용 (임시 DB의 질문 id가 실제 질문 id와 겹친다
+#    -> 실제 cache의 version 증가, metadata/page cache 저장이 실제 사용자에게 보이지 않도록)
+#  - 사용자마다 한번씩 polls.views.vote 를 thread pool로 동시 호출 (Vote 저장 + 투표수 증가 + version 증가)
+#    "database is locked" 등 DB 오류는 실패로 센다.
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection, connections
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from polls import views
+from polls.models import Choice, Question, Vote
+
+PROFILES = ("default", "production")
+
+
+def bench(users, choice_ids, question_id, concurrency):
+    factory = RequestFactory()
+
+    def request(index):
+        user = users[index]
+        http_request = factory.post("/polls/vote", {
+            "question_id": question_id, "choice": choice_ids[index % len(choice_ids)],
+        })
+        http_request.user = user
+        http_request._dont_enforce_csrf_checks = True
+        # 요청 시작/종료처럼 connection 정리 (CONN_MAX_AGE 가 0이면 요청마다 새 connection)
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            response = views.vote(http_request)
+            ok = response.status_code == 302
+        except DatabaseError:
+            ok = False
+        elapsed = time.perf_counter() - started
+        close_old_connections()
+        return ok, elapsed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        results = list(executor.map(request, range(len(users))))
+    elapsed = time.perf_counter() - started
+    connections.close_all()
+    return elapsed, results
+
+
+class Command(BaseCommand):
+    help = "SQLite 설정(기본/운영)별 동시 투표 처리량을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", choices=("both",) + PROFILES, default="both")
+        parser.add_argument("--votes", type=int, default=2000, help="전체 투표 수 (사용자 수)")
+        parser.add_argument("--concurrency", type=int, default=16, help="동시 투표 수")
+
+    def handle(self, *args, **options):
+        if options["profile"] == "both":
+            # 설정마다 새 프로세스, 새 DB 파일로 실행
+            with tempfile.TemporaryDirectory() as directory:
+                for profile in PROFILES:
+                    env = {**os.environ, "POLLS_SQLITE_PROFILE": profile,
+                           "POLLS_DB_NAME": os.path.join(directory, f"bench-{profile}.sqlite3")}
+                    env.pop("POLLS_DB_REPLICA", None)
+                    subprocess.run(
+                        [sys.executable, sys.argv[0], "bench_votes", "--profile", profile,
+                         "--votes", str(options["votes"]),
+                         "--concurrency", str(options["concurrency"])],
+                        env=env, check=True,
+                    )
+            return
+
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir},
+        }):
+            self.run_profile(options)
+
+    def run_profile(self, options):
+        call_command("migrate", verbosity=0)
+        question = Question.objects.create(question_text="bench_votes")
+        Choice.objects.bulk_create(Choice(question=question, choice_text=f"보기 {i}") for i in range(4))
+        choice_ids = list(question.choice_set.values_list("pk", flat=True))
+        User = get_user_model()
+        User.objects.bulk_create(User(username=f"bench-{i}") for i in range(options["votes"]))
+        users = list(User.objects.filter(username__startswith="bench-").order_by("pk"))
+        journal_mode = connection.cursor().execute("PRAGMA journal_mode").fetchone()[0]
+        connections.close_all()
+
+        elapsed, results = bench(users, choice_ids, question.pk, options["concurrency"])
+
+        latencies = sorted(r[1] * 1000 for r in results)
+        succeeded = sum(1 for ok, _ in results if ok)
+        votes = sum(choice.votes for choice in Choice.objects.filter(question=question))
+        self.stdout.write(
+            f"[{options['profile']}] journal_mode={journal_mode}, {len(results)}건, 동시 {options['concurrency']} "
+            f"- {succeeded / elapsed:.0f} votes/s, "
+            f"p50 {statistics.median(latencies):.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms, "
+            f"실패 {len(results) - succeeded}건 (저장된 Vote {Vote.objects.count()}, 투표수 {votes})"
+        )
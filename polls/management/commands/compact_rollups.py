@@ -0,0 +1,19 @@
+# polls/management/commands/compact_rollups.py
+# python manage.py compact_rollups
+#  - 보관 기간이 지난 분 단위 투표수를 시간 단위로, 시간 단위를 일 단위로 합친다. (polls/rollups.py)
+#  - cron 등으로 주기적으로(ex: 1시간마다) 실행.
+
+from django.core.management.base import BaseCommand
+
+from polls.rollups import compact_rollups
+
+
+class Command(BaseCommand):
+    help = "오래된 분/시간 단위 투표수 집계를 시간/일 단위로 합칩니다."
+
+    def handle(self, *args, **options):
+        result = compact_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"분 단위 {result['minute']}건 -> 시간 단위, 시간 단위 {result['hour']}건 -> 일 단위로 합쳤습니다. "
+            f"(오래된 일 단위 {result['day']}건 삭제)"
+        ))
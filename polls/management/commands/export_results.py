@@ -0,0 +1,33 @@
+# polls/management/commands/export_results.py
+# python manage.py export_results [--format csv|jsonl] [--since 2025-07-01] [--output 파일경로]
+#  - 모든 설문의 질문/보기/투표수를 CSV 또는 JSONL로 내보낸다. (--output 생략: 화면 출력)
+#  - --since: 그 일시 이후 등록되었거나 투표가 있었던 설문만 내보낸다.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.export import EXPORT_FORMATS, export_lines, parse_since
+
+
+class Command(BaseCommand):
+    help = "설문 결과를 CSV/JSONL로 내보냅니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--since", help="YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS")
+        parser.add_argument("--output", help="저장할 파일 경로")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="DB에서 한번에 가져올 행 수")
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options["since"]) if options["since"] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lines = export_lines(options["format"], since, options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
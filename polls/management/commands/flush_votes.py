@@ -0,0 +1,29 @@
+# polls/management/commands/flush_votes.py
+# python manage.py flush_votes [--loop 초]
+#  - 투표 로그(settings.POLLS_VOTE_LOG_DIR)를 Choice별 증가량으로 합쳐서 DB에 반영.
+#  - 서버 재시작 후 실행하면 반영되지 않고 남아있던 로그를 다시 반영(replay)한다.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from polls.vote_buffer import flush_vote_log
+
+
+class Command(BaseCommand):
+    help = "투표 로그를 DB에 반영합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", type=float, default=0,
+            help="지정한 초 간격으로 계속 반영 (0: 한번만 실행)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["loop"]
+        while True:
+            applied = flush_vote_log()
+            self.stdout.write(f"{applied}표를 반영했습니다.")
+            if interval <= 0:
+                break
+            time.sleep(interval)
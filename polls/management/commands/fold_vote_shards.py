@@ -0,0 +1,15 @@
+# polls/management/commands/fold_vote_shards.py
+# python manage.py fold_vote_shards
+#  - 샤드 카운터(ChoiceVoteShard)에 쌓인 투표수를 Choice.votes 컬럼으로 합친다.
+
+from django.core.management.base import BaseCommand
+
+from polls.counters import fold_vote_shards
+
+
+class Command(BaseCommand):
+    help = "샤드 카운터에 누적된 투표수를 Choice.votes 로 합칩니다."
+
+    def handle(self, *args, **options):
+        folded = fold_vote_shards()
+        self.stdout.write(self.style.SUCCESS(f"{folded}표를 Choice.votes로 옮겼습니다."))
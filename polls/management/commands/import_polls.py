@@ -0,0 +1,142 @@
+# polls/management/commands/import_polls.py
+# python manage.py import_polls 파일경로 [--format csv|jsonl] [--batch-size 1000] [--workers 4] [--restart]
+#
+# 대량의 설문(질문 + 보기들)을 파일에서 읽어서 등록.
+#  - 파일을 한번에 읽지 않고 batch-size 줄씩 읽어서 처리(generator) -> 파일 크기와 관계없이 메모리 사용량 일정.
+#  - batch 단위로 polls.bulk.create_polls() (Question, Choice bulk_create)
+#  - 체크포인트: batch를 저장하는 transaction에서 처리한 위치(byte offset)를 같이 저장 (polls.models.ImportCheckpoint)
+#                -> batch 저장과 체크포인트가 항상 같이 commit 된다. (중단되어도 같은 batch를 두번 등록하지 않음)
+#                중간에 중단되면 다시 실행했을 때 저장된 위치부터 이어서 처리. (--restart: 처음부터)
+#  - --workers N: N개의 프로세스로 줄 parsing을 병렬 처리. (DB 저장은 순서대로 하나의 프로세스에서)
+#
+# 파일 형식 (UTF-8)
+#  - jsonl: 한줄에 설문 하나. {"question_text": "질문", "choices": ["보기1", "보기2"]} (object가 아닌 줄은 형식 오류)
+#  - csv  : 첫줄은 header. 첫번째 컬럼은 질문, 나머지 컬럼들은 보기. (빈 값은 무시)
+#           질문,보기1,보기2,보기3  (한 행은 한줄 - 값 안의 줄바꿈은 지원하지 않음)
+
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from polls.bulk import create_polls
+from polls.models import ImportCheckpoint
+
+
+def parse_lines(lines, file_format):
+    # 줄(bytes)들을 [(질문, [보기들]), ...] 로 변환. 빈 줄/질문이 없는 줄은 무시.
+    # (--workers 사용시 다른 프로세스에서 실행되므로 module 함수로 정의)
+    polls = []
+    for line in lines:
+        line = line.decode("utf-8").strip()
+        if not line:
+            continue
+        if file_format == "jsonl":
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError(f"설문은 JSON object 입니다: {line[:50]}")
+            question_text = data.get("question_text")
+            choice_texts = data.get("choices") or []
+            if not isinstance(question_text, (str, type(None))) or not isinstance(choice_texts, list) \
+                    or not all(isinstance(text, str) for text in choice_texts):
+                raise ValueError(f"question_text는 문자열, choices는 문자열 list 입니다: {line[:50]}")
+        else:
+            row = next(csv.reader([line]))
+            question_text, choice_texts = (row[0], row[1:]) if row else (None, [])
+        if question_text:
+            polls.append((question_text, [text for text in choice_texts if text]))
+    return polls
+
+
+def read_batches(path, offset, batch_size):
+    # offset 위치부터 batch_size 줄씩 읽어서 (줄 리스트, 다음 offset) 반환하는 generator
+    with open(path, "rb") as f:
+        f.seek(offset)
+        lines = []
+        for line in f:
+            lines.append(line)
+            offset += len(line)
+            if len(lines) >= batch_size:
+                yield lines, offset
+                lines = []
+        if lines:
+            yield lines, offset
+
+
+def parsed_batches(batches, file_format, workers):
+    # (줄 리스트, offset) -> (설문 리스트, offset) 변환 generator
+    if workers <= 1:
+        for lines, offset in batches:
+            yield parse_lines(lines, file_format), offset
+        return
+
+    # worker 개수 * 2 개의 batch 씩 읽어서 병렬 parsing.(한번에 읽는 양을 제한 -> 메모리 제한)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            window = [batch for _, batch in zip(range(workers * 2), batches)]
+            if not window:
+                break
+            futures = [executor.submit(parse_lines, lines, file_format) for lines, _ in window]
+            for future, (_, offset) in zip(futures, window):
+                yield future.result(), offset
+
+
+class Command(BaseCommand):
+    help = "CSV/JSONL 파일의 설문들을 등록합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="설문 파일 경로")
+        parser.add_argument("--format", choices=["csv", "jsonl"],
+                            help="파일 형식 (생략하면 확장자로 판단)")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="한번에 저장할 설문 수")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="parsing 병렬 처리 프로세스 수")
+        parser.add_argument("--restart", action="store_true",
+                            help="체크포인트를 무시하고 처음부터 처리")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"파일이 없습니다: {path}")
+        file_format = options["format"] or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+        key = str(path.resolve())
+
+        # 시작 위치: 체크포인트 -> csv header 다음
+        if options["restart"]:
+            ImportCheckpoint.objects.filter(path=key).delete()
+        checkpoint = ImportCheckpoint.objects.filter(path=key).first()
+        offset = checkpoint.offset if checkpoint else 0
+        if offset:
+            self.stdout.write(f"체크포인트 {offset} byte 부터 이어서 처리합니다.")
+        if offset == 0 and file_format == "csv":
+            with open(path, "rb") as f:
+                offset = len(f.readline())
+
+        batches = read_batches(path, offset, options["batch_size"])
+        total_size = path.stat().st_size
+        imported = 0
+        started = time.monotonic()
+        try:
+            for polls, offset in parsed_batches(batches, file_format, options["workers"]):
+                # batch 저장 + 체크포인트를 하나의 transaction으로
+                with transaction.atomic():
+                    create_polls(polls)
+                    ImportCheckpoint.objects.update_or_create(path=key, defaults={"offset": offset})
+                imported += len(polls)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{imported}개 등록 ({offset * 100 / total_size:.1f}%) "
+                    f"- {imported / elapsed if elapsed else 0:.0f}개/초"
+                )
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CommandError(f"{offset} byte 이후 데이터 형식 오류: {e}")
+
+        ImportCheckpoint.objects.filter(path=key).delete() # 완료 -> 체크포인트 삭제
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: {imported}개 설문 등록, {time.monotonic() - started:.1f}초"
+        ))
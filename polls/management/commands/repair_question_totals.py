@@ -0,0 +1,20 @@
+# polls/management/commands/repair_question_totals.py
+# python manage.py repair_question_totals [--batch-size 500]
+#  - Question.total_votes, choice_count 를 보기들로 다시 계산한다. (GROUP BY 한번)
+#  - 값이 다른 질문만 bulk_update. (관리자 화면에서 votes를 직접 수정한 경우 등)
+#  - 샤드 카운터 모드면 fold_vote_shards 를 먼저 실행해야 샤드의 투표수까지 반영된다.
+
+from django.core.management.base import BaseCommand
+
+from polls.counters import recompute_question_totals
+
+
+class Command(BaseCommand):
+    help = "Question.total_votes, choice_count 를 보기들의 집계로 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="UPDATE 한번에 수정할 질문 수")
+
+    def handle(self, *args, **options):
+        repaired = recompute_question_totals(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{repaired}개 질문의 집계값을 수정했습니다."))
@@ -0,0 +1,44 @@
+# polls/management/commands/sync_replica.py
+# python manage.py sync_replica [--loop 초]
+#  - 로컬 테스트용: primary(default) SQLite DB를 replica SQLite 파일로 복사. (SQLite online backup)
+#  - replica가 primary와 같은 파일이면 복사할 필요가 없다.
+
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from polls.routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = "primary SQLite DB를 replica SQLite 파일로 복사합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", type=float, default=0,
+                            help="지정한 초 간격으로 계속 복사 (0: 한번만 실행)")
+
+    def handle(self, *args, **options):
+        if REPLICA_ALIAS not in connections.settings:
+            raise CommandError("DATABASES에 replica 설정이 없습니다. (POLLS_DB_REPLICA 환경변수)")
+        primary = connections.settings["default"]
+        replica = connections.settings[REPLICA_ALIAS]
+        if "sqlite3" not in primary["ENGINE"] or "sqlite3" not in replica["ENGINE"]:
+            raise CommandError("SQLite DB만 복사할 수 있습니다.")
+        if str(primary["NAME"]) == str(replica["NAME"]):
+            self.stdout.write("replica가 primary와 같은 파일입니다. 복사하지 않습니다.")
+            return
+
+        while True:
+            source = sqlite3.connect(primary["NAME"])
+            target = sqlite3.connect(replica["NAME"])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(f"{primary['NAME']} -> {replica['NAME']} 복사 완료")
+            if options["loop"] <= 0:
+                break
+            time.sleep(options["loop"])
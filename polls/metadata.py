@@ -0,0 +1,182 @@
+# polls/metadata.py - 질문/보기 정보(metadata) read-through cache
+#
+# 설문폼/결과 페이지는 같은 인기 질문들을 반복해서 조회한다.
+# 질문 내용(question_text, pub_date, 마감 정보)과 보기 문장(choice_text)은 거의 바뀌지 않는다. (투표수만 계속 바뀐다)
+#  => 바뀌지 않는 정보만 cache, 투표수는 cache하지 않고 매번 DB에서 조회.
+#
+# 조회 순서 (read-through)
+#  0. 질문의 version - 프로세스 안에서 settings.POLLS_METADATA_VERSION_TTL 초 동안 재사용 (polls/page_cache.py)
+#     -> 그 동안은 1에서 찾으면 공유 cache 왕복 없음. (다른 프로세스의 수정은 최대 TTL 초 늦게 보인다)
+#  1. 프로세스 안의 LRU cache (크기 제한: settings.POLLS_METADATA_LRU_SIZE, 가장 오래 사용하지 않은 것부터 제거)
+#  2. 공유 cache (settings.CACHES - 여러 프로세스/서버가 같이 사용)
+#  3. DB (Question.objects.with_choices) -> 2, 1에 저장
+#
+# 질문/보기가 수정되면 polls/signals.py가 페이지 cache의 "question:<id>" version을 증가 (polls/page_cache.py)
+#  -> cache에 같이 저장한 version과 다르면 다시 조회. (다른 프로세스의 LRU cache도 무효화된다)
+#  - version이 모든 프로세스에 보여야 한다 -> 공유 cache(settings.CACHES)가 아니면 1, 2를 사용하지 않고 DB 조회.
+#  - replica에서 조회한 요청은 최근에 바뀐 질문의 정보를 저장하지 않는다. (replica의 예전 내용일 수 있다)
+#
+# metadata_cache.stats(): 프로세스 LRU cache의 hit/miss/eviction 횟수 (polls/api/metadata_cache_stats)
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .counters import get_vote_shards
+from .models import Choice, Question
+from .page_cache import aget_local_versions, cache_is_shared, get_local_versions, replica_may_be_stale
+
+
+def _version_name(question_id):
+    return f"question:{question_id}"
+
+
+def _version_ttl():
+    return getattr(settings, "POLLS_METADATA_VERSION_TTL", 1.0)
+
+
+def _cache_key(question_id, version):
+    return f"polls:metadata:{question_id}:{version}"
+
+
+class LRUCache:
+    # 크기 제한이 있는 LRU cache (thread safe)
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0         # 프로세스 cache에서 찾은 횟수
+        self.misses = 0       # 프로세스 cache에 없었던 횟수
+        self.shared_hits = 0  # 그 중 공유 cache에서 찾은 횟수 (나머지는 DB 조회)
+        self.evictions = 0    # 크기 제한으로 제거한 횟수
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.data.move_to_end(key) # 최근 사용
+            return value
+
+    def record_shared_hit(self):
+        with self.lock:
+            self.shared_hits += 1
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False) # 가장 오래 사용하지 않은 것 제거
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.shared_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.data), "maxsize": self.maxsize,
+                "hits": self.hits, "shared_hits": self.shared_hits,
+                "misses": self.misses, "evictions": self.evictions,
+            }
+
+
+metadata_cache = LRUCache(getattr(settings, "POLLS_METADATA_LRU_SIZE", 512))
+
+
+def to_metadata(question):
+    # Question(choice_list 포함) -> cache에 저장할 값 (투표수 제외)
+    return {
+        "id": question.pk,
+        "question_text": question.question_text,
+        "pub_date": question.pub_date,
+        "closed": question.closed,
+        "end_date": question.end_date,
+        "choices": [(choice.pk, choice.choice_text) for choice in question.choice_list],
+    }
+
+
+def from_metadata(metadata, votes=None):
+    # cache 값 -> Question(choice_list 포함). DB 조회 없이 만든 객체 (저장하면 안된다)
+    #  votes: {choice_id: (votes, shard_votes)} - 없으면 투표수 0
+    votes = votes or {}
+    question = Question(pk=metadata["id"], question_text=metadata["question_text"],
+                        pub_date=metadata["pub_date"], closed=metadata["closed"],
+                        end_date=metadata["end_date"])
+    question.choice_list = []
+    for choice_id, choice_text in metadata["choices"]:
+        choice_votes, shard_votes = votes.get(choice_id, (0, 0))
+        choice = Choice(pk=choice_id, question=question, choice_text=choice_text, votes=choice_votes)
+        choice.shard_votes = shard_votes
+        question.choice_list.append(choice)
+    return question
+
+
+def _votes_query(question_id):
+    # 보기별 (votes, 샤드 합계)만 조회
+    choices = Choice.objects.filter(question_id=question_id)
+    if get_vote_shards() > 1:
+        return choices.with_shard_votes().values_list("pk", "votes", "shard_votes")
+    return choices.values_list("pk", "votes")
+
+
+def _votes(rows):
+    return {row[0]: (row[1], row[2] if len(row) > 2 else 0) for row in rows}
+
+
+def _store(key, metadata):
+    cache.set(key, metadata, getattr(settings, "POLLS_METADATA_CACHE_TIMEOUT", 3600))
+    metadata_cache.set(key, metadata)
+
+
+def cached_question(question_id, with_votes=False):
+    # question_id 질문 + 보기들(question.choice_list). with_votes=True: 투표수도 조회(choice.vote_count)
+    # 질문이 없으면 Question.DoesNotExist
+    question_id = int(question_id)
+    if not cache_is_shared():
+        return Question.objects.with_choices(question_id, with_votes=with_votes)
+    versions = get_local_versions([_version_name(question_id)], _version_ttl())
+    key = _cache_key(question_id, versions[_version_name(question_id)])
+    metadata = metadata_cache.get(key)
+    if metadata is None:
+        metadata = cache.get(key)
+        if metadata is None:
+            # DB 조회 - 투표수도 같이 조회되므로 그대로 반환
+            question = Question.objects.with_choices(question_id, with_votes=with_votes)
+            if not replica_may_be_stale(versions):
+                _store(key, to_metadata(question))
+            return question
+        metadata_cache.record_shared_hit()
+        metadata_cache.set(key, metadata)
+    return from_metadata(metadata, _votes(_votes_query(question_id)) if with_votes else None)
+
+
+async def acached_question(question_id, with_votes=False):
+    # cached_question()의 async 버전
+    question_id = int(question_id)
+    if not cache_is_shared():
+        return await Question.objects.awith_choices(question_id, with_votes=with_votes)
+    versions = await aget_local_versions([_version_name(question_id)], _version_ttl())
+    key = _cache_key(question_id, versions[_version_name(question_id)])
+    metadata = metadata_cache.get(key)
+    if metadata is None:
+        metadata = await cache.aget(key)
+        if metadata is None:
+            question = await Question.objects.awith_choices(question_id, with_votes=with_votes)
+            if not replica_may_be_stale(versions):
+                metadata = to_metadata(question)
+                await cache.aset(key, metadata, getattr(settings, "POLLS_METADATA_CACHE_TIMEOUT", 3600))
+                metadata_cache.set(key, metadata)
+            return question
+        metadata_cache.record_shared_hit()
+        metadata_cache.set(key, metadata)
+    votes = _votes([row async for row in _votes_query(question_id)]) if with_votes else None
+    return from_metadata(metadata, votes)
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:08
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_question_totals(apps, schema_editor):
+    # 기존 질문들의 total_votes, choice_count 계산 (보기 GROUP BY 한번)
+    Question = apps.get_model('polls', 'Question')
+    using = schema_editor.connection.alias
+    rows = Question.objects.using(using).annotate(
+        votes_sum=Coalesce(Sum('choice__votes'), 0), choices=Count('choice'),
+    ).values_list('pk', 'votes_sum', 'choices')
+    questions = [
+        Question(pk=pk, total_votes=votes_sum, choice_count=choices)
+        for pk, votes_sum, choices in rows
+    ]
+    Question.objects.using(using).bulk_update(questions, ['total_votes', 'choice_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_question_version_modified_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='choice_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='total_votes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-total_votes', '-id'], name='question_total_votes_idx'),
+        ),
+        migrations.RunPython(fill_question_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0010_trendingscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteRollupDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('votes', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'bucket'], name='vote_rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('choice', 'bucket'), name='unique_vote_rollup_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VoteRollupHour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('votes', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'bucket'], name='vote_rollup_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('choice', 'bucket'), name='unique_vote_rollup_hour')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VoteRollupMinute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('votes', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'bucket'], name='vote_rollup_minute_idx')],
+                'constraints': [models.UniqueConstraint(fields=('choice', 'bucket'), name='unique_vote_rollup_minute')],
+            },
+        ),
+    ]
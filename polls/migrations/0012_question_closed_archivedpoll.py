@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0011_vote_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPoll',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('question_text', models.CharField(max_length=200)),
+                ('pub_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('results', models.JSONField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='closed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='end_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0013_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='voterollupminute',
+            name='unique_vote_rollup_minute',
+        ),
+        migrations.AddField(
+            model_name='voterollupminute',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='voterollupminute',
+            constraint=models.UniqueConstraint(fields=('choice', 'bucket', 'shard'), name='unique_vote_rollup_minute_shard'),
+        ),
+    ]
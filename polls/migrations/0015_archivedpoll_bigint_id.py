@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0014_vote_rollup_minute_shard'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedpoll',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
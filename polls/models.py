@@ -1,6 +1,9 @@
 # polls/models.py
 
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 # Model class ---- DB Table
 ## DB 테이블당 Model class를 정의
@@ -8,6 +11,53 @@ from django.db import models
 ## class변수로 DB Table의 컬럼과 연결된 변수들(Field)를 선언.
 ### - 변수명(컬럼명) = ModelField(type, 제약조건등 설정)
 
+# Question 조회용 Manager
+class QuestionManager(models.Manager):
+
+    def with_choices(self, pk, with_votes=False):
+        # 질문과 보기들을 한번의 query로 조회.
+        #  - Choice를 조회하면서 select_related("question")으로 질문을 JOIN.
+        #  - 보기가 없는 질문이면 질문만 다시 조회.
+        #  - 조회한 보기들은 question.choice_list 에 저장.
+        #  - with_votes=True: 샤드 카운터 합계도 같이 조회(choice.vote_count)
+        #  - 질문이 없으면 Question.DoesNotExist 발생.
+        choices = Choice.objects.select_related("question").filter(question_id=pk).order_by("pk")
+        if with_votes:
+            choices = choices.with_shard_votes()
+        choice_list = list(choices)
+        question = choice_list[0].question if choice_list else self.get(pk=pk)
+        for choice in choice_list:
+            choice.question = question  # 모든 보기가 같은 Question 객체를 참조.
+        question.choice_list = choice_list
+        return question
+
+    def many_with_choices(self, pks, with_votes=False):
+        # 여러 질문과 보기들을 두번의 query로 조회 (설문 모드 - polls/survey.py)
+        #  - pks 순서대로 반환, 없는 질문은 제외. 보기들은 question.choice_list 에 저장.
+        questions = self.in_bulk(pks)
+        choices = Choice.objects.filter(question_id__in=questions).order_by("pk")
+        if with_votes:
+            choices = choices.with_shard_votes()
+        for question in questions.values():
+            question.choice_list = []
+        for choice in choices:
+            choice.question = questions[choice.question_id]
+            choice.question.choice_list.append(choice)
+        return [questions[pk] for pk in pks if pk in questions]
+
+    async def awith_choices(self, pk, with_votes=False):
+        # with_choices()의 async 버전 (async view에서 사용)
+        choices = Choice.objects.select_related("question").filter(question_id=pk).order_by("pk")
+        if with_votes:
+            choices = choices.with_shard_votes()
+        choice_list = [choice async for choice in choices]
+        question = choice_list[0].question if choice_list else await self.aget(pk=pk)
+        for choice in choice_list:
+            choice.question = question
+        question.choice_list = choice_list
+        return question
+
+
 # Question (설문의 질문을 저장할 Model(table))
 class Question(models.Model):
     # Model Field 들 선언 
@@ -22,6 +72,32 @@ class Question(models.Model):
     # auto_now - insert/update 할 때 시점의 일시를 자동으로 저장(수정일시)
 
     # default: not null. Field에서 nullable 설정-> null=True
+
+    # 결과 변경 확인용 - 투표/보기 변경시 version을 1 증가, modified_at을 변경 (polls/counters.py)
+    ## JSON API의 ETag/Last-Modified 로 사용 -> 변경이 없으면 304 응답.
+    version = models.PositiveIntegerField(default=0)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    # 보기들의 집계값을 질문에 저장(비정규화) - 목록에서 Choice를 집계(GROUP BY)하지 않고 조회/정렬.
+    ## total_votes: 보기들의 votes 합계 (투표수 증가와 같은 transaction에서 변경 - polls/counters.py)
+    ##              샤드 카운터 모드에서는 fold_vote_shards() 때 반영.
+    ## choice_count: 보기 개수 (보기 등록/삭제와 같은 transaction에서 변경 - polls/signals.py, polls/bulk.py)
+    ## 값이 맞지 않으면: python manage.py repair_question_totals
+    total_votes = models.IntegerField(default=0)
+    choice_count = models.IntegerField(default=0)
+
+    # 설문 마감 - closed=True 이거나 end_date(마감일시)가 지나면 투표할 수 없다.
+    ## 마감 후 오래된 설문은 ArchivedPoll로 옮기고 삭제 (python manage.py archive_polls)
+    closed = models.BooleanField(default=False)
+    end_date = models.DateTimeField(null=True, blank=True)
+
+    objects = QuestionManager()
+
+    class Meta:
+        indexes = [
+            # 목록의 "투표 많은 순" 정렬 (ORDER BY total_votes DESC, id DESC)
+            models.Index(fields=["-total_votes", "-id"], name="question_total_votes_idx"),
+        ]
    
     def __str__(self):
         # 모델 instance를 출력/문자열로변환 할때 나올 값을 str로 반환.
@@ -29,6 +105,35 @@ class Question(models.Model):
         # self.pk -> Primary key Field의 값을 반환.
         return f"{self.pk}. {self.question_text}"
 
+    def is_open(self, now=None):
+        # 투표할 수 있는 설문인지 여부
+        if self.closed:
+            return False
+        return self.end_date is None or self.end_date > (now or timezone.now())
+
+    def results_data(self):
+        # 투표 결과를 dictionary로 반환 (JSON 응답용).
+        # Question.objects.with_choices(pk, with_votes=True) 로 조회한 질문에서 사용.
+        return {
+            "id": self.pk,
+            "question_text": self.question_text,
+            "pub_date": self.pub_date,
+            "choices": [
+                {"id": choice.pk, "choice_text": choice.choice_text, "votes": choice.vote_count}
+                for choice in self.choice_list
+            ],
+        }
+
+
+# Choice 조회용 QuerySet
+class ChoiceQuerySet(models.QuerySet):
+
+    def with_shard_votes(self):
+        # 샤드 카운터 합계를 shard_votes 로 annotate -> Choice.vote_count 에서 사용.
+        return self.annotate(
+            shard_votes=Coalesce(models.Sum("vote_shards__count"), 0)
+        )
+
 
 # Choice(질문의 보기들을 저장할 Model)
 class Choice(models.Model):
@@ -40,10 +145,174 @@ class Choice(models.Model):
         on_delete=models.CASCADE, # 부모 테이블에서 참조하는 값이 삭제되면 같이 삭제. (models.SET_NULL - NULL로 업데이트)
     )
     # FK 설정 - ForeignKey(참조 Model클래스, on_delete설정)
+
+    objects = ChoiceQuerySet.as_manager()
+
     # class Meta:
     #     db_table="테이블이름"
     def __str__(self):
         return f"{self.pk}. {self.choice_text}"
 
+    @property
+    def vote_count(self):
+        # 전체 투표수 = votes 컬럼 + 아직 votes로 합쳐지지(fold) 않은 샤드 카운터들의 합계.
+        # 샤드 모드(settings.POLLS_VOTE_SHARDS > 1)가 아니면 샤드 row가 없으므로 votes와 같다.
+        # Choice.objects.with_shard_votes() 로 조회한 경우 annotate된 값을 사용(추가 query 없음).
+        shard_votes = getattr(self, "shard_votes", None)
+        if shard_votes is None:
+            shard_votes = self.vote_shards.aggregate(
+                total=models.Sum("count"))["total"] or 0
+        # pending_votes: 투표 로그에 있는 미반영 투표수(vote_result에서 "merged" 모드일 때 설정)
+        return self.votes + shard_votes + getattr(self, "pending_votes", 0)
+
+
+# Choice의 투표수를 N개의 row로 나눠서 저장하는 샤드 카운터(Sharded counter)
+## 인기 설문에 동시 투표가 몰리면 같은 Choice row의 lock을 기다리면서 직렬화된다.
+## 투표를 N개의 샤드 row 중 하나에 나눠서 증가시키면 lock 경합이 1/N 로 줄어든다.
+## 읽을 때는 Choice.votes + 샤드 count 합계 (Choice.vote_count)
+class ChoiceVoteShard(models.Model):
+    choice = models.ForeignKey(
+        Choice,
+        on_delete=models.CASCADE,
+        related_name="vote_shards",
+    )
+    shard = models.PositiveSmallIntegerField() # 샤드 번호 (0 ~ N-1)
+    count = models.IntegerField(default=0)     # 이 샤드에 누적된 투표수
+
+    class Meta:
+        # (choice, shard) 당 하나의 row만 존재.
+        constraints = [
+            models.UniqueConstraint(fields=["choice", "shard"], name="unique_choice_vote_shard"),
+        ]
+
+    def __str__(self):
+        return f"{self.choice_id}[{self.shard}] - {self.count}"
+
 # python manage.py makemigrations   [polls]
-# python manage.py migrate
\ No newline at end of file
+# python manage.py migrate
+
+# 투표 로그(polls/vote_buffer.py)의 DB 반영 기록
+## segment 파일을 반영할 때 같은 transaction으로 이름을 저장 -> 같은 파일을 두번 반영하지 않는다.
+class VoteLogSegment(models.Model):
+    name = models.CharField(max_length=100, unique=True) # segment 파일 이름
+    applied_at = models.DateTimeField(auto_now_add=True) # 반영 일시
+
+    def __str__(self):
+        return f"{self.name} - {self.applied_at}"
+
+
+# 설문 import(python manage.py import_polls)의 체크포인트
+## batch 저장과 같은 transaction에서 다음에 읽을 위치를 저장 -> commit된 batch와 항상 일치한다.
+## (중간에 중단된 후 다시 실행하면 이 위치부터 이어서 처리 - 같은 batch를 두번 등록하지 않는다)
+class ImportCheckpoint(models.Model):
+    path = models.CharField(max_length=500, unique=True) # import 파일의 절대 경로
+    offset = models.BigIntegerField(default=0)           # 다음에 읽을 위치(byte offset)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.path} - {self.offset}"
+
+
+# 투표 기록(Vote ledger) - 사용자가 어떤 질문에 투표했는지 저장.
+## (user, question) unique -> 중복 투표 확인은 index 조회 한번 또는 insert 충돌로 처리.
+class Vote(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    choice = models.ForeignKey(
+        Choice,
+        on_delete=models.SET_NULL,
+        null=True, # 예전 voted_question 쿠키에서 옮긴 기록은 선택한 보기를 알 수 없다.
+        blank=True,
+    )
+    voted_at = models.DateTimeField(auto_now_add=True, db_index=True) # 투표 일시 (변경된 설문 조회용 index)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "question"], name="unique_user_question_vote"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.question_id}"
+
+
+# 인기 급상승 순위 점수 (polls/trending.py)
+## 투표마다 시간 감소(decay) 점수를 메모리에서 갱신하고, 주기적으로 이 테이블에 저장(snapshot).
+## log_score: 기준일시(trending.EPOCH) 기준 log 점수 -> 시간이 지나도 저장된 값을 바꾸지 않고 비교할 수 있다.
+class TrendingScore(models.Model):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True)
+    log_score = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f"{self.question_id} - {self.log_score}"
+
+
+# 투표수 시계열 집계(rollup) - 보기별 분/시간/일 단위 투표수 (polls/rollups.py)
+## Choice.votes는 누적 합계만 저장 -> 시간대별 투표수를 알 수 없다.
+## 투표시 분 단위 row를 증가, 오래된 분 단위 row는 시간 단위로, 오래된 시간 단위 row는 일 단위로 합친다.
+class VoteRollup(models.Model):
+    question = models.ForeignKey(Question, on_delete=models.CASCADE) # 질문별 조회용 (Choice JOIN 없이)
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    bucket = models.DateTimeField()            # 구간 시작일시 (분/시간/일 단위로 자른 일시)
+    votes = models.IntegerField(default=0)     # 구간의 투표수
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.choice_id} {self.bucket} - {self.votes}"
+
+
+class VoteRollupMinute(VoteRollup):
+    # 샤드 모드(settings.POLLS_VOTE_SHARDS > 1)는 구간 row도 나눠서 증가 -> 같은 row의 lock 경합을 피한다.
+    # (조회/압축은 샤드 row들을 합산. 시간/일 단위는 압축때만 쓰므로 나누지 않는다)
+    shard = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["choice", "bucket", "shard"], name="unique_vote_rollup_minute_shard"),
+        ]
+        indexes = [models.Index(fields=["question", "bucket"], name="vote_rollup_minute_idx")]
+
+
+class VoteRollupHour(VoteRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["choice", "bucket"], name="unique_vote_rollup_hour"),
+        ]
+        indexes = [models.Index(fields=["question", "bucket"], name="vote_rollup_hour_idx")]
+
+
+class VoteRollupDay(VoteRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["choice", "bucket"], name="unique_vote_rollup_day"),
+        ]
+        indexes = [models.Index(fields=["question", "bucket"], name="vote_rollup_day_idx")]
+
+
+# 보관(archive)된 설문 - 마감된 오래된 설문의 질문/보기/투표수를 JSON 하나로 저장 (polls/archive.py)
+## Question/Choice/Vote 등 자주 조회하는 테이블(과 index)에서는 삭제 -> 목록/개수 조회 대상이 줄어든다.
+## vote_result 에서 이 snapshot으로 결과를 보여준다.
+class ArchivedPoll(models.Model):
+    id = models.BigIntegerField(primary_key=True) # 원래 Question의 id (Question.id와 같은 BigAutoField 범위)
+    question_text = models.CharField(max_length=200)
+    pub_date = models.DateTimeField()
+    end_date = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # 보기별 결과 [[choice_id, choice_text, votes], ...]
+    results = models.JSONField()
+
+    def __str__(self):
+        return f"{self.pk}. {self.question_text} (보관)"
+
+    def as_question(self):
+        # snapshot -> Question(choice_list 포함) - vote_result template에서 사용. (저장하면 안된다)
+        question = Question(pk=self.pk, question_text=self.question_text, pub_date=self.pub_date,
+                            end_date=self.end_date, closed=True)
+        question.choice_list = []
+        for choice_id, choice_text, votes in self.results:
+            choice = Choice(pk=choice_id, question=question, choice_text=choice_text, votes=votes)
+            choice.shard_votes = 0
+            question.choice_list.append(choice)
+        question.archived = True
+        return question
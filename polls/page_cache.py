@@ -0,0 +1,247 @@
+# polls/page_cache.py - 페이지 cache (목록/설문폼/결과)
+#
+# 목록/설문폼/결과 페이지는 설문이 등록되거나 투표가 있을 때만 내용이 바뀐다.
+#  - 로그인 안한 사용자: 응답 페이지 전체를 cache (모든 사용자에게 같은 화면)
+#  - 로그인 한 사용자: 메뉴(사용자 이름)가 다르다 -> template의 {% cache %} 로 질문목록/보기 부분만 cache
+#
+# cache key에 version 번호를 포함 -> 내용이 바뀌면 version을 증가시켜서 해당 key들만 무효화.
+# (TTL이 지나기를 기다리지 않는다. 예전 key는 사용되지 않다가 cache에서 제거된다.)
+#  - "list"             : 질문 등록/수정/삭제 -> 목록 페이지
+#  - "question:<id>"    : 질문/보기 등록/수정/삭제 -> 그 질문의 설문폼, 결과 페이지
+#  - "results:<id>"     : 투표 -> 그 질문의 결과 페이지
+#  - "list:votes"       : Question.total_votes 변경 -> "투표 많은 순" 목록 페이지
+# version 증가: polls/signals.py(Question/Choice 저장/삭제), polls/bulk.py(bulk 등록), record_vote(투표),
+#               polls/vote_buffer.py(투표 로그 반영)
+#
+# 설정: settings.POLLS_PAGE_CACHE (사용 여부), settings.POLLS_PAGE_CACHE_TIMEOUT (cache 유지 시간(초))
+#  - version은 모든 프로세스가 같이 봐야 한다 -> 공유 cache(settings.CACHES)가 아니면 사용하지 않는다.
+#  - version 값 = 변경한 시각(ns). replica에서 조회한 요청은 최근(POLLS_REPLICA_STICKY_SECONDS 이내)에
+#    바뀐 version의 페이지를 저장하지 않는다. (replica에 아직 반영되지 않은 예전 내용이 새 version으로 cache되지 않도록)
+
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+
+from .routers import reading_from_replica
+
+KEY_PREFIX = "polls:page"
+
+
+def _version_key(name):
+    return f"{KEY_PREFIX}:version:{name}"
+
+
+def _initial_version():
+    # version key가 cache에서 제거된 경우 예전 번호부터 다시 시작하면 예전 페이지가 다시 사용된다.
+    # -> 현재 시각(ns)으로 시작.
+    return time.time_ns()
+
+
+def cache_is_shared():
+    # 여러 프로세스가 같이 사용하는 cache인지 여부 (LocMemCache: 프로세스별, DummyCache: 저장하지 않음)
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def page_cache_enabled():
+    return getattr(settings, "POLLS_PAGE_CACHE", True) and cache_is_shared()
+
+
+def page_cache_timeout():
+    return getattr(settings, "POLLS_PAGE_CACHE_TIMEOUT", 3600)
+
+
+def get_versions(names):
+    # {이름: version} - cache에 없는 version은 새로 설정.
+    keys = {name: _version_key(name) for name in names}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        if key not in found:
+            cache.add(key, _initial_version(), None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+########################################
+# 프로세스 안에서 version을 잠시(ttl 초) 재사용 - 자주 조회하는 version마다 공유 cache 왕복을 하지 않는다.
+#  - 다른 프로세스의 변경은 최대 ttl 초 늦게 보인다. 같은 프로세스의 bump_version()은 바로 보인다.
+_LOCAL_VERSIONS_MAX = 10000
+_local_versions = {}  # {이름: (version, 만료 시각(monotonic))}
+_local_versions_lock = threading.Lock()
+
+
+def _split_local(names, now):
+    # ({이름: version} - 아직 유효한 것, [공유 cache에서 조회할 이름])
+    versions, missing = {}, []
+    with _local_versions_lock:
+        for name in names:
+            entry = _local_versions.get(name)
+            if entry is not None and entry[1] > now:
+                versions[name] = entry[0]
+            else:
+                missing.append(name)
+    return versions, missing
+
+
+def _store_local(versions, expires):
+    with _local_versions_lock:
+        if len(_local_versions) + len(versions) > _LOCAL_VERSIONS_MAX:
+            _local_versions.clear()
+        for name, version in versions.items():
+            _local_versions[name] = (version, expires)
+
+
+def clear_local_versions():
+    with _local_versions_lock:
+        _local_versions.clear()
+
+
+def get_local_versions(names, ttl):
+    # get_versions() + 프로세스 안에서 ttl 초 동안 재사용 (ttl이 0이면 매번 공유 cache 조회)
+    if not ttl:
+        return get_versions(names)
+    now = time.monotonic()
+    versions, missing = _split_local(names, now)
+    if missing:
+        fetched = get_versions(missing)
+        _store_local(fetched, now + ttl)
+        versions.update(fetched)
+    return versions
+
+
+async def aget_local_versions(names, ttl):
+    if not ttl:
+        return await aget_versions(names)
+    now = time.monotonic()
+    versions, missing = _split_local(names, now)
+    if missing:
+        fetched = await aget_versions(missing)
+        _store_local(fetched, now + ttl)
+        versions.update(fetched)
+    return versions
+
+
+async def aget_versions(names):
+    keys = {name: _version_key(name) for name in names}
+    found = await cache.aget_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        if key not in found:
+            await cache.aadd(key, _initial_version(), None)
+            found[key] = await cache.aget(key)
+        versions[name] = found[key]
+    return versions
+
+
+def bump_version(*names):
+    # version 변경 -> 그 version을 사용하는 페이지/fragment cache 무효화
+    #  새 version = 현재 시각(ns). (incr는 backend에 따라 원자적이지 않다 - 값을 덮어쓰면 동시에 변경해도 항상 바뀐다)
+    version = _initial_version()
+    cache.set_many({_version_key(name): version for name in names}, None)
+    with _local_versions_lock:
+        for name in names:
+            _local_versions.pop(name, None)
+
+
+def replica_may_be_stale(versions):
+    # replica에서 조회 + 최근에 바뀐 version -> replica가 아직 그 변경을 반영하지 못했을 수 있다.
+    if not versions or not reading_from_replica():
+        return False
+    lag = getattr(settings, "POLLS_REPLICA_STICKY_SECONDS", 10) * 10**9
+    return time.time_ns() - max(versions.values()) < lag
+
+
+def bump_question_pages(question_id):
+    # 질문/보기 변경 -> 질문의 설문폼/결과 페이지 무효화
+    bump_version(f"question:{question_id}", f"results:{question_id}")
+
+
+def bump_vote_pages(question_id, ranking=True):
+    # 투표 -> 결과 페이지 무효화. ranking: total_votes도 바뀐 경우 "투표 많은 순" 목록도 무효화
+    bump_version(f"results:{question_id}", *(["list:votes"] if ranking else []))
+
+
+def _page_key(request, versions):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    version = "-".join(f"{name}.{value}" for name, value in sorted(versions.items()))
+    return f"{KEY_PREFIX}:{path}:{version}"
+
+
+def _is_anonymous_get(request, user):
+    return request.method in ("GET", "HEAD") and not user.is_authenticated
+
+
+def _cacheable(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def cache_anonymous_page(version_names):
+    # 로그인 안한 사용자의 GET 요청이면 응답 페이지 전체를 cache.
+    #  version_names: request와 view의 path parameter(kwargs)를 받아서 {역할: version 이름} 을 반환하는 함수
+    #                 ex) lambda request, question_id: {"question": f"question:{question_id}"}
+    # 조회한 version들은 request.page_versions 에 저장 -> view가 template의 fragment cache key로 사용 (page_cache_context)
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_view(request, *args, **kwargs):
+                if not page_cache_enabled():
+                    request.page_versions = {}
+                    return await view_func(request, *args, **kwargs)
+                names = version_names(request, *args, **kwargs)
+                versions = await aget_versions(names.values())
+                request.page_versions = {role: versions[name] for role, name in names.items()}
+                if not _is_anonymous_get(request, await request.auser()):
+                    return await view_func(request, *args, **kwargs)
+                key = _page_key(request, versions)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return HttpResponse(cached[0], content_type=cached[1])
+                response = await view_func(request, *args, **kwargs)
+                if _cacheable(response) and not replica_may_be_stale(versions):
+                    await cache.aset(key, (response.content, response["Content-Type"]), page_cache_timeout())
+                return response
+            return _async_view
+
+        @wraps(view_func)
+        def _view(request, *args, **kwargs):
+            if not page_cache_enabled():
+                request.page_versions = {}
+                return view_func(request, *args, **kwargs)
+            names = version_names(request, *args, **kwargs)
+            versions = get_versions(names.values())
+            request.page_versions = {role: versions[name] for role, name in names.items()}
+            if not _is_anonymous_get(request, request.user):
+                return view_func(request, *args, **kwargs)
+            key = _page_key(request, versions)
+            cached = cache.get(key)
+            if cached is not None:
+                return HttpResponse(cached[0], content_type=cached[1])
+            response = view_func(request, *args, **kwargs)
+            if _cacheable(response) and not replica_may_be_stale(versions):
+                cache.set(key, (response.content, response["Content-Type"]), page_cache_timeout())
+            return response
+        return _view
+    return decorator
+
+
+def page_cache_context(request):
+    # template의 {% cache %} fragment에 사용할 context value
+    #  - page_cache_timeout: 유지 시간 (사용하지 않는 경우, replica의 예전 내용일 수 있는 경우 0 -> 저장되지 않는다)
+    #  - page_versions: {역할: version} (cache_anonymous_page 에서 조회)
+    #  - page_path: 요청 경로 + querystring (목록 페이지별 key)
+    versions = getattr(request, "page_versions", {})
+    return {
+        "page_cache_timeout": page_cache_timeout()
+                              if page_cache_enabled() and versions and not replica_may_be_stale(versions) else 0,
+        "page_versions": versions,
+        "page_path": request.get_full_path(),
+    }
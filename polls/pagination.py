@@ -0,0 +1,155 @@
+# polls/pagination.py - 설문 목록 paging 처리
+#
+# Paginator(offset 방식)
+#   - 페이지마다 COUNT(*) + OFFSET (page-1)*paginate_by 조회 -> 뒤 페이지로 갈수록 느려진다.
+#   - COUNT(*)는 CachedCountPaginator로 cache된 개수/추정 개수를 사용.
+#
+# keyset(cursor) 방식 - settings.POLLS_LIST_PAGINATION = "cursor"
+#   - pk 내림차순 목록에서 "pk <= cursor" 로 바로 찾아간다.(index seek) COUNT(*) 없음.
+#   - cursor: 현재 페이지그룹의 첫번째 질문의 pk. (첫 페이지그룹은 cursor 없음)
+#   - 페이지그룹의 페이지 링크들은 pk만 조회해서(paginate_by * page_group_count + 1 개) 계산.
+#   - 요청 querystring: ?page=페이지번호&cursor=페이지그룹시작pk
+#   - 페이지 깊이와 관계없이 요청당 비용이 일정하다.
+
+from urllib.parse import urlencode
+
+from .counts import CachedCountPaginator
+
+
+def _to_int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+MAX_CURSOR = 2 ** 63 - 1  # pk(BigAutoField) 최대값
+
+
+def parse_cursor(value):
+    # querystring의 cursor -> pk. 양의 정수가 아니거나 pk 범위를 넘으면 None (DB에서 overflow 오류)
+    cursor = _to_int(value)
+    if cursor is None or not 0 < cursor <= MAX_CURSOR:
+        return None
+    return cursor
+
+
+def offset_page_context(queryset, params, paginate_by, page_group_count, base_query=None):
+    # Paginator를 이용한 paging. (기존 방식)
+    # 전체 개수는 COUNT(*) 대신 cache/추정 개수 사용 (polls/counts.py)
+    # base_query: 페이지 링크에 같이 넣을 querystring 값 (ex: {"order": "votes"})
+    base_query = base_query or {}
+    current_page = max(_to_int(params.get('page'), 1), 1) # 현재 조회하려는 페이지번호
+    pn = CachedCountPaginator(queryset, paginate_by)
+    current_page = min(current_page, pn.num_pages)
+
+    # 현재 페이지가 속한 페이지그룹의 start/end 페이지 번호 조회
+    start_index = int((current_page - 1) / page_group_count) * page_group_count
+    end_index = start_index + page_group_count
+    page_range = pn.page_range[start_index : end_index]
+
+    # context_value(context_data) -> template에 전달할 값들. dictionary
+    context_value = {
+        "page_links": [(page_no, urlencode({**base_query, "page": page_no})) for page_no in page_range],
+        "current_page": current_page,
+        "question_list": pn.page(current_page),  # 페이지의 데이터들.
+    }
+
+    # 페이지그룹의 시작 페이지가 이전 페이지가 있는지, 이전페이지 번호는 무언지
+    if page_range[0] > 1:
+        context_value['has_previous'] = True
+        context_value['previous_query'] = urlencode({**base_query, "page": page_range[0] - 1})
+    # 페이지그룹의 끝 페이지가 다음 페이지가 있는지, 다음 페이지 번호는 무언지
+    if page_range[-1] < pn.num_pages:
+        context_value['has_next'] = True
+        context_value['next_query'] = urlencode({**base_query, "page": page_range[-1] + 1})
+    return context_value
+
+
+def _keyset_steps(queryset, params, paginate_by, page_group_count):
+    # pk 내림차순 keyset paging 처리 절차 (generator)
+    #  - 조회할 QuerySet을 yield 하면 호출한 쪽에서 조회해서 결과 list를 send() 로 돌려준다.
+    #  - 같은 절차를 sync(keyset_page_context)/async(akeyset_page_context) 에서 같이 사용.
+    #  - 반환(StopIteration.value): context_value
+    # queryset은 pk 내림차순으로 조회할 목록. (order_by는 여기서 -pk로 다시 설정)
+    queryset = queryset.order_by("-pk")
+    group_size = paginate_by * page_group_count  # 페이지그룹 하나의 데이터 개수
+
+    current_page = max(_to_int(params.get('page'), 1), 1)
+    cursor = parse_cursor(params.get('cursor')) # 잘못된 cursor -> 첫 페이지그룹
+    if cursor is None:
+        # cursor 없이 요청하면 첫번째 페이지그룹.
+        current_page = min(current_page, page_group_count)
+    group_start_page = int((current_page - 1) / page_group_count) * page_group_count + 1
+
+    # 1. 페이지그룹의 pk들 (+ 다음 페이지그룹의 시작 pk 1개)
+    group_qs = queryset if cursor is None else queryset.filter(pk__lte=cursor)
+    group_pks = yield group_qs.values_list("pk", flat=True)[:group_size + 1]
+    if not group_pks and cursor is not None:
+        # cursor 이후로 데이터가 없는 경우(삭제등) -> 첫 페이지그룹으로
+        return (yield from _keyset_steps(queryset, {}, paginate_by, page_group_count))
+
+    # 페이지그룹의 각 페이지 시작 pk
+    page_starts = group_pks[:group_size:paginate_by]
+    page_links = []
+    for i in range(len(page_starts)):
+        page_no = group_start_page + i
+        query = {"page": page_no}
+        if cursor is not None:
+            query["cursor"] = cursor
+        page_links.append((page_no, urlencode(query)))
+
+    # 2. 현재 페이지의 데이터들 (페이지가 그룹의 페이지 수보다 크면 마지막 페이지)
+    page_index = min(current_page - group_start_page, max(len(page_starts) - 1, 0))
+    current_page = group_start_page + page_index
+    page_pks = group_pks[page_index * paginate_by : (page_index + 1) * paginate_by]
+    question_list = (yield queryset.filter(pk__in=page_pks)) if page_pks else []
+
+    context_value = {
+        "page_links": page_links,
+        "current_page": current_page,
+        "question_list": question_list,
+    }
+
+    # 다음 페이지그룹: 이번 그룹의 데이터 다음에 데이터가 더 있으면 그 pk가 다음 그룹의 cursor
+    if len(group_pks) > group_size:
+        context_value['has_next'] = True
+        context_value['next_query'] = urlencode({
+            "page": group_start_page + page_group_count,
+            "cursor": group_pks[group_size],
+        })
+    # 이전 페이지그룹: cursor 보다 큰 pk들 중 가까운 group_size개의 가장 큰 pk가 이전 그룹의 cursor
+    if cursor is not None and group_start_page > 1:
+        previous_pks = yield (
+            queryset.filter(pk__gt=cursor).order_by("pk").values_list("pk", flat=True)[:group_size]
+        )
+        if previous_pks:
+            # 이전 페이지그룹의 마지막 페이지로 이동.
+            query = {"page": group_start_page - 1}
+            if group_start_page - page_group_count > 1:
+                query["cursor"] = previous_pks[-1]
+            context_value['has_previous'] = True
+            context_value['previous_query'] = urlencode(query)
+    return context_value
+
+
+def keyset_page_context(queryset, params, paginate_by, page_group_count):
+    # pk 내림차순 keyset paging.
+    steps = _keyset_steps(queryset, params, paginate_by, page_group_count)
+    try:
+        query = next(steps)
+        while True:
+            query = steps.send(list(query))
+    except StopIteration as result:
+        return result.value
+
+
+async def akeyset_page_context(queryset, params, paginate_by, page_group_count):
+    # keyset_page_context()의 async 버전. (async ORM으로 조회)
+    steps = _keyset_steps(queryset, params, paginate_by, page_group_count)
+    try:
+        query = next(steps)
+        while True:
+            query = steps.send([row async for row in query])
+    except StopIteration as result:
+        return result.value
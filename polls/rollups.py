@@ -0,0 +1,164 @@
+# polls/rollups.py - 시간대별 투표수 집계(rollup)
+#
+# Choice.votes는 누적 합계 -> "시간대별 투표수"를 보려면 투표 기록 전체를 집계해야 한다.
+# => 투표할 때 보기별 분 단위 구간(VoteRollupMinute)의 투표수를 증가.
+#    - sync 모드: vote View의 투표 transaction 안에서 (polls/views.py record_vote)
+#                 설문 모드의 일괄 투표는 add_votes_bulk() (polls/survey.py)
+#    - buffered 모드: flusher가 투표 로그를 DB에 반영할 때 같은 transaction에서 (polls/vote_buffer.py)
+#                     (로그에 기록된 투표 일시의 구간)
+#    - 샤드 모드(settings.POLLS_VOTE_SHARDS > 1): 같은 (보기, 구간)을 샤드 row로 나눠서 증가.
+#                     (투표수 샤드와 같은 이유 - 인기 보기의 row 하나에 UPDATE lock이 몰리지 않도록)
+#
+# 보관 기간/압축 (compact_rollups - python manage.py compact_rollups 를 주기적으로 실행)
+#  - 분 단위 row: settings.POLLS_ROLLUP_MINUTE_RETENTION 이 지나면 시간 단위(VoteRollupHour)로 합치고 삭제
+#  - 시간 단위 row: settings.POLLS_ROLLUP_HOUR_RETENTION 이 지나면 일 단위(VoteRollupDay)로 합치고 삭제
+#  - 일 단위 row: settings.POLLS_ROLLUP_DAY_RETENTION 이 지나면 삭제 (None: 계속 보관)
+#
+# 조회 (timeline): 요청한 단위보다 작은 단위의 row들도 같이 조회해서 합친다. (아직 압축되지 않은 구간)
+# 구간은 settings.TIME_ZONE 기준으로 자른다.
+
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .counters import get_vote_shards
+from .models import VoteRollupDay, VoteRollupHour, VoteRollupMinute
+
+ROLLUP_MODELS = {"minute": VoteRollupMinute, "hour": VoteRollupHour, "day": VoteRollupDay}
+UNITS = tuple(ROLLUP_MODELS)
+STEPS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+DEFAULT_BUCKETS = {"minute": 60, "hour": 48, "day": 30}  # 기본 조회 구간 개수
+
+
+def truncate(value, unit):
+    # value 일시를 unit(minute/hour/day) 구간의 시작 일시로 자른다. (settings.TIME_ZONE 기준)
+    local = timezone.localtime(value).replace(tzinfo=None, second=0, microsecond=0)
+    if unit in ("hour", "day"):
+        local = local.replace(minute=0)
+    if unit == "day":
+        local = local.replace(hour=0)
+    return timezone.make_aware(local)
+
+
+def add_votes(question_id, choice_id, amount=1, at=None):
+    # 분 단위 구간의 투표수 증가. 호출한 쪽의 transaction 안에서 실행.
+    bucket = truncate(at or timezone.now(), "minute")
+    shard = random.randrange(max(get_vote_shards(), 1))
+    rows = VoteRollupMinute.objects.filter(choice_id=choice_id, bucket=bucket, shard=shard)
+    if rows.update(votes=F("votes") + amount) == 0:
+        # 구간(샤드)의 첫 투표 -> row 생성. 동시에 다른 요청이 먼저 생성했으면(unique 제약 위반) 다시 UPDATE.
+        try:
+            with transaction.atomic():
+                VoteRollupMinute.objects.create(
+                    question_id=question_id, choice_id=choice_id, bucket=bucket, shard=shard, votes=amount
+                )
+        except IntegrityError:
+            rows.update(votes=F("votes") + amount)
+
+
+def add_votes_bulk(pairs, at=None):
+    # 여러 (question_id, choice_id) 의 분 단위 구간 투표수를 1씩 증가 (설문 모드 - polls/survey.py)
+    #  - 있는 row: 한번의 UPDATE, 없는 row: bulk_create
+    #  - 동시에 다른 요청이 먼저 생성했으면(unique 제약 위반) 보기마다 add_votes()로 다시 처리.
+    #  - 샤드 모드: 한번의 호출은 같은 샤드 row들을 사용
+    bucket = truncate(at or timezone.now(), "minute")
+    shard = random.randrange(max(get_vote_shards(), 1))
+    choice_ids = [choice_id for _, choice_id in pairs]
+    existing = dict(VoteRollupMinute.objects.filter(choice_id__in=choice_ids, bucket=bucket, shard=shard)
+                                            .values_list("choice_id", "pk"))
+    VoteRollupMinute.objects.filter(pk__in=existing.values()).update(votes=F("votes") + 1)
+    missing = [(question_id, choice_id) for question_id, choice_id in pairs if choice_id not in existing]
+    try:
+        with transaction.atomic():
+            VoteRollupMinute.objects.bulk_create(
+                VoteRollupMinute(question_id=question_id, choice_id=choice_id, bucket=bucket, shard=shard, votes=1)
+                for question_id, choice_id in missing
+            )
+    except IntegrityError:
+        for question_id, choice_id in missing:
+            add_votes(question_id, choice_id, at=bucket)
+
+
+def _compact(source, target, unit, cutoff):
+    # source 테이블에서 cutoff 이전 row들을 unit 단위로 합쳐서(GROUP BY) target에 더하고 삭제.
+    # 반환: 삭제한 source row 수
+    old_rows = source.objects.filter(bucket__lt=cutoff)
+    totals = {
+        (row["question_id"], row["choice_id"], row["target_bucket"]): row["total"]
+        for row in old_rows.annotate(target_bucket=Trunc("bucket", unit))
+                           .values("question_id", "choice_id", "target_bucket")
+                           .annotate(total=Sum("votes"))
+                           .order_by()
+    }
+    if not totals:
+        return 0
+    existing = target.objects.select_for_update().filter(
+        choice_id__in={choice_id for _, choice_id, _ in totals},
+        bucket__in={bucket for _, _, bucket in totals},
+    )
+    updated = []
+    for row in existing:
+        total = totals.pop((row.question_id, row.choice_id, row.bucket), None)
+        if total is not None:
+            row.votes += total
+            updated.append(row)
+    target.objects.bulk_update(updated, ["votes"], batch_size=500)
+    target.objects.bulk_create(
+        [target(question_id=question_id, choice_id=choice_id, bucket=bucket, votes=total)
+         for (question_id, choice_id, bucket), total in totals.items()],
+        batch_size=500,
+    )
+    deleted, _ = old_rows.delete()
+    return deleted
+
+
+def compact_rollups(now=None):
+    # 보관 기간이 지난 분 -> 시간, 시간 -> 일 단위로 합치고, 오래된 일 단위 row 삭제.
+    # 반환: {"minute": 시간 단위로 합친 row 수, "hour": 일 단위로 합친 row 수, "day": 삭제한 row 수}
+    now = now or timezone.now()
+    minute_retention = getattr(settings, "POLLS_ROLLUP_MINUTE_RETENTION", timedelta(days=1))
+    hour_retention = getattr(settings, "POLLS_ROLLUP_HOUR_RETENTION", timedelta(days=30))
+    day_retention = getattr(settings, "POLLS_ROLLUP_DAY_RETENTION", None)
+    result = {}
+    with transaction.atomic():
+        # 시간/일 단위 경계로 자른 일시 이전만 합친다. (구간 중간에서 나누지 않는다)
+        result["minute"] = _compact(VoteRollupMinute, VoteRollupHour, "hour",
+                                    truncate(now - minute_retention, "hour"))
+        result["hour"] = _compact(VoteRollupHour, VoteRollupDay, "day",
+                                  truncate(now - hour_retention, "day"))
+        result["day"] = 0
+        if day_retention is not None:
+            result["day"], _ = VoteRollupDay.objects.filter(
+                bucket__lt=truncate(now - day_retention, "day")
+            ).delete()
+    return result
+
+
+def bucket_starts(unit, count, now=None):
+    # 현재 구간까지 count 개의 구간 시작 일시 (오래된 순)
+    last = timezone.localtime(truncate(now or timezone.now(), unit)).replace(tzinfo=None)
+    return [timezone.make_aware(last - STEPS[unit] * i) for i in reversed(range(count))]
+
+
+def timeline(question_id, unit, count=None, now=None):
+    # question_id 질문의 보기별 구간 투표수. rollup 테이블만 조회.
+    # 반환: (구간 시작 일시 list, {choice_id: [구간별 투표수]})
+    count = count or DEFAULT_BUCKETS[unit]
+    starts = bucket_starts(unit, count, now)
+    totals = Counter()
+    # 요청한 단위 + 그보다 작은 단위(아직 합쳐지지 않은 구간)의 row들
+    for source_unit in UNITS[:UNITS.index(unit) + 1]:
+        rows = ROLLUP_MODELS[source_unit].objects.filter(question_id=question_id, bucket__gte=starts[0])
+        for choice_id, bucket, votes in rows.values_list("choice_id", "bucket", "votes"):
+            totals[(choice_id, truncate(bucket, unit))] += votes
+    series = {}
+    for choice_id, _ in totals:
+        if choice_id not in series:
+            series[choice_id] = [totals.get((choice_id, start), 0) for start in starts]
+    return starts, series
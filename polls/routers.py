@@ -0,0 +1,110 @@
+# polls/routers.py - 읽기/쓰기 DB 분리 (primary/replica)
+#
+# settings.DATABASES 에 "replica" alias가 있으면
+#  - 요청(GET/HEAD)에서 Question/Choice 조회 -> replica (목록, 설문폼, 결과, API ...)
+#  - 모든 쓰기(vote, vote_create, 가입/로그인 ...) 와 나머지 조회 -> default(primary)
+#  - 쓰기가 있었던 요청은 이후 조회도 primary.
+#  - read-your-writes: 쓰기가 있었던 요청의 응답에 쿠키(polls_primary)를 설정
+#    -> settings.POLLS_REPLICA_STICKY_SECONDS 초 동안 그 사용자의 조회는 primary
+#       (투표 후 redirect된 vote_result에서 자신의 투표가 보이도록)
+#  - 요청 밖(manage.py 명령, flusher thread 등)의 조회는 primary.
+#
+# 설정: settings.DATABASE_ROUTERS, MIDDLEWARE 에 ReplicaRoutingMiddleware 등록 (config/settings.py)
+# 로컬 테스트
+#  - 같은 SQLite 파일(WAL 모드)을 replica alias로 설정 -> 별도 connection으로 조회
+#  - 다른 SQLite 파일 -> python manage.py sync_replica 로 primary를 복사
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+REPLICA_ALIAS = "replica"
+STICKY_COOKIE = "polls_primary"
+REPLICA_MODELS = {"polls.question", "polls.choice", "polls.choicevoteshard"}
+
+# 요청별 상태 {"primary": primary만 사용, "wrote": 쓰기가 있었는지} (요청 밖에서는 None)
+_request_state = ContextVar("polls_db_request_state", default=None)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in connections.settings
+
+
+def reading_from_replica():
+    # 현재 요청의 Question/Choice 조회가 replica로 가는지 여부
+    #  -> replica는 primary보다 늦을 수 있다. (최근에 바뀐 데이터로 만든 페이지를 cache하지 않도록 - polls/page_cache.py)
+    state = _request_state.get()
+    return state is not None and not state["primary"] and not state["wrote"] and replica_enabled()
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state["primary"] or state["wrote"] or not replica_enabled():
+            return "default"
+        if model._meta.label_lower in REPLICA_MODELS:
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica는 primary의 복사본 -> 관계 허용
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # migration은 primary에만 실행 (replica는 복사/복제로 반영)
+        return db != REPLICA_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    # 요청별 DB 선택 상태를 설정하고, 쓰기가 있었던 요청의 응답에 sticky 쿠키를 설정.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._finish(state, response)
+
+    def _start(self, request):
+        state = {
+            # GET/HEAD가 아닌 요청, 최근에 쓰기를 한 사용자 -> primary
+            "primary": request.method not in ("GET", "HEAD") or STICKY_COOKIE in request.COOKIES,
+            "wrote": False,
+        }
+        return state, _request_state.set(state)
+
+    def _finish(self, state, response):
+        if state["wrote"] and replica_enabled():
+            response.set_cookie(
+                STICKY_COOKIE, "1",
+                max_age=getattr(settings, "POLLS_REPLICA_STICKY_SECONDS", 10),
+                httponly=True, samesite="Lax",
+            )
+        return response
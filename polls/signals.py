@@ -0,0 +1,67 @@
+# polls/signals.py - 모델 signal 처리
+#  - PollsConfig.ready() 에서 import 해서 등록.
+
+from django.db import transaction
+from django.db.models import Subquery
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .counters import bump_question_version
+from .counts import adjust_row_count
+from .models import Choice, Question
+from .page_cache import bump_question_pages, bump_version
+
+
+# Question/Choice가 insert/delete 되면 cache에 저장된 전체 개수를 변경. (polls/counts.py)
+#  - commit 된 후에 변경 (rollback 되면 변경하지 않는다.)
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Choice)
+def increase_row_count(sender, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: adjust_row_count(sender, 1))
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Choice)
+def decrease_row_count(sender, **kwargs):
+    transaction.on_commit(lambda: adjust_row_count(sender, -1))
+
+
+# 보기가 추가/수정/삭제되면 질문의 결과도 변경된 것 -> Question.version 증가
+#  - 같은 transaction에서 Question.choice_count, total_votes도 변경
+@receiver(post_save, sender=Choice)
+def bump_choice_question_version(sender, instance, created, **kwargs):
+    if created:
+        bump_question_version(question_id=instance.question_id, choices=1, votes=instance.votes)
+    else:
+        bump_question_version(question_id=instance.question_id)
+
+
+@receiver(pre_delete, sender=Choice)
+def bump_deleted_choice_question_version(sender, instance, **kwargs):
+    # 삭제 전에 DB에 저장된 votes 만큼 total_votes 감소 (instance.votes는 조회 후 바뀌었을 수 있다)
+    votes = Choice.objects.filter(pk=instance.pk).values("votes")
+    bump_question_version(question_id=instance.question_id, choices=-1, votes=-Subquery(votes))
+
+
+# 페이지 cache 무효화 (polls/page_cache.py) - commit 된 후에 무효화
+#  - 질문 등록/수정/삭제 -> 목록 + 그 질문의 설문폼/결과 페이지
+#  - 보기 등록/수정/삭제 -> 그 질문의 설문폼/결과 페이지 (+ total_votes가 바뀔 수 있다 -> "투표 많은 순" 목록)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_pages(sender, instance, **kwargs):
+    question_id = instance.pk
+    def invalidate():
+        bump_version("list")
+        bump_question_pages(question_id)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_choice_pages(sender, instance, **kwargs):
+    question_id = instance.question_id
+    def invalidate():
+        bump_question_pages(question_id)
+        bump_version("list:votes")
+    transaction.on_commit(invalidate)
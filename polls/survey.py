@@ -0,0 +1,112 @@
+# polls/survey.py - 설문 모드 (여러 질문을 한 페이지에서 투표)
+#
+# 질문마다 설문폼 -> 투표 -> 결과 페이지를 요청하면 질문 수만큼 왕복한다.
+#  => 설문 모드: 여러 질문을 한 페이지에 보여주고, 모든 답을 한번의 POST로 받는다. (polls/views.py survey)
+#
+# 일괄 투표 (submit_survey)
+#  - 검증: 선택한 보기들 + 질문(마감 여부)을 한번의 query로 조회
+#  - 중복 확인: 이미 투표한 질문들을 한번의 query로 조회 (Vote 테이블)
+#  - 저장: 하나의 transaction에서 Vote bulk insert + 투표수 증가(UPDATE .. WHERE id IN (..))
+#    (buffered 모드는 commit 후 투표 로그에 기록 - polls/vote_buffer.py)
+#  - 하나라도 오류가 있으면 아무것도 저장하지 않는다.
+# 한번에 받는 질문 수: settings.POLLS_SURVEY_MAX_QUESTIONS
+
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import live, rollups, trending, vote_buffer
+from .counters import get_vote_shards, increment_votes_bulk
+from .models import Choice, Vote
+from .page_cache import bump_vote_pages
+
+
+def max_questions():
+    return getattr(settings, "POLLS_SURVEY_MAX_QUESTIONS", 50)
+
+
+def parse_question_ids(value):
+    # "1,2,3" -> [1, 2, 3] (중복 제거, 최대 max_questions() 개 - 채워지면 나머지는 읽지 않는다)
+    limit = max_questions()
+    question_ids = {} # 입력 순서 유지 + 중복 확인 O(1) (dict)
+    for v in (value or "").split(","):
+        if len(question_ids) >= limit:
+            break
+        v = v.strip()
+        if v.isdigit():
+            question_ids.setdefault(int(v))
+    return list(question_ids)
+
+
+def voted_question_ids(user, question_ids):
+    # question_ids 중 user가 이미 투표한 질문 ID set (한번의 query)
+    if not user.is_authenticated:
+        return set()
+    return set(Vote.objects.filter(user=user, question_id__in=question_ids)
+                           .values_list("question_id", flat=True))
+
+
+def _apply_votes(user, pairs):
+    # (question_id, choice_id) 들을 하나의 transaction으로 저장
+    with transaction.atomic():
+        Vote.objects.bulk_create(
+            [Vote(user=user, question_id=question_id, choice_id=choice_id) for question_id, choice_id in pairs]
+        )
+        if vote_buffer.is_buffered():
+            voted_at = time.time() # 투표 일시 -> 로그에 같이 기록
+            def on_commit():
+                for question_id, choice_id in pairs:
+                    vote_buffer.append_vote(question_id, choice_id, at=voted_at)
+                    if getattr(settings, "POLLS_RESULT_READ", "flushed") == "merged":
+                        bump_vote_pages(question_id, ranking=False)
+        else:
+            increment_votes_bulk([choice_id for _, choice_id in pairs])
+            rollups.add_votes_bulk(pairs)
+            def on_commit():
+                for question_id, _ in pairs:
+                    bump_vote_pages(question_id, ranking=get_vote_shards() <= 1)
+                    live.hub.publish(question_id)
+        transaction.on_commit(on_commit)
+
+        def record_trending():
+            for question_id, _ in pairs:
+                trending.record_vote(question_id)
+        transaction.on_commit(record_trending)
+
+
+def submit_survey(user, answers):
+    # answers: {question_id: choice_id} - 답하지 않은 질문은 넣지 않는다.
+    # 반환: {question_id: 오류 메시지} - 비어있으면 모두 저장된 것
+    choices = {
+        pk: (question_id, closed, end_date)
+        for pk, question_id, closed, end_date in Choice.objects.filter(pk__in=answers.values())
+                                                             .values_list("pk", "question_id",
+                                                                          "question__closed",
+                                                                          "question__end_date")
+    }
+    voted = voted_question_ids(user, answers.keys())
+    now = timezone.now()
+    errors = {}
+    for question_id, choice_id in answers.items():
+        choice = choices.get(choice_id)
+        if question_id in voted:
+            errors[question_id] = "이미 투표한 설문입니다."
+        elif choice is None or choice[0] != question_id:
+            errors[question_id] = "보기를 선택하세요."
+        elif choice[1] or (choice[2] is not None and choice[2] <= now):
+            errors[question_id] = "마감된 설문입니다."
+    if errors or not answers:
+        return errors
+    try:
+        _apply_votes(user, sorted(answers.items()))
+    except IntegrityError:
+        # 중복 확인 후 다른 요청에서 먼저 투표한 경우 (unique (user, question))
+        #  - 중복 투표가 없으면 다른 제약 조건 위반 -> 투표가 저장되지 않았으므로 그대로 오류
+        errors = {question_id: "이미 투표한 설문입니다."
+                  for question_id in voted_question_ids(user, answers.keys())}
+        if not errors:
+            raise
+        return errors
+    return {}
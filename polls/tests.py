@@ -1,3 +1,1038 @@
-from django.test import TestCase
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
+from django.http import Http404, HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .archive import archive_polls
+from .bulk import create_poll, create_polls
+from .counts import CachedCountPaginator, row_count
+from .counters import fold_vote_shards, increment_choice_votes, recompute_question_totals
+from .metadata import LRUCache, cached_question, metadata_cache
+from .pagination import keyset_page_context
+from .models import ArchivedPoll, Question, Choice, ChoiceVoteShard, ImportCheckpoint, Vote, VoteLogSegment, VoteRollupHour, VoteRollupMinute
+from . import live, metadata, page_cache, rollups, routers, survey, trending, views, vote_buffer, voted_cookie
 
 # Create your tests here.
+
+# python manage.py test polls
+
+class QuestionPageQueryTest(TestCase):
+    # vote_form/vote_result는 질문+보기들을 한번의 query로 조회해야 한다.
+
+    def setUp(self):
+        cache.clear() # 페이지 cache (테스트마다 DB는 rollback 된다)
+        self.question = Question.objects.create(question_text="좋아하는 계절은?")
+        for choice_text in ["봄", "여름", "가을", "겨울"]:
+            Choice.objects.create(question=self.question, choice_text=choice_text)
+
+    def test_vote_form_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("polls:vote_form", args=[self.question.pk]))
+        self.assertContains(response, "겨울")
+
+    def test_vote_result_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("polls:vote_result", args=[self.question.pk]))
+        self.assertContains(response, "가을 - 0")
+
+    def test_question_without_choices(self):
+        question = Question.objects.create(question_text="보기 없는 질문")
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("polls:vote_form", args=[question.pk]))
+        self.assertContains(response, "보기 없는 질문")
+
+    def test_unknown_question_404(self):
+        response = self.client.get(reverse("polls:vote_result", args=[self.question.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+
+class KeysetPaginationTest(TestCase):
+    # cursor(keyset) paging: 같은 등록일시여도 pk 순서로 빠짐/중복 없이 이어진다. 잘못된 cursor는 첫 페이지그룹.
+
+    def setUp(self):
+        cache.clear()
+        for i in range(11):
+            Question.objects.create(question_text=f"질문 {i}")
+        Question.objects.update(pub_date=timezone.now()) # 정렬 값이 모두 같은 경우
+        self.pks = [*Question.objects.order_by("-pk").values_list("pk", flat=True)]
+
+    def page(self, query):
+        params = dict(pair.split("=") for pair in query.split("&")) if query else {}
+        return keyset_page_context(Question.objects.all(), params, 2, 2) # 페이지당 2개, 그룹당 2페이지
+
+    def test_walk_all_pages(self):
+        seen = []
+        context = self.page("")
+        while True:
+            for _, query in context["page_links"]:
+                seen += [q.pk for q in self.page(query)["question_list"]]
+            if not context.get("has_next"):
+                break
+            context = self.page(context["next_query"])
+        self.assertEqual(seen, self.pks)
+        # 이전 페이지그룹으로 이동
+        previous = self.page(context["previous_query"])
+        self.assertEqual([q.pk for q in previous["question_list"]], self.pks[6:8])
+
+    def test_malformed_cursor(self):
+        first = [q.pk for q in self.client.get(reverse("polls:list"), {"page": "3"}).context["question_list"]]
+        for cursor in ("abc", "-5", "0", str(2 ** 64)):
+            response = self.client.get(reverse("polls:list"), {"cursor": cursor, "page": "3"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([q.pk for q in response.context["question_list"]], first)
+            response = self.client.get(reverse("polls:api_question_list"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+
+
+class RowCountTest(TestCase):
+    # 전체 개수: cache -> DB 통계의 추정 개수 -> COUNT(*). insert/delete 되면 cache의 개수 변경.
+
+    def setUp(self):
+        cache.clear()
+        self.questions = [Question.objects.create(question_text=f"질문 {i}") for i in range(3)]
+
+    def test_cached_count(self):
+        self.assertEqual(row_count(Question), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(row_count(Question), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(question_text="추가")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.questions[0].delete()
+            self.questions[1].delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(row_count(Question), 2)
+
+    @override_settings(POLLS_COUNT_ESTIMATE_THRESHOLD=2)
+    def test_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        Question.objects.create(question_text="통계 이후 추가")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(row_count(Question), 3) # 통계의 추정 개수 (COUNT(*) 없음)
+        self.assertFalse([q for q in queries if "COUNT(" in q["sql"]])
+        # 조건이 있으면 정확한 개수
+        questions = Question.objects.order_by("pk")
+        self.assertEqual(CachedCountPaginator(questions.filter(question_text__startswith="통계"), 10).count, 1)
+        self.assertEqual(CachedCountPaginator(questions, 10).count, 3)
+
+
+class PageCacheTest(TestCase):
+    # 로그인 안한 사용자는 페이지 전체를 cache, 투표/보기 수정이 있으면 해당 페이지만 무효화.
+
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(question_text="좋아하는 색은?")
+        self.choice = Choice.objects.create(question=self.question, choice_text="파랑")
+        self.other = Question.objects.create(question_text="좋아하는 동물은?")
+
+    def test_anonymous_page_cached(self):
+        url = reverse("polls:vote_result", args=[self.question.pk])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, "파랑 - 0")
+
+    def test_vote_invalidates_result_page(self):
+        from account.models import User
+
+        result_url = reverse("polls:vote_result", args=[self.question.pk])
+        other_url = reverse("polls:vote_form", args=[self.other.pk])
+        self.client.get(result_url)
+        self.client.get(other_url)
+
+        voter = self.client_class()
+        voter.force_login(User.objects.create_user("voter", password="pw"))
+        with self.captureOnCommitCallbacks(execute=True):
+            voter.post(reverse("polls:vote"), {"question_id": self.question.pk, "choice": self.choice.pk})
+
+        self.assertContains(self.client.get(result_url), "파랑 - 1")
+        with self.assertNumQueries(0): # 다른 질문의 페이지는 그대로
+            self.client.get(other_url)
+
+    def test_choice_change_invalidates_form(self):
+        url = reverse("polls:vote_form", args=[self.question.pk])
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.create(question=self.question, choice_text="빨강")
+        self.assertContains(self.client.get(url), "빨강")
+
+    def test_requires_shared_cache(self):
+        # 프로세스별 cache(LocMemCache)는 다른 프로세스의 version 변경이 보이지 않는다 -> 페이지 cache 사용 안함
+        url = reverse("polls:vote_result", args=[self.question.pk])
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertFalse(page_cache.page_cache_enabled())
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            self.assertTrue(queries)
+        self.assertTrue(page_cache.page_cache_enabled())
+
+    def test_bump_version(self):
+        versions = page_cache.get_versions(["list", "results:1"])
+        page_cache.bump_version("list", "results:1")
+        bumped = page_cache.get_versions(["list", "results:1"])
+        self.assertNotEqual(bumped["list"], versions["list"])
+        self.assertNotEqual(bumped["results:1"], versions["results:1"])
+
+    def test_no_cache_from_stale_replica(self):
+        # replica에서 조회한 요청은 최근에 바뀐 version의 페이지를 저장하지 않는다.
+        url = reverse("polls:vote_result", args=[self.question.pk])
+        with mock.patch("polls.page_cache.reading_from_replica", return_value=True):
+            page_cache.bump_question_pages(self.question.pk)
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            self.assertTrue(queries)
+            # 변경 후 POLLS_REPLICA_STICKY_SECONDS가 지나면 저장
+            past = time.time_ns() - (settings.POLLS_REPLICA_STICKY_SECONDS + 1) * 10**9
+            names = [f"question:{self.question.pk}", f"results:{self.question.pk}"]
+            cache.set_many({page_cache._version_key(name): past for name in names}, None)
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                self.client.get(url)
+
+
+class MetadataCacheTest(TestCase):
+    # 질문/보기 내용은 cache, 투표수만 DB에서 조회.
+
+    def setUp(self):
+        cache.clear()
+        metadata_cache.clear()
+        self.question = Question.objects.create(question_text="좋아하는 과일은?")
+        self.choice = Choice.objects.create(question=self.question, choice_text="사과", votes=3)
+
+    def test_cached_question(self):
+        cached_question(self.question.pk)
+        with self.assertNumQueries(0):
+            question = cached_question(self.question.pk)
+        self.assertEqual(question.choice_list[0].choice_text, "사과")
+        with self.assertNumQueries(1): # 투표수만 조회
+            question = cached_question(self.question.pk, with_votes=True)
+        self.assertEqual(question.choice_list[0].vote_count, 3)
+        self.assertEqual(metadata_cache.stats()["hits"], 2)
+
+    @override_settings(POLLS_METADATA_VERSION_TTL=60)
+    def test_local_version_ttl(self):
+        # version을 프로세스 안에서 재사용 -> LRU에서 찾으면 공유 cache 조회 없음. 같은 프로세스의 수정은 바로 보인다.
+        page_cache.clear_local_versions()
+        self.addCleanup(page_cache.clear_local_versions)
+        cached_question(self.question.pk)
+        with mock.patch.object(page_cache.cache, "get_many") as get_many:
+            self.assertEqual(cached_question(self.question.pk).choice_list[0].choice_text, "사과")
+        get_many.assert_not_called()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.choice.choice_text = "배"
+            self.choice.save()
+        self.assertEqual(cached_question(self.question.pk).choice_list[0].choice_text, "배")
+
+    def test_choice_change_invalidates(self):
+        cached_question(self.question.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.choice.choice_text = "배"
+            self.choice.save()
+        self.assertEqual(cached_question(self.question.pk).choice_list[0].choice_text, "배")
+
+    def assert_invalidated(self, question_text, choice_text):
+        # 새 version의 key는 두 단계(LRU, 공유 cache) 모두 없다 -> DB에서 다시 조회
+        name = f"question:{self.question.pk}"
+        key = metadata._cache_key(self.question.pk, page_cache.get_versions([name])[name])
+        self.assertIsNone(metadata_cache.get(key))
+        self.assertIsNone(cache.get(key))
+        question = cached_question(self.question.pk)
+        self.assertEqual((question.question_text, question.choice_list[0].choice_text), (question_text, choice_text))
+        self.assertEqual(metadata_cache.get(key)["question_text"], question_text)
+        self.assertEqual(cache.get(key)["question_text"], question_text)
+
+    def test_edit_invalidates_both_tiers(self):
+        cached_question(self.question.pk) # LRU + 공유 cache에 저장
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.question_text = "좋아하는 채소는?"
+            self.question.save()
+        self.assert_invalidated("좋아하는 채소는?", "사과")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.choice.choice_text = "당근"
+            self.choice.save()
+        self.assert_invalidated("좋아하는 채소는?", "당근")
+
+    def test_process_cache_not_used(self):
+        # 프로세스별 cache(LocMemCache)는 다른 프로세스의 변경이 보이지 않는다 -> 매번 DB 조회
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            cached_question(self.question.pk)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(cached_question(self.question.pk).question_text, "좋아하는 과일은?")
+            self.assertTrue(queries)
+        self.assertEqual(metadata_cache.stats()["size"], 0)
+
+    def test_lru_eviction(self):
+        lru = LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")     # a를 최근 사용 -> b가 제거된다.
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.stats()["evictions"], 1)
+
+
+class VoteCounterTest(TestCase):
+    # 투표수 증가: 원자적 UPDATE, 샤드 모드는 샤드 row에 나눠서 증가 -> 읽을 때 합산, fold 후 votes로 이동.
+
+    def setUp(self):
+        cache.clear()
+        self.question = create_poll("좋아하는 요일은?", ["월", "금"])
+        self.choice = self.question.choice_set.first()
+
+    def test_atomic_increment(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(increment_choice_votes(self.choice.pk, self.question.pk))
+        # 조회 없이 UPDATE .. SET votes = votes + 1
+        self.assertFalse([q for q in queries if q["sql"].startswith('SELECT "polls_choice"')])
+        self.assertFalse(increment_choice_votes(self.choice.pk, self.question.pk + 1)) # 다른 질문의 보기
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 1)
+
+    @override_settings(POLLS_VOTE_SHARDS=4)
+    def test_sharded_increment_and_fold(self):
+        for _ in range(20):
+            self.assertTrue(increment_choice_votes(self.choice.pk, self.question.pk))
+        self.assertFalse(increment_choice_votes(self.choice.pk, self.question.pk + 1))
+        self.assertLessEqual(ChoiceVoteShard.objects.filter(choice=self.choice).count(), 4)
+        choice = Choice.objects.with_shard_votes().get(pk=self.choice.pk)
+        self.assertEqual((choice.votes, choice.vote_count), (0, 20))
+
+        self.assertEqual(fold_vote_shards(), 20)
+        choice = Choice.objects.with_shard_votes().get(pk=self.choice.pk)
+        self.assertEqual((choice.votes, choice.vote_count), (20, 20))
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.total_votes, 20)
+        self.assertEqual(fold_vote_shards(), 0)
+
+
+class ResultsETagTest(TestCase):
+    # JSON API 결과의 ETag - 투표/질문 수정이 있으면 200, 없으면 304
+
+    def setUp(self):
+        cache.clear()
+        self.question = create_poll("좋아하는 요일은?", ["월", "금"])
+        self.choice = self.question.choice_set.first()
+        self.url = reverse("polls:api_question_results", args=[self.question.pk])
+
+    def assert_changes(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, headers={"If-None-Match": etag}).status_code, 304)
+        increment_choice_votes(self.choice.pk, self.question.pk)
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.question.refresh_from_db()
+        self.question.question_text = "좋아하는 요일은??"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.question.save() # version은 그대로, modified_at만 변경
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["question_text"], "좋아하는 요일은??")
+
+    def test_etag(self):
+        self.assert_changes()
+
+    @override_settings(POLLS_VOTE_SHARDS=4)
+    def test_sharded_etag(self):
+        self.assert_changes()
+        self.assertFalse(self.client.get(self.url).has_header("Last-Modified"))
+
+
+class VoteLedgerTest(TestCase):
+    # 투표 기록(Vote): 사용자당 질문 하나에 한번만 투표 (쿠키가 없어도 DB로 확인)
+
+    def setUp(self):
+        from account.models import User
+
+        cache.clear()
+        self.user = User.objects.create_user("voter", password="pw")
+        self.question = create_poll("좋아하는 영화 장르는?", ["액션", "코미디"])
+        self.choice = self.question.choice_set.first()
+
+    def vote(self, choice_id):
+        client = self.client_class() # 새 client -> voted_question 쿠키 없음
+        client.force_login(self.user)
+        return client.post(reverse("polls:vote"), {"question_id": self.question.pk, "choice": choice_id})
+
+    def test_one_vote_per_user(self):
+        self.assertRedirects(self.vote(self.choice.pk), reverse("polls:vote_result", args=[self.question.pk]))
+        self.assertContains(self.vote(self.choice.pk), "이미 투표한 설문입니다.")
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 1)
+        self.assertEqual(Vote.objects.get(user=self.user).choice_id, self.choice.pk)
+
+    def test_invalid_choice(self):
+        other = create_poll("다른 설문", ["기타"])
+        self.assertContains(self.vote(other.choice_set.first().pk), "보기를 선택하세요.")
+        self.assertContains(self.vote(""), "보기를 선택하세요.")
+        self.assertFalse(Vote.objects.exists())
+        self.assertFalse(Choice.objects.filter(votes__gt=0).exists())
+
+
+@override_settings(POLLS_VOTE_INGEST="buffered", POLLS_VOTE_FLUSHER_THREAD=False, POLLS_RESULT_READ="merged")
+class VoteBufferTest(TestCase):
+    # 투표 로그(write-behind): 잘못된 보기 거절, 미반영 투표수, 죽은 프로세스 로그 replay, 두번 반영하지 않음
+
+    def setUp(self):
+        from account.models import User
+
+        cache.clear()
+        self.log_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.log_dir, ignore_errors=True)
+        settings_override = override_settings(POLLS_VOTE_LOG_DIR=self.log_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.close_vote_log)
+        self.question = create_poll("좋아하는 간식은?", ["떡", "빵"])
+        self.choice = self.question.choice_set.first()
+        self.client.force_login(User.objects.create_user("voter", password="pw"))
+
+    def close_vote_log(self):
+        if vote_buffer._vote_log is not None and vote_buffer._vote_log.file is not None:
+            vote_buffer._vote_log.file.close()
+            vote_buffer._vote_log.file = None
+        vote_buffer._vote_log = None
+
+    def write_log(self, name, count, truncated=False):
+        line = f"{self.question.pk},{self.choice.pk}\n"
+        (self.log_dir / name).write_text(line * count + (line[:-3] if truncated else ""))
+
+    def test_wrong_choice_rejected(self):
+        other = create_poll("다른 설문", ["기타"])
+        response = self.client.post(reverse("polls:vote"), {
+            "question_id": self.question.pk, "choice": other.choice_set.first().pk,
+        })
+        self.assertContains(response, "보기를 선택하세요.")
+        self.assertFalse(Vote.objects.exists())
+        self.assertFalse(list(self.log_dir.iterdir()))
+
+    def test_pending_and_flush(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("polls:vote"), {"question_id": self.question.pk, "choice": self.choice.pk})
+        self.assertEqual(vote_buffer.pending_votes(self.question.pk), {self.choice.pk: 1})
+        self.assertContains(self.client.get(reverse("polls:vote_result", args=[self.question.pk])), "떡 - 1")
+        self.assertEqual(vote_buffer.flush_vote_log(), 1)
+        self.assertEqual(vote_buffer.pending_votes(self.question.pk), {})
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 1)
+
+    def test_replay_after_crash(self):
+        # 죽은 프로세스의 active 파일 (마지막 줄은 쓰다가 잘림) -> 봉인해서 반영
+        self.write_log("active-999999999.log", 2, truncated=True)
+        # commit 후 파일 삭제 전에 죽은 segment -> 다시 반영하지 않는다.
+        self.write_log("segment-1-1.log", 3)
+        VoteLogSegment.objects.create(name="segment-1-1.log")
+        # 파일이 없는 오래된 반영 기록 -> 삭제
+        VoteLogSegment.objects.create(name="segment-0-0.log")
+        VoteLogSegment.objects.filter(name="segment-0-0.log").update(applied_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(vote_buffer.pending_votes(self.question.pk), {self.choice.pk: 2})
+        self.assertEqual(vote_buffer.flush_vote_log(), 2)
+        self.assertFalse(list(self.log_dir.iterdir()))
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 2)
+        self.assertEqual(vote_buffer.flush_vote_log(), 0)
+        self.assertFalse(VoteLogSegment.objects.filter(name="segment-0-0.log").exists())
+
+    @override_settings(POLLS_VOTE_FLUSHER_THREAD=False, POLLS_VOTE_LOG_ROTATE_SECONDS=0.05)
+    def test_rotate_by_age(self):
+        # flusher thread가 없어도 기록한 프로세스가 active 파일을 봉인 -> flush_votes 명령이 반영
+        vote_buffer.append_vote(self.question.pk, self.choice.pk)
+        deadline = time.monotonic() + 5
+        while not list(self.log_dir.glob("segment-*.log")) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(list(self.log_dir.glob("segment-*.log"))), 1)
+        self.assertFalse(list(self.log_dir.glob("active-*.log")))
+        stdout = StringIO()
+        call_command("flush_votes", stdout=stdout)
+        self.assertIn("1표를 반영했습니다.", stdout.getvalue())
+
+    @override_settings(POLLS_VOTE_FLUSHER_THREAD=False, POLLS_VOTE_LOG_ROTATE_SECONDS=None,
+                       POLLS_VOTE_LOG_ROTATE_BYTES=1)
+    def test_rotate_by_size(self):
+        # 한줄마다 크기 제한을 넘는다 -> 기록할 때마다 봉인
+        for _ in range(5):
+            vote_buffer.append_vote(self.question.pk, self.choice.pk)
+        self.assertEqual(len(list(self.log_dir.glob("segment-*.log"))), 5)
+        self.assertEqual(vote_buffer.pending_votes(self.question.pk), {self.choice.pk: 5})
+
+    def test_rollup_uses_vote_time(self):
+        # 시간대별 투표수는 반영 일시가 아닌 로그에 기록된 투표 일시의 구간
+        voted_at = timezone.now() - timedelta(hours=2)
+        vote_buffer.append_vote(self.question.pk, self.choice.pk, at=voted_at.timestamp())
+        vote_buffer.append_vote(self.question.pk, self.choice.pk, at=voted_at.timestamp())
+        self.assertEqual(vote_buffer.flush_vote_log(), 2)
+        rollup = VoteRollupMinute.objects.get()
+        self.assertEqual((rollup.bucket, rollup.votes), (rollups.truncate(voted_at, "minute"), 2))
+
+
+class BulkCreateTest(TestCase):
+    # 설문 등록: 하나의 transaction에서 bulk_create - 설문/보기 수와 관계없이 query 수 일정
+
+    def setUp(self):
+        cache.clear()
+
+    def create(self, count):
+        polls = [(f"질문 {i}", [f"보기 {i}-{j}" for j in range(4)]) for i in range(count)]
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                questions = create_polls(polls)
+        return questions, len(queries)
+
+    def test_create_polls(self):
+        row_count(Question), row_count(Choice) # cache된 전체 개수
+        _, few_queries = self.create(2)
+        questions, many_queries = self.create(40)
+        self.assertEqual(few_queries, many_queries)
+        # 파라미터 개수 제한을 넘으면 bulk_create가 나눠서 INSERT
+        questions, _ = self.create(260)
+        self.assertEqual(Choice.objects.filter(question=questions[-1]).count(), 4)
+        self.assertEqual(Question.objects.get(pk=questions[-1].pk).choice_count, 4)
+        # signal 없이 저장 -> 전체 개수 cache를 직접 변경
+        with self.assertNumQueries(0):
+            self.assertEqual((row_count(Question), row_count(Choice)), (302, 1208))
+        self.assertEqual(Choice.objects.count(), 1208)
+
+    def test_create_poll(self):
+        with self.assertNumQueries(4): # SAVEPOINT, 질문 INSERT, 보기 INSERT 한번, RELEASE
+            question = create_poll("좋아하는 악기는?", ["피아노", "기타", "드럼"])
+        self.assertEqual([c.choice_text for c in question.choice_set.order_by("pk")], ["피아노", "기타", "드럼"])
+
+
+class ImportPollsTest(TestCase):
+    # python manage.py import_polls - batch 저장과 체크포인트는 같은 transaction
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = Path(directory) / "polls.jsonl"
+        lines = [json.dumps({"question_text": f"질문 {i}", "choices": ["예", "아니오"]}) for i in range(5)]
+        self.path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def import_polls(self, **options):
+        call_command("import_polls", str(self.path), batch_size=2, stdout=StringIO(), **options)
+
+    def test_import(self):
+        self.import_polls()
+        self.assertEqual(Question.objects.count(), 5)
+        self.assertEqual(Choice.objects.count(), 10)
+        self.assertFalse(ImportCheckpoint.objects.exists()) # 완료 -> 체크포인트 삭제
+
+    def test_resume_after_crash(self):
+        # 두번째 batch의 체크포인트 저장 중 실패 -> 그 batch의 설문도 rollback
+        update_or_create = ImportCheckpoint.objects.update_or_create
+        calls = []
+
+        def failing_update_or_create(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("중단")
+            return update_or_create(*args, **kwargs)
+
+        with mock.patch.object(ImportCheckpoint.objects, "update_or_create", failing_update_or_create):
+            with self.assertRaises(RuntimeError):
+                self.import_polls()
+        self.assertEqual(Question.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().offset, len(b"".join(self.path.read_bytes().splitlines(True)[:2])))
+        # 다시 실행 -> 체크포인트부터 이어서 처리 (중복 없음)
+        self.import_polls()
+        self.assertEqual(sorted(Question.objects.values_list("question_text", flat=True)),
+                         [f"질문 {i}" for i in range(5)])
+
+    def test_invalid_line(self):
+        self.path.write_text('{"question_text": "질문", "choices": ["예"]}\n[1, 2]\n', encoding="utf-8")
+        with self.assertRaisesMessage(CommandError, "JSON object"):
+            self.import_polls()
+        self.assertFalse(Question.objects.exists())
+
+
+class ExportResultsTest(TestCase):
+    # 설문 결과 내보내기 (polls/export.py, views.export_results)
+
+    def setUp(self):
+        from account.models import User
+        old = timezone.now() - timedelta(days=30)
+        self.edited = create_poll("수정된 질문", ["예", "아니오"])
+        self.unchanged = create_poll("예전 질문", ["예", "아니오"])
+        Question.objects.update(pub_date=old, modified_at=old)
+        self.url = reverse("polls:export")
+        self.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+
+    def test_staff_only(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(len(b"".join(response.streaming_content).decode().splitlines()), 5) # header + 보기 4개
+
+    def test_since_includes_modified(self):
+        since = timezone.now() - timedelta(days=1)
+        self.edited.question_text = "수정된 질문!"
+        self.edited.save() # modified_at 변경
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {"format": "jsonl", "since": since.date().isoformat()})
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([line["id"] for line in lines], [self.edited.pk])
+
+
+class QuestionTotalsTest(TestCase):
+    # Question.total_votes, choice_count 는 투표/보기 등록과 같은 transaction에서 변경.
+
+    def setUp(self):
+        cache.clear()
+        self.question = create_poll("좋아하는 운동은?", ["축구", "야구"])
+        self.popular = create_poll("좋아하는 음식은?", ["김치", "불고기"])
+
+    def test_totals_maintained(self):
+        choice = self.popular.choice_set.first()
+        increment_choice_votes(choice.pk, self.popular.pk, amount=3)
+        Choice.objects.create(question=self.popular, choice_text="비빔밥")
+        self.popular.refresh_from_db()
+        self.assertEqual((self.popular.total_votes, self.popular.choice_count), (3, 3))
+
+        choice.delete()
+        self.popular.refresh_from_db()
+        self.assertEqual((self.popular.total_votes, self.popular.choice_count), (0, 2))
+
+    def test_repair(self):
+        Choice.objects.filter(question=self.popular).update(votes=5) # 집계값이 맞지 않는 상태
+        self.assertEqual(recompute_question_totals(), 1)
+        self.popular.refresh_from_db()
+        self.assertEqual(self.popular.total_votes, 10)
+        self.assertEqual(recompute_question_totals(), 0)
+
+    def test_list_most_voted(self):
+        increment_choice_votes(self.popular.choice_set.first().pk, self.popular.pk)
+        response = self.client.get(reverse("polls:list"), {"order": "votes"})
+        questions = [q.pk for q in response.context["question_list"]]
+        self.assertEqual(questions, [self.popular.pk, self.question.pk])
+
+
+@override_settings(POLLS_TRENDING_SNAPSHOT_THREAD=False, POLLS_TRENDING_HALF_LIFE=3600)
+class TrendingTest(TestCase):
+    # 시간 감소 점수 순위 - 최근 투표가 많은 질문이 위로.
+
+    def setUp(self):
+        trending._board = None
+        self.old = Question.objects.create(question_text="예전에 인기있던 질문")
+        self.new = Question.objects.create(question_text="요즘 인기있는 질문")
+
+    def test_decayed_ranking(self):
+        now = time.time()
+        for _ in range(4):
+            trending.record_vote(self.old.pk, timestamp=now - 3 * 3600) # 반감기 3번 -> 4 * 1/8 = 0.5점
+        trending.record_vote(self.new.pk, timestamp=now)
+        (first, first_score), (second, second_score) = trending.top_questions(2)
+        self.assertEqual((first, second), (self.new.pk, self.old.pk))
+        self.assertAlmostEqual(first_score, 1, places=2)
+        self.assertAlmostEqual(second_score, 0.5, places=2)
+
+    def test_snapshot_and_api(self):
+        trending.record_vote(self.new.pk)
+        trending.record_vote(self.new.pk)
+        self.assertEqual(trending.snapshot(), 1)
+        trending._board = None # 새 프로세스 -> DB의 점수로 시작
+        response = self.client.get(reverse("polls:api_trending"), {"k": "5"})
+        results = response.json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.new.pk])
+        self.assertAlmostEqual(results[0]["score"], 2, places=2)
+
+
+class LiveResultsTest(TestCase):
+    # 투표 결과 실시간 전송 (polls/live.py) - ASGI에서만 SSE, 투표 한번 -> 모든 구독자에게 전달
+
+    def setUp(self):
+        cache.clear()
+        self.question = create_poll("좋아하는 색은?", ["빨강", "파랑"])
+        self.choice = self.question.choice_set.first()
+        self.url = reverse("polls:vote_result_stream", args=[self.question.pk])
+
+    def test_wsgi_no_stream(self):
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+        response = self.client.get(reverse("polls:vote_result", args=[self.question.pk]))
+        self.assertNotContains(response, "EventSource")
+
+    @override_settings(POLLS_ASYNC_VIEWS=True)
+    async def test_stream(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        response = await self.async_client.get(reverse("polls:vote_result", args=[self.question.pk]))
+        self.assertContains(response, "EventSource")
+        # 응답 본문: 처음 연결하면 현재 결과
+        events = live.result_events(self.question.pk)
+        first = await asyncio.wait_for(anext(events), 5)
+        self.assertTrue(first.startswith("data: "))
+        self.assertEqual(json.loads(first[len("data: "):])["question_text"], "좋아하는 색은?")
+        await events.aclose()
+        self.assertFalse(live.hub.states) # 연결 종료 -> 구독 해제
+
+    @override_settings(POLLS_LIVE_INTERVAL=0)
+    async def test_fan_out(self):
+        queues = [await live.hub.subscribe(self.question.pk) for _ in range(2)]
+        try:
+            for queue in queues:
+                data = json.loads(await asyncio.wait_for(queue.get(), 5))
+                self.assertEqual(data["choices"][0]["votes"], 0)
+
+            def vote():
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertTrue(views.record_vote(self.question.pk, self.choice.pk))
+            await sync_to_async(vote)()
+            for queue in queues:
+                data = json.loads(await asyncio.wait_for(queue.get(), 5))
+                self.assertEqual(data["choices"][0]["votes"], 1)
+        finally:
+            for queue in queues:
+                live.hub.unsubscribe(self.question.pk, queue)
+        self.assertFalse(live.hub.states)
+
+
+class AsyncViewTest(TestCase):
+    # ASGI용 async View (views.alist, avote_form, avote_result) - async ORM으로 조회
+
+    def setUp(self):
+        cache.clear()
+        self.questions = create_polls([(f"질문 {i}", ["예", "아니오"]) for i in range(12)])
+        self.choice = Choice.objects.filter(question=self.questions[0]).order_by("pk").first()
+        self.factory = AsyncRequestFactory()
+
+    async def render(self, view, path, *args, **params):
+        request = self.factory.get(path, params)
+        async def auser():
+            return AnonymousUser()
+        request.auser = auser
+        return await view(request, *args)
+
+    def title(self, index):
+        return f'href="{reverse("polls:vote_form", args=[self.questions[index].pk])}"'
+
+    async def test_list(self):
+        response = await self.render(views.alist, reverse("polls:list"))
+        self.assertContains(response, self.title(11))
+        self.assertNotContains(response, self.title(1))
+        response = await self.render(views.alist, reverse("polls:list"), page="2")
+        self.assertContains(response, self.title(0))
+        self.assertNotContains(response, self.title(11))
+        response = await self.render(views.alist, reverse("polls:list"), order="votes", page="2") # offset paging
+        self.assertContains(response, self.title(0))
+        self.assertNotContains(response, self.title(11))
+
+    async def test_vote_form_and_result(self):
+        question_id = self.questions[0].pk
+        response = await self.render(views.avote_form, reverse("polls:vote_form", args=[question_id]), question_id)
+        self.assertContains(response, "질문 0")
+        self.assertContains(response, "아니오")
+        await sync_to_async(views.record_vote)(question_id, self.choice.pk)
+        response = await self.render(views.avote_result, reverse("polls:vote_result", args=[question_id]),
+                                     question_id)
+        self.assertContains(response, "예 - 1")
+        with self.assertRaises(Http404):
+            await self.render(views.avote_form, reverse("polls:vote_form", args=[question_id]), question_id + 1000)
+
+
+class ReplicaRouterTest(TestCase):
+    # 읽기/쓰기 DB 분리 (polls/routers.py) - 쓰기는 primary, 요청의 조회는 replica, 쓰기 후에는 primary
+
+    def setUp(self):
+        from account.models import User
+        self.user_model = User
+        self.factory = RequestFactory()
+        self.router = routers.PrimaryReplicaRouter()
+        patcher = mock.patch("polls.routers.replica_enabled", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def route(self, request, write=False):
+        # 요청 처리 중의 (Question 조회, User 조회, 쓰기 후 Question 조회) DB와 응답
+        databases = []
+        def view(request):
+            databases.extend([self.router.db_for_read(Question), self.router.db_for_read(self.user_model)])
+            if write:
+                databases.append(self.router.db_for_write(Question))
+            databases.append(self.router.db_for_read(Question))
+            return HttpResponse()
+        response = routers.ReplicaRoutingMiddleware(view)(request)
+        return databases, response
+
+    def test_read_from_replica(self):
+        databases, response = self.route(self.factory.get("/polls/vote_list"))
+        self.assertEqual(databases, ["replica", "default", "replica"])
+        self.assertNotIn(routers.STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_read(Question), "default") # 요청 밖
+
+    def test_write_sticks_to_primary(self):
+        databases, response = self.route(self.factory.get("/polls/vote_list"), write=True)
+        self.assertEqual(databases, ["replica", "default", "default", "default"])
+        cookie = response.cookies[routers.STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.POLLS_REPLICA_STICKY_SECONDS)
+        # POST 요청, sticky 쿠키가 있는 요청 -> primary
+        databases, _ = self.route(self.factory.post("/polls/vote"))
+        self.assertEqual(databases, ["default", "default", "default"])
+        request = self.factory.get("/polls/vote_result/1")
+        request.COOKIES[routers.STICKY_COOKIE] = "1"
+        databases, _ = self.route(request)
+        self.assertEqual(databases, ["default", "default", "default"])
+
+
+class VoteRollupTest(TestCase):
+    # 분 단위로 기록, 오래된 구간은 시간 단위로 합쳐도 시간대별 투표수는 같다.
+
+    def setUp(self):
+        cache.clear()
+        self.question = create_poll("좋아하는 숫자는?", ["1", "2"])
+        self.choice = self.question.choice_set.first()
+
+    def test_compact_and_timeline(self):
+        now = timezone.now()
+        two_days_ago = now - timedelta(days=2)
+        for minutes in (0, 1, 61):
+            rollups.add_votes(self.question.pk, self.choice.pk, at=two_days_ago + timedelta(minutes=minutes))
+        rollups.add_votes(self.question.pk, self.choice.pk, 2, at=now)
+        before = rollups.timeline(self.question.pk, "hour", count=72, now=now)
+
+        self.assertEqual(rollups.compact_rollups(now=now)["minute"], 3)
+        self.assertEqual(VoteRollupMinute.objects.count(), 1)
+        self.assertEqual(sum(VoteRollupHour.objects.values_list("votes", flat=True)), 3)
+        starts, series = rollups.timeline(self.question.pk, "hour", count=72, now=now)
+        self.assertEqual((starts, series), before)
+        self.assertEqual(sum(series[self.choice.pk]), 5)
+
+    @override_settings(POLLS_VOTE_SHARDS=4)
+    def test_sharded_rows(self):
+        # 샤드 모드: 같은 구간을 샤드 row로 나눠서 증가, 조회/압축은 합산
+        now = timezone.now()
+        for _ in range(20):
+            rollups.add_votes(self.question.pk, self.choice.pk, at=now)
+        rollups.add_votes_bulk([(self.question.pk, self.choice.pk)], at=now)
+        self.assertLessEqual(VoteRollupMinute.objects.count(), 4)
+        self.assertGreater(VoteRollupMinute.objects.count(), 1)
+        _, series = rollups.timeline(self.question.pk, "minute", now=now)
+        self.assertEqual(series[self.choice.pk][-1], 21)
+        rollups.compact_rollups(now=now + timedelta(days=2))
+        self.assertEqual(VoteRollupHour.objects.get().votes, 21)
+
+    def test_timeline_view(self):
+        rollups.add_votes(self.question.pk, self.choice.pk)
+        response = self.client.get(reverse("polls:api_question_timeline", args=[self.question.pk]),
+                                   {"unit": "minute"})
+        choices = response.json()["choices"]
+        self.assertEqual([c["votes"][-1] for c in choices], [1, 0])
+
+
+class ArchivePollTest(TestCase):
+    # 마감된 오래된 설문은 snapshot으로 옮기고 삭제. 결과는 snapshot으로 조회.
+
+    def setUp(self):
+        cache.clear()
+        self.question = create_poll("작년 설문", ["예", "아니오"])
+        increment_choice_votes(self.question.choice_set.first().pk, self.question.pk, amount=7)
+        Question.objects.filter(pk=self.question.pk).update(end_date=timezone.now() - timedelta(days=40))
+        self.open_question = create_poll("진행중인 설문", ["예"])
+
+    def test_archive_and_result(self):
+        self.assertEqual(archive_polls(timedelta(days=30), batch_size=1), 1)
+        self.assertFalse(Question.objects.filter(pk=self.question.pk).exists())
+        self.assertTrue(Question.objects.filter(pk=self.open_question.pk).exists())
+        response = self.client.get(reverse("polls:vote_result", args=[self.question.pk]))
+        self.assertContains(response, "예 - 7")
+        self.assertContains(response, "보관된 설문입니다.")
+
+    def create_closed_polls(self, count, user):
+        # 투표 기록, 샤드 카운터, 시간대별 집계가 있는 마감된 설문들
+        for i in range(count):
+            question = create_poll(f"마감 설문 {i}", ["예", "아니오"])
+            choice = question.choice_set.first()
+            Vote.objects.create(user=user, question=question, choice=choice)
+            rollups.add_votes(question.pk, choice.pk)
+            increment_choice_votes(choice.pk, question.pk)
+        Question.objects.filter(question_text__startswith="마감 설문").update(
+            end_date=timezone.now() - timedelta(days=40))
+
+    @override_settings(POLLS_VOTE_SHARDS=2)
+    def test_delete_query_count(self):
+        # 삭제는 테이블별 DELETE 한번씩 -> 설문 수와 관계없이 query 수 일정
+        from account.models import User
+
+        user = User.objects.create_user("voter", password="pw")
+        counts = []
+        for count in (2, 6):
+            row_count(Question) # cache된 전체 개수
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_closed_polls(count, user)
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    archive_polls(timedelta(days=30), batch_size=100)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(list(Question.objects.values_list("pk", flat=True)), [self.open_question.pk])
+        for rows in (Choice.objects.exclude(question=self.open_question), ChoiceVoteShard.objects.all(),
+                     Vote.objects.all(), VoteRollupMinute.objects.all()):
+            self.assertFalse(rows.exists())
+        self.assertEqual(ArchivedPoll.objects.get(question_text="마감 설문 5").results[0][2], 1) # 샤드 카운터 포함
+        with self.assertNumQueries(0): # 전체 개수 cache도 변경
+            self.assertEqual(row_count(Question), 1)
+
+    @override_settings(POLLS_VOTE_INGEST="buffered", POLLS_VOTE_FLUSHER_THREAD=False)
+    def test_command_flushes_vote_log(self):
+        # 투표 로그의 미반영 투표를 먼저 반영 -> snapshot에 포함
+        log_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, log_dir, ignore_errors=True)
+        with override_settings(POLLS_VOTE_LOG_DIR=log_dir):
+            (log_dir / "segment-1-1.log").write_text(f"{self.question.pk},{self.question.choice_set.first().pk}\n")
+            call_command("archive_polls", stdout=StringIO())
+        self.assertEqual(ArchivedPoll.objects.get(pk=self.question.pk).results[0][2], 8)
+
+    def test_closed_poll_vote(self):
+        from account.models import User
+
+        self.client.force_login(User.objects.create_user("voter", password="pw"))
+        response = self.client.post(reverse("polls:vote"), {
+            "question_id": self.question.pk, "choice": self.question.choice_set.first().pk,
+        })
+        self.assertContains(response, "마감된 설문입니다.")
+        self.assertFalse(Vote.objects.exists())
+
+
+class VotedCookieTest(TestCase):
+    # 투표한 질문 쿠키: 서명된 bitset, 크기 제한, 예전 방식 쿠키 변환
+
+    def setUp(self):
+        from account.models import User
+
+        cache.clear()
+        self.user = User.objects.create_user("voter", password="pw")
+        self.client.force_login(self.user)
+        self.question = create_poll("쿠키 설문", ["예", "아니오"])
+        self.choice = self.question.choice_set.first()
+
+    def test_bitset(self):
+        voted = voted_cookie.VotedQuestions([5, 700, 13])
+        decoded = voted_cookie.VotedQuestions.decode(voted.encode(self.user.pk), self.user.pk)
+        self.assertEqual(list(decoded), [5, 13, 700])
+        self.assertNotIn(6, decoded)
+        # 크기 제한 -> ID가 작은 질문부터 제외
+        decoded = voted_cookie.VotedQuestions.decode(voted.encode(self.user.pk, max_bytes=2), self.user.pk)
+        self.assertEqual(list(decoded), [700])
+        # 다른 사용자 / 변조된 쿠키
+        with self.assertRaises(signing.BadSignature):
+            voted_cookie.VotedQuestions.decode(voted.encode(self.user.pk), self.user.pk + 1)
+        with self.assertRaises(signing.BadSignature):
+            voted_cookie.VotedQuestions.decode(voted.encode(self.user.pk) + "x", self.user.pk)
+
+    def test_vote_sets_cookie(self):
+        data = {"question_id": self.question.pk, "choice": self.choice.pk}
+        response = self.client.post(reverse("polls:vote"), data)
+        value = response.cookies[voted_cookie.COOKIE_NAME].value
+        self.assertIn(self.question.pk, voted_cookie.VotedQuestions.decode(value, self.user.pk))
+        # 쿠키로 거절 -> Vote 조회/insert 없음
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("polls:vote"), data)
+        self.assertContains(response, "이미 투표한 설문입니다.")
+        self.assertFalse([q for q in queries if "polls_vote" in q["sql"]])
+
+    def test_legacy_cookie_upgraded(self):
+        self.client.cookies[voted_cookie.COOKIE_NAME] = f"{self.question.pk},99999"
+        response = self.client.post(reverse("polls:vote"), {
+            "question_id": self.question.pk, "choice": self.choice.pk,
+        })
+        self.assertContains(response, "이미 투표한 설문입니다.")
+        self.assertTrue(Vote.objects.filter(user=self.user, question=self.question).exists())
+        value = response.cookies[voted_cookie.COOKIE_NAME].value
+        self.assertEqual(list(voted_cookie.VotedQuestions.decode(value, self.user.pk)), [self.question.pk])
+
+
+class SurveyTest(TestCase):
+    # 설문 모드: 여러 질문을 한번의 POST로 투표
+
+    def setUp(self):
+        from account.models import User
+
+        cache.clear()
+        self.user = User.objects.create_user("voter", password="pw")
+        self.client.force_login(self.user)
+        self.questions = [create_poll(f"설문 {i}", ["예", "아니오"]) for i in range(5)]
+        self.ids = ",".join(str(q.pk) for q in self.questions)
+
+    def answers(self, questions):
+        return {f"choice_{q.pk}": q.choice_set.first().pk for q in questions}
+
+    @override_settings(POLLS_SURVEY_MAX_QUESTIONS=3)
+    def test_parse_question_ids(self):
+        # 순서 유지, 중복/잘못된 값 제거, 최대 개수
+        self.assertEqual(survey.parse_question_ids("5, 2,x,5,,2,9,1"), [5, 2, 9])
+        self.assertEqual(survey.parse_question_ids(",".join(["7"] * 100000)), [7])
+        self.assertEqual(survey.parse_question_ids(None), [])
+
+    def test_form(self):
+        with self.assertNumQueries(5): # session, user, 질문, 보기, 이미 투표한 질문
+            response = self.client.get(reverse("polls:survey") + f"?ids={self.ids}")
+        for question in self.questions:
+            self.assertContains(response, f'name="choice_{question.pk}"')
+
+    def test_batch_vote(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("polls:survey"), {
+                "question_ids": self.ids, **self.answers(self.questions[:4]),
+            })
+        # 질문 수와 상관없이 보기 UPDATE 한번
+        self.assertEqual(len([q for q in queries if q["sql"].startswith('UPDATE "polls_choice"')]), 1)
+        self.assertRedirects(response, reverse("polls:survey_result") + f"?ids={self.ids}")
+        self.assertEqual(Vote.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            [q.total_votes for q in Question.objects.filter(pk__in=[q.pk for q in self.questions]).order_by("pk")],
+            [1, 1, 1, 1, 0],
+        )
+        self.assertEqual(VoteRollupMinute.objects.filter(votes=1).count(), 4)
+        voted = voted_cookie.VotedQuestions.decode(response.cookies[voted_cookie.COOKIE_NAME].value, self.user.pk)
+        self.assertEqual(list(voted), [q.pk for q in self.questions[:4]])
+        response = self.client.get(response.url)
+        self.assertContains(response, "예 - 1", count=4)
+
+    def test_duplicate_rejects_batch(self):
+        Vote.objects.create(user=self.user, question=self.questions[0])
+        response = self.client.post(reverse("polls:survey"), {
+            "question_ids": self.ids, **self.answers(self.questions[:2]),
+        })
+        self.assertContains(response, "이미 투표한 설문입니다.")
+        self.assertEqual(Vote.objects.count(), 1)
+        self.assertFalse(Choice.objects.filter(votes__gt=0).exists())
+
+    def test_other_integrity_error_raised(self):
+        # 중복 투표가 아닌 IntegrityError -> 저장된 것처럼 처리하지 않는다.
+        answers = {q.pk: q.choice_set.first().pk for q in self.questions[:2]}
+        with mock.patch.object(survey, "_apply_votes", side_effect=IntegrityError("CHECK constraint failed")):
+            with self.assertRaises(IntegrityError):
+                survey.submit_survey(self.user, answers)
+        # 중복 확인 후 다른 요청에서 먼저 투표 -> 중복 오류
+        def concurrent_vote(user, pairs):
+            Vote.objects.create(user=user, question=self.questions[0])
+            raise IntegrityError("UNIQUE constraint failed")
+
+        with mock.patch.object(survey, "_apply_votes", side_effect=concurrent_vote):
+            self.assertEqual(survey.submit_survey(self.user, answers), {self.questions[0].pk: "이미 투표한 설문입니다."})
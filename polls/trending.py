@@ -0,0 +1,205 @@
+# polls/trending.py - 인기 급상승(trending) 설문 순위
+#
+# 최근 투표가 많은 질문 순위. 투표 테이블 전체를 집계하지 않고 투표가 있을 때마다 점수를 갱신한다.
+#  - 점수: 투표 한건 = 1점, 시간이 지나면 반감기(settings.POLLS_TRENDING_HALF_LIFE 초)마다 절반으로 감소.
+#  - forward decay: 점수를 기준일시(EPOCH) 기준의 log 값으로 저장
+#       log_score = log( sum(exp(λ * (투표일시 - EPOCH))) ),  λ = ln2 / 반감기
+#     -> 시간이 지나도 저장된 값(순서)은 바뀌지 않는다. (모든 점수를 주기적으로 감소시킬 필요가 없다)
+#     -> 현재 점수 = exp(log_score - λ * (현재 - EPOCH))
+#  - 메모리: {question_id: log_score} + log_score 내림차순 정렬 list
+#     -> 상위 K개 조회는 정렬 list의 앞 K개 (O(K)), 최대 settings.POLLS_TRENDING_CAPACITY 개 유지.
+#  - DB 저장(snapshot): settings.POLLS_TRENDING_SNAPSHOT_INTERVAL 초마다 백그라운드 thread가
+#     이 프로세스에서 받은 투표 점수를 TrendingScore 테이블에 더하고(logaddexp),
+#     DB의 상위 점수들로 메모리 순위를 다시 만든다. (여러 프로세스의 투표가 합쳐진다)
+#     점수가 POLLS_TRENDING_MIN_SCORE 보다 작아진 질문은 삭제.
+#
+# 투표 기록: polls.views.vote -> record_vote(question_id) (commit 후)
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from .models import Question, TrendingScore
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+
+
+def _decay_rate():
+    return math.log(2) / getattr(settings, "POLLS_TRENDING_HALF_LIFE", 3600)
+
+
+def _log_weight(timestamp):
+    # timestamp 일시의 투표 한건의 log 점수
+    return _decay_rate() * (timestamp - EPOCH)
+
+
+def _logaddexp(a, b):
+    # log(exp(a) + exp(b)) - exp() overflow 없이 계산
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+
+def current_score(log_score, now=None):
+    # log_score -> 현재 시점의 점수
+    return math.exp(log_score - _log_weight(time.time() if now is None else now))
+
+
+class TrendingBoard:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.log_scores = {}  # {question_id: log_score}
+        self.ranking = []     # [(-log_score, question_id)] 정렬 -> 앞쪽이 높은 점수
+        self.pending = {}     # {question_id: log_score} DB에 저장하지 않은 점수
+
+    def _set(self, question_id, log_score):
+        old = self.log_scores.get(question_id)
+        if old is not None:
+            del self.ranking[bisect_left(self.ranking, (-old, question_id))]
+        self.log_scores[question_id] = log_score
+        insort(self.ranking, (-log_score, question_id))
+        while len(self.ranking) > self.capacity:
+            # 점수가 가장 낮은 질문 제거
+            _, removed = self.ranking.pop()
+            del self.log_scores[removed]
+
+    def add(self, question_id, log_weight):
+        with self.lock:
+            old = self.log_scores.get(question_id)
+            self._set(question_id, log_weight if old is None else _logaddexp(old, log_weight))
+            old = self.pending.get(question_id)
+            self.pending[question_id] = log_weight if old is None else _logaddexp(old, log_weight)
+
+    def top(self, k, now=None):
+        # 점수 상위 k개 [(question_id, 현재 점수)]
+        now = time.time() if now is None else now
+        with self.lock:
+            return [(question_id, current_score(-neg, now)) for neg, question_id in self.ranking[:k]]
+
+    def take_pending(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            return pending
+
+    def restore_pending(self, pending):
+        # DB 저장 실패 -> 다음 snapshot 때 다시 저장
+        with self.lock:
+            for question_id, log_score in pending.items():
+                old = self.pending.get(question_id)
+                self.pending[question_id] = log_score if old is None else _logaddexp(old, log_score)
+
+    def reload(self, rows):
+        # DB의 점수들 + 아직 저장하지 않은 점수로 순위를 다시 만든다.
+        with self.lock:
+            self.log_scores = {}
+            self.ranking = []
+            for question_id, log_score in rows:
+                pending = self.pending.get(question_id)
+                self._set(question_id, log_score if pending is None else _logaddexp(log_score, pending))
+            for question_id, log_score in self.pending.items():
+                if question_id not in self.log_scores:
+                    self._set(question_id, log_score)
+
+
+_board = None
+_board_lock = threading.Lock()
+
+
+def get_board():
+    # 프로세스당 하나의 순위표. 처음 사용할 때 DB의 점수로 초기화.
+    global _board
+    if _board is None:
+        with _board_lock:
+            if _board is None:
+                board = TrendingBoard(getattr(settings, "POLLS_TRENDING_CAPACITY", 10000))
+                board.reload(_load_rows(board.capacity))
+                _board = board
+    return _board
+
+
+def _load_rows(limit):
+    return TrendingScore.objects.order_by("-log_score").values_list("question_id", "log_score")[:limit]
+
+
+def record_vote(question_id, timestamp=None):
+    # 투표 한건을 순위에 반영
+    get_board().add(int(question_id), _log_weight(time.time() if timestamp is None else timestamp))
+    if getattr(settings, "POLLS_TRENDING_SNAPSHOT_THREAD", True):
+        start_snapshotter()
+
+
+def top_questions(k):
+    # 점수 상위 k개 [(question_id, 현재 점수)]
+    return get_board().top(k)
+
+
+def snapshot():
+    # 이 프로세스에서 받은 점수를 DB에 더하고, DB의 상위 점수로 메모리 순위를 다시 만든다.
+    # 반환: DB에 저장한 질문 수
+    board = get_board()
+    pending = board.take_pending()
+    try:
+        with transaction.atomic():
+            if pending:
+                rows = TrendingScore.objects.select_for_update().in_bulk(pending.keys())
+                for question_id, log_score in pending.items():
+                    row = rows.get(question_id)
+                    if row is not None:
+                        row.log_score = _logaddexp(row.log_score, log_score)
+                TrendingScore.objects.bulk_update(rows.values(), ["log_score"])
+                # 삭제된 질문은 FK 오류 -> 존재하는 질문만 저장
+                new_ids = set(pending) - set(rows)
+                TrendingScore.objects.bulk_create(
+                    TrendingScore(question_id=question_id, log_score=pending[question_id])
+                    for question_id in Question.objects.filter(pk__in=new_ids).values_list("pk", flat=True)
+                )
+            # 점수가 최소 점수보다 작아진 질문 삭제 (보관 기간)
+            min_score = getattr(settings, "POLLS_TRENDING_MIN_SCORE", 0.01)
+            TrendingScore.objects.filter(
+                log_score__lt=_log_weight(time.time()) + math.log(min_score)
+            ).delete()
+    except DatabaseError:
+        # DB 오류, 다른 프로세스가 같은 질문의 row를 먼저 생성(IntegrityError) 등
+        #  -> 다음 snapshot 때 다시 저장
+        board.restore_pending(pending)
+        raise
+    board.reload(_load_rows(board.capacity))
+    return len(pending)
+
+
+# 백그라운드 snapshot thread
+########################################
+_snapshotter = None
+
+
+def _snapshot_loop(interval):
+    from django.db import close_old_connections
+    while True:
+        time.sleep(interval)
+        try:
+            snapshot()
+        except Exception:
+            # DB 오류등 - 점수는 메모리에 남아있으므로 다음 주기에 다시 시도.
+            pass
+        finally:
+            close_old_connections()
+
+
+def start_snapshotter():
+    # 프로세스당 하나의 snapshot thread를 시작. (daemon - 서버 종료시 같이 종료)
+    global _snapshotter
+    if _snapshotter is not None and _snapshotter.is_alive():
+        return
+    with _board_lock:
+        if _snapshotter is not None and _snapshotter.is_alive():
+            return
+        interval = getattr(settings, "POLLS_TRENDING_SNAPSHOT_INTERVAL", 60)
+        _snapshotter = threading.Thread(target=_snapshot_loop, args=(interval,),
+                                        name="trending-snapshot", daemon=True)
+        _snapshotter.start()
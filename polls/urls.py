@@ -1,6 +1,7 @@
 # polls/urls.py - polls app의 url-mapping을 설정
 ## url - view
 
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -8,14 +9,33 @@ app_name = "polls"
 # url mapping 설정으로 호출할 때 사용할 접두어 설정.
 ## welcome 호출 -> polls:welcome
 
+# 읽기 View: ASGI로 실행하면 async View, WSGI로 실행하면 sync View (config/asgi.py)
+if settings.POLLS_ASYNC_VIEWS:
+    list_view, vote_form_view, vote_result_view = views.alist, views.avote_form, views.avote_result
+else:
+    list_view, vote_form_view, vote_result_view = views.list, views.vote_form, views.vote_result
+
 urlpatterns = [
     path("welcome", views.welcome_poll, name="welcome"),
-    path("vote_list", views.list, name="list"),
-    path("vote_form/<int:question_id>", views.vote_form, name="vote_form"),
+    path("vote_list", list_view, name="list"),
+    path("vote_form/<int:question_id>", vote_form_view, name="vote_form"),
     path("vote", views.vote, name="vote"),
-    path("vote_result/<int:question_id>", views.vote_result, name="vote_result"),
+    path("vote_result/<int:question_id>", vote_result_view, name="vote_result"),
+    path("vote_result/<int:question_id>/timeline", views.vote_timeline, name="vote_timeline"),
+    path("vote_result/<int:question_id>/stream", views.vote_result_stream, name="vote_result_stream"),
     path("vote_create", views.vote_create, name="vote_create"),
-    path("", views.list, name="polls_main"), # http://127.0.0.1:8000/polls/
+    path("survey", views.survey_form, name="survey"),
+    path("survey/result", views.survey_result, name="survey_result"),
+    path("export", views.export_results, name="export"),
+    path("api/questions", views.api_question_list, name="api_question_list"),
+    path("api/questions/<int:question_id>/results", views.api_question_results,
+         name="api_question_results"),
+    path("trending", views.trending_list, name="trending"),
+    path("api/questions/<int:question_id>/timeline", views.api_question_timeline,
+         name="api_question_timeline"),
+    path("api/trending", views.api_trending, name="api_trending"),
+    path("api/metadata_cache_stats", views.api_metadata_cache_stats, name="api_metadata_cache_stats"),
+    path("", list_view, name="polls_main"), # http://127.0.0.1:8000/polls/
 ]
 # python manage.py runserver
 # http://127.0.0.1:8000/polls/list -> views.list() -> list.html -> User
@@ -23,8 +43,20 @@ urlpatterns = [
 # http://127.0.0.1:8000/polls/vote -> 투표처리
 
 # http://127.0.0.1:8000/polls/vote_result/1
+# http://127.0.0.1:8000/polls/vote_result/1/stream  (ASGI 서버 필요)
+# http://127.0.0.1:8000/polls/vote_result/1/timeline?unit=hour
 
 # http://127.0.0.1:8000/polls/vote_create
+# http://127.0.0.1:8000/polls/survey?ids=1,2,3
+# http://127.0.0.1:8000/polls/survey/result?ids=1,2,3
+
+# http://127.0.0.1:8000/polls/export?format=jsonl&since=2025-07-01
+# http://127.0.0.1:8000/polls/api/questions?cursor=100&limit=20
+# http://127.0.0.1:8000/polls/api/questions/1/results
+# http://127.0.0.1:8000/polls/api/questions/1/timeline?unit=minute
+# http://127.0.0.1:8000/polls/api/metadata_cache_stats
+# http://127.0.0.1:8000/polls/trending?k=10
+# http://127.0.0.1:8000/polls/api/trending?k=10
 
 ### <타입:받을view의파라미터이름>
 
@@ -6,14 +6,35 @@
 ## 3. template(응답화면이 있는 경우)
 
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
+from django.http import (
+    HttpResponse, Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
 from django.urls import reverse # urls.py의 path이름으로 설정된 url을 조회하는 메소드
-from django.core.paginator import Paginator
 
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.conf import settings
+from asgiref.sync import sync_to_async
 
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+import hashlib
+import time
 from datetime import datetime 
-from .models import Question, Choice # 모델 클래스들 import
+
+from .models import Question, Choice, Vote, ArchivedPoll # 모델 클래스들 import
+from .counters import get_vote_shards, increment_choice_votes
+from .bulk import create_poll
+from .export import EXPORT_FORMATS, export_lines, parse_since
+from .pagination import offset_page_context, keyset_page_context, akeyset_page_context, parse_cursor
+from .metadata import acached_question, cached_question, metadata_cache
+from .page_cache import bump_vote_pages, cache_anonymous_page, page_cache_context
+from . import live, rollups, survey, trending, vote_buffer, voted_cookie
 
 def welcome_poll_old(request):
     # view 함수 -> 1개 이상의 파라미터를 선언. (1개 필수-HttpRequest객체를 받는다.)
@@ -74,41 +95,43 @@ def list_no_paging(request):
 #   - 현재 페이지가 속한 페이지 그룹의 시작/끝 페이지 번호
 #   - 현재 페이지 그룹의 시작페이지가 **이전페이지가 있는지 여부/이전 페이지번호**
 #   - 현재 페이지 그룹의 끝 페이지가 **다음페이지가 있는지 여부/다음 페이지번호**
+# - 페이지 cache (polls/page_cache.py): 로그인 안한 사용자는 페이지 전체, 로그인 사용자는 질문목록 부분을 cache
+# - 정렬: ?order=votes -> 투표 많은 순 (Question.total_votes), 없으면 최신 등록 순
+
+def list_version_names(request):
+    # 목록 페이지 cache의 version. "투표 많은 순"은 투표로 total_votes가 바뀔 때도 무효화.
+    if request.GET.get("order") == "votes":
+        return {"list": "list", "ranking": "list:votes"}
+    return {"list": "list"}
+
+@cache_anonymous_page(list_version_names)
 def list(request):
     paginate_by = 10      # 한 페이지당 데이터 개수.
     page_group_count = 10 # 한 페이지그룹당 페이지 개수
     # http://ip:port/polls/list?page=15
-    current_page = int(request.GET.get('page', 1)) # 현재 조회하려는 페이지번호
 
-    # Question 데이터 조회 + Paginator객체 생성
+    # Question 데이터 조회
     question_list = Question.objects.all().order_by("-pk")
-    pn = Paginator(question_list, paginate_by)
-
-    # 현재 페이지가 속한 페이지그룹의 start/end 페이지 번호 조회
-    start_index = int((current_page - 1) / page_group_count) * page_group_count
-    end_index = start_index + page_group_count
-    page_range = pn.page_range[start_index : end_index]
-
-    # context_value(context_data) -> template에 전달할 값들. dictionary
-    context_value = {
-        "page_range": page_range,  # Page group의 시작/끝페이지 range
-        "question_list": pn.page(current_page),  # 페이지의 데이터들.
-    }
-
-    # 페이지그룹의 시작 페이지가 이전 페이지가 있는지, 이전페이지 번호는 무언지
-    start_page = pn.page(page_range[0])
-    has_previous = start_page.has_previous()
-    if has_previous:
-        previous_page = start_page.previous_page_number()
-        context_value['has_previous'] = has_previous
-        context_value['previous_page'] = previous_page
-    # 페이지그룹의 끝 페이지가 다음 페이지가 있는지, 다음 페이지 번호는 무언지
-    end_page = pn.page(page_range[-1])
-    has_next = end_page.has_next()
-    if has_next:
-        next_page = end_page.next_page_number()
-        context_value['has_next'] = has_next
-        context_value['next_page'] = next_page
+
+    # settings.POLLS_LIST_PAGINATION
+    #  - "cursor": keyset paging (pk < 마지막 조회 pk 로 바로 찾아간다. COUNT(*) 없음)
+    #  - "offset": Paginator 이용 (COUNT(*) + OFFSET)
+    if request.GET.get("order") == "votes":
+        # 투표 많은 순 - (total_votes DESC, id DESC) index 순서로 조회 (정렬 없이 LIMIT/OFFSET)
+        #  투표마다 순서가 바뀌므로 cursor 대신 페이지 번호(offset) paging
+        question_list = Question.objects.order_by("-total_votes", "-pk")
+        context_value = offset_page_context(question_list, request.GET, paginate_by, page_group_count,
+                                            base_query={"order": "votes"})
+    elif getattr(settings, "POLLS_LIST_PAGINATION", "cursor") == "offset":
+        context_value = offset_page_context(question_list, request.GET, paginate_by, page_group_count)
+    else:
+        context_value = keyset_page_context(question_list, request.GET, paginate_by, page_group_count)
+    # context_value
+    #  - page_links: 페이지그룹의 (페이지번호, 페이지 querystring) 목록
+    #  - current_page: 현재 페이지 번호, question_list: 페이지의 데이터들.
+    #  - has_previous/previous_query, has_next/next_query: 이전/다음 페이지그룹 이동 querystring
+    context_value["order"] = request.GET.get("order")
+    context_value.update(page_cache_context(request))
 
     return render(request, "polls/list.html", context_value)
 
@@ -122,12 +145,75 @@ def list(request):
 # view 함수: vote_form
 # template: polls/vote_form.html
 
+def get_question_or_404(question_id, with_votes=False):
+    # 질문 + 보기들(question.choice_list) 조회. 없는 질문이면 404 응답.
+    #  - 질문/보기 내용은 cache에서 조회, 투표수(with_votes=True)만 DB 조회 (polls/metadata.py)
+    #  - cache에 없으면 질문+보기를 한번의 query로 조회.
+    try:
+        return cached_question(question_id, with_votes=with_votes)
+    except (Question.DoesNotExist, ValueError, TypeError):
+        raise Http404("설문이 없습니다.")
+
+def get_result_question_or_404(question_id):
+    # 결과 조회용 - 질문이 없으면 보관된 설문(ArchivedPoll)의 snapshot으로 결과를 만든다. (polls/archive.py)
+    try:
+        return get_question_or_404(question_id, with_votes=True)
+    except Http404:
+        try:
+            return ArchivedPoll.objects.get(pk=question_id).as_question()
+        except (ArchivedPoll.DoesNotExist, ValueError, TypeError):
+            raise Http404("설문이 없습니다.")
+
+@cache_anonymous_page(lambda request, question_id: {"question": f"question:{question_id}"})
 def vote_form(request, question_id):
     # question_id: path parameter로 넘어온 값을 받을 변수
-    question = Question.objects.get(pk=question_id)
+    question = get_question_or_404(question_id)
 
     # 응답 -> html
-    return render(request, "polls/vote_form.html", {"question":question})
+    return render(request, "polls/vote_form.html", {"question":question, **page_cache_context(request)})
+
+def record_vote(question_id, choice_id):
+    # 투표 한건을 처리. settings.POLLS_VOTE_INGEST 에 따라
+    #   - "sync": DB에서 바로 증가
+    #   - "buffered": 투표 로그에 기록하고 바로 반환. (flusher가 DB에 반영)
+    #                 Vote insert가 commit된 후에 기록한다. (rollback된 투표는 기록하지 않음)
+    if vote_buffer.is_buffered():
+        # flusher는 질문의 보기가 아닌 투표를 버린다 -> 로그에 기록하기 전에 확인 (질문/보기 정보 cache)
+        if int(choice_id) not in {choice.pk for choice in cached_question(question_id).choice_list}:
+            return False
+        voted_at = time.time() # 투표 일시 -> 로그에 같이 기록 (시간대별 투표수의 구간)
+        def on_commit():
+            vote_buffer.append_vote(question_id, choice_id, at=voted_at)
+            if getattr(settings, "POLLS_RESULT_READ", "flushed") == "merged":
+                # 미반영 투표수도 결과에 보인다 -> 결과 페이지 cache 무효화
+                bump_vote_pages(question_id, ranking=False)
+        transaction.on_commit(on_commit)
+        return True
+    if not increment_choice_votes(choice_id, question_id):
+        return False
+    # 시간대별 투표수 (같은 transaction - polls/rollups.py)
+    rollups.add_votes(question_id, choice_id)
+    # 실시간 결과 구독자들에게 변경 알림, 결과 페이지 cache 무효화 (commit 후)
+    def on_commit():
+        bump_vote_pages(question_id, ranking=get_vote_shards() <= 1)
+        live.hub.publish(question_id)
+    transaction.on_commit(on_commit)
+    return True
+
+def load_voted_cookie(request):
+    # 투표한 질문 쿠키(voted_question) 조회 (polls/voted_cookie.py)
+    # 예전 방식의 쿠키("1,2,3,10,5")에 있는 질문들은 Vote 테이블로 옮기고 새 방식(bitset)으로 다시 저장.
+    voted, legacy_ids = voted_cookie.load(request)
+    if legacy_ids:
+        existing_ids = [*Question.objects.filter(pk__in=legacy_ids).values_list("pk", flat=True)]  # list: view 함수 이름
+        # 이미 Vote가 있는 질문은 무시(unique (user, question) 충돌 무시)
+        Vote.objects.bulk_create(
+            [Vote(user=request.user, question_id=pk) for pk in existing_ids],
+            ignore_conflicts=True,
+        )
+        for pk in existing_ids:
+            voted.add(pk)
+    return voted
 
 ###################################
 # 투표 처리
@@ -151,58 +237,66 @@ def vote(request):
     choice_id = request.POST.get('choice')
 
     ##############################
-    # 쿠키(Cookie)를 이용해서 이미 투표한 적이 있는 질문이면 투표를 못하게 처리.
-    #   - 쿠키 연습용(실제는 DB를 통해 처리해야 한다.)
-    # 1. 쿠키 voted_question 에 question_id가 있는지 여부를 확인
-    #   - 있으면 error_message와 함께 vote_form으로 이동
-    # 2. 투표 처리 후 쿠키 voted_question에 투표한 question_id를 추가.
-    
-    voted_question_ids = request.COOKIES.get("voted_question") # 쿠키값을 조회
-    if voted_question_ids is not None:
-        # 투표한 질문ID를 쿠키에 "1,2,3,10,5" `,` 를 구분자로 저장.
-        question_ids = voted_question_ids.split(',') # "1,2,3,10,5" => ['1', '2', '3', '10', '5']
-        if question_id in question_ids: # 이미 투표한 질문
-            question = Question.objects.get(pk=question_id)
-            return render(request, "polls/vote_form.html", 
-                          {"question":question, "error_message":"이미 투표한 설문입니다."})
-
+    # 이미 투표한 적이 있는 질문이면 투표를 못하게 처리.
+    #  - Vote 테이블: (user, question) unique -> 사용자당 질문 하나에 한번만 insert 가능.
+    #  - insert가 unique 제약 위반(IntegrityError)이면 이미 투표한 질문.
+    #  - voted_question 쿠키(투표한 질문 bitset)에 있는 질문이면 DB 조회 없이 바로 거절.
+    #    (쿠키에 없으면 Vote 테이블로 확인. 예전 방식의 쿠키는 Vote 테이블로 옮기고 새 방식으로 다시 저장)
+    voted = load_voted_cookie(request)
+
+    error_message = None
+    # 마감된 설문(closed, end_date 경과)은 투표할 수 없다. (질문 정보는 cache에서 조회 - polls/metadata.py)
+    question = get_question_or_404(question_id) if question_id and question_id.isdigit() else None
     # 2. 요청파라미터 검증 -> choice가 선택되었는지 여부
-    if choice_id: # 선택이 된 경우(정상처리)
-        # votes를 1 증가
-        choice = Choice.objects.get(pk=choice_id)
-        choice.votes += 1
-        choice.save()
-        # # 응답페이지이동 -> Question객체
-        # question = Question.objects.get(pk=question_id)
-        # return render(request, "polls/vote_result.html", {"question":question})
-
+    if question is not None and question.pk in voted:
+        error_message = "이미 투표한 설문입니다."
+    elif question is not None and not question.is_open():
+        error_message = "마감된 설문입니다."
+    elif choice_id and choice_id.isdigit() and question_id and question_id.isdigit():
+        # 투표 기록(Vote insert) 과 투표수 증가를 하나의 transaction으로 처리.
+        try:
+            with transaction.atomic():
+                Vote.objects.create(user=request.user, question_id=question_id, choice_id=choice_id)
+                # votes를 1 증가 - DB에서 원자적으로 증가 (UPDATE .. SET votes = votes + 1)
+                # choice = Choice.objects.get(pk=choice_id)
+                # choice.votes += 1  # 조회-증가-저장 사이에 다른 투표가 들어오면 유실된다.
+                # choice.save()
+                if not record_vote(question_id, choice_id):
+                    raise IntegrityError("질문의 보기가 아닙니다.")
+                # 인기 급상승 순위에 반영 (polls/trending.py)
+                transaction.on_commit(lambda: trending.record_vote(question_id))
+        except IntegrityError:
+            if Vote.objects.filter(user=request.user, question_id=question_id).exists():
+                error_message = "이미 투표한 설문입니다."
+                voted.add(question_id)
+            else:
+                error_message = "보기를 선택하세요."
+        else:
+            voted.add(question_id)
+    elif Vote.objects.filter(user=request.user, question_id=question_id).exists():
+        error_message = "이미 투표한 설문입니다."
+        voted.add(question_id)
+    else:
+        error_message = "보기를 선택하세요."
+
+    if error_message is None: # 정상처리
         # vote_result를 요청하도록 응답. - http응답 상태코드: 302, 이동할 url  ==> redirect()
         # response = redirect(f"/polls/vote_result/{question_id}")
         url = reverse("polls:vote_result", args=[question_id])  # app_name이 polls인 urls.py에서 name=vote_result인 설정의 url을 조회
-        print("reverse()가 생성한 url:", type(url), url)
         response = redirect(url)
-        print(type(response))
-        
-        # voted_question 쿠키에 투표한 질문 ID를 셋팅
-        ## 처음 투표일 경우 (voted_questioN_ids == None) 는 "question_id" 반환
-        ## 기존 투표한 값이 있을 경우 "1,2,3,question_id" 형태로 기존것에 추가해서 반환.
-        voted_question_ids = str(question_id) \
-                             if voted_question_ids is None \
-                             else f"{voted_question_ids},{question_id}"
-        print(voted_question_ids)
-        response.set_cookie("voted_question", voted_question_ids
-                            ,max_age=60*60*24*365) # max_age=초 : cookie가 client에서 유지할 시간
-                                                   # max_age=0 - 삭제
-
-        return response
-    
-    else: # 선택 안된 경우(예외상황) -> vote_form.html 이동
-        question = Question.objects.get(pk=question_id)
-        return render(
+    else: # 예외상황 -> vote_form.html 이동
+        if question is None:
+            question = get_question_or_404(question_id)
+        response = render(
             request, 
             "polls/vote_form.html", 
-            {"question": question, "error_message":"보기를 선택하세요."}
+            {"question": question, "error_message":error_message, **page_cache_context(request)}
         )
+
+    if voted.changed:
+        # 투표한 질문 추가, 예전 방식 쿠키 변환 -> 쿠키 다시 저장
+        voted_cookie.save(response, request.user.pk, voted)
+    return response
     
 #################################
 # question_id를 받아서 그 질문의 투표 결과를 응답하는 View
@@ -210,9 +304,149 @@ def vote(request):
 # URL: polls/vote_result/질문_id
 # view: vote_result
 # 응답 template: polls/vote_result.html
+@cache_anonymous_page(lambda request, question_id: {"question": f"question:{question_id}",
+                                                    "results": f"results:{question_id}"})
 def vote_result(request, question_id):
-    question = Question.objects.get(pk=question_id)
-    return render(request, "polls/vote_result.html", {"question":question})
+    # 샤드 카운터 합계를 같이 조회 -> choice.vote_count
+    # 보관된 설문이면 snapshot의 결과
+    question = get_result_question_or_404(question_id)
+    if getattr(settings, "POLLS_RESULT_READ", "flushed") == "merged":
+        # 투표 로그에 있는 아직 DB에 반영되지 않은 투표수를 합산.
+        pending = vote_buffer.pending_votes(question.pk)
+        for choice in question.choice_list:
+            choice.pending_votes = pending.get(choice.pk, 0)
+    return render(request, "polls/vote_result.html", {
+        "question":question, "live_updates": settings.POLLS_ASYNC_VIEWS, **page_cache_context(request)
+    })
+
+#################################
+# 시간대별 투표수 (polls/rollups.py)
+#
+# URL: polls/vote_result/질문_id/timeline?unit=minute|hour|day
+# view: vote_timeline
+# 응답 template: polls/vote_timeline.html
+#  - 투표수는 rollup 테이블만 조회 (투표 기록/Choice를 집계하지 않는다)
+#  - 보기 문장은 질문/보기 정보 cache에서 조회 (polls/metadata.py)
+#
+# URL: polls/api/questions/질문_id/timeline?unit=minute|hour|day
+# view: api_question_timeline
+# 응답: {"unit", "buckets": [구간 시작 일시, ..], "choices": [{"id", "choice_text", "votes": [구간별 투표수]}, ..]}
+
+def timeline_data(question_id, unit):
+    question = get_question_or_404(question_id)
+    starts, series = rollups.timeline(question.pk, unit)
+    choices = [
+        {"id": choice.pk, "choice_text": choice.choice_text,
+         "votes": series.get(choice.pk, [0] * len(starts))}
+        for choice in question.choice_list
+    ]
+    return question, starts, choices
+
+def vote_timeline(request, question_id):
+    unit = request.GET.get("unit", "hour")
+    if unit not in rollups.UNITS:
+        return HttpResponseBadRequest("unit은 minute, hour, day 입니다.")
+    question, starts, choices = timeline_data(question_id, unit)
+    # template에서 구간별로 출력: [(구간 시작 일시, [보기별 투표수]), ..]
+    rows = [(start, [choice["votes"][i] for choice in choices]) for i, start in enumerate(starts)]
+    return render(request, "polls/vote_timeline.html", {
+        "question": question, "unit": unit, "units": rollups.UNITS, "choices": choices, "rows": rows,
+    })
+
+def api_question_timeline(request, question_id):
+    unit = request.GET.get("unit", "hour")
+    if unit not in rollups.UNITS:
+        return JsonResponse({"error": "unit은 minute, hour, day 입니다."}, status=400)
+    _, starts, choices = timeline_data(question_id, unit)
+    return JsonResponse({"unit": unit, "buckets": starts, "choices": choices})
+
+#################################
+# 투표 결과 실시간 전송 (Server-Sent Events)
+#
+# URL: polls/vote_result/질문_id/stream
+# view: vote_result_stream (async view - ASGI 서버에서 실행)
+# 응답: text/event-stream - 투표가 있을 때마다 결과 json을 전송 (polls/live.py)
+#  - WSGI로 실행(settings.POLLS_ASYNC_VIEWS = False)하면 204 No Content
+#    (WSGI는 끝나지 않는 응답 동안 worker 하나를 계속 사용한다. 204를 받은 EventSource는 다시 연결하지 않는다)
+#    결과 페이지도 ASGI로 실행할 때만 EventSource script를 넣는다. (context의 live_updates)
+async def vote_result_stream(request, question_id):
+    if not settings.POLLS_ASYNC_VIEWS:
+        return HttpResponse(status=204)
+    if not await Question.objects.filter(pk=question_id).aexists():
+        raise Http404("설문이 없습니다.")
+    response = StreamingHttpResponse(
+        live.result_events(question_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no" # nginx가 응답을 buffering하지 않도록 설정
+    return response
+
+##########################################
+# 읽기 View들의 async 버전 (ASGI 서버용)
+#  - sync View를 ASGI에서 실행하면 요청마다 thread로 옮겨서 실행(sync_to_async)한다.
+#  - async ORM(aget, async for)으로 조회 -> 요청마다 thread를 사용하지 않는다.
+#  - settings.POLLS_ASYNC_VIEWS = True 이면 urls.py에서 async View를 사용 (config/asgi.py에서 설정)
+#  - template에서 DB 조회가 일어나지 않도록 필요한 데이터는 모두 조회해서 전달.
+#    (request.user 도 미리 조회 - await request.auser())
+
+@cache_anonymous_page(list_version_names)
+async def alist(request):
+    paginate_by = 10      # 한 페이지당 데이터 개수.
+    page_group_count = 10 # 한 페이지그룹당 페이지 개수
+
+    question_list = Question.objects.all().order_by("-pk")
+    base_query = None
+    if request.GET.get("order") == "votes":
+        question_list = Question.objects.order_by("-total_votes", "-pk")
+        base_query = {"order": "votes"}
+    if base_query or getattr(settings, "POLLS_LIST_PAGINATION", "cursor") == "offset":
+        # Paginator는 async 조회를 지원하지 않는다 -> thread에서 실행
+        def offset_context():
+            context_value = offset_page_context(question_list, request.GET, paginate_by, page_group_count,
+                                                base_query=base_query)
+            len(context_value["question_list"]) # 페이지 데이터 조회
+            return context_value
+        context_value = await sync_to_async(offset_context)()
+    else:
+        context_value = await akeyset_page_context(question_list, request.GET, paginate_by, page_group_count)
+
+    context_value["order"] = request.GET.get("order")
+    context_value.update(page_cache_context(request))
+    request.user = await request.auser()
+    return render(request, "polls/list.html", context_value)
+
+async def aget_question_or_404(question_id, with_votes=False):
+    # get_question_or_404()의 async 버전
+    try:
+        return await acached_question(question_id, with_votes=with_votes)
+    except (Question.DoesNotExist, ValueError, TypeError):
+        raise Http404("설문이 없습니다.")
+
+@cache_anonymous_page(lambda request, question_id: {"question": f"question:{question_id}"})
+async def avote_form(request, question_id):
+    question = await aget_question_or_404(question_id)
+    request.user = await request.auser()
+    return render(request, "polls/vote_form.html", {"question":question, **page_cache_context(request)})
+
+@cache_anonymous_page(lambda request, question_id: {"question": f"question:{question_id}",
+                                                    "results": f"results:{question_id}"})
+async def avote_result(request, question_id):
+    try:
+        question = await aget_question_or_404(question_id, with_votes=True)
+    except Http404:
+        # 보관된 설문 -> snapshot의 결과
+        archived = await ArchivedPoll.objects.filter(pk=question_id).afirst()
+        if archived is None:
+            raise
+        question = archived.as_question()
+    if getattr(settings, "POLLS_RESULT_READ", "flushed") == "merged":
+        pending = vote_buffer.pending_votes(question.pk)
+        for choice in question.choice_list:
+            choice.pending_votes = pending.get(choice.pk, 0)
+    request.user = await request.auser()
+    return render(request, "polls/vote_result.html", {
+        "question":question, "live_updates": settings.POLLS_ASYNC_VIEWS, **page_cache_context(request)
+    })
 
 ####################################################
 # 설문 질문 등록
@@ -237,15 +471,212 @@ def vote_create(request):
         # 같은이름으로 여러개 값이 전달된 경우 getlist("요청파라미터이름"): list
         choice_list = request.POST.getlist("choice_text")
 
-        #  DB에 저장
-        q = Question(question_text=question_text)
-        q.save()
-        for choice_text in choice_list:
-            c = Choice(choice_text=choice_text, question=q)
-            c.save()
+        #  DB에 저장 - 하나의 transaction에서 질문 INSERT + 보기들 bulk INSERT (polls/bulk.py)
+        create_poll(question_text, choice_list)
 
         #  응답 - list로 redirect방식으로 이동.
         # return redirect("/polls/list")
         return redirect(reverse("polls:list"))
 
 
+
+
+####################################################
+# 설문 모드 - 여러 질문을 한 페이지에서 투표 (polls/survey.py)
+#
+#  요청 url: polls/survey?ids=1,2,3   (ids가 없으면 최근 등록된 마감되지 않은 질문들)
+#  view 함수: survey_form
+##   -  GET방식요청 : 질문들과 보기들을 한 페이지로 제공 (이미 투표한 질문은 선택 불가)
+##   -  POST방식요청: 모든 답(choice_<질문ID>)을 한번에 투표 -> survey_result로 이동
+#  응답 template: polls/survey_form.html
+#
+#  요청 url: polls/survey/result?ids=1,2,3
+#  view 함수: survey_result
+#  응답 template: polls/survey_result.html
+#  - 질문/보기 조회: 질문 수와 상관없이 두번의 query (Question.objects.many_with_choices)
+
+def survey_questions(question_ids, with_votes=False):
+    if not question_ids:
+        question_ids = [*Question.objects.filter(closed=False).order_by("-pk")
+                                         .values_list("pk", flat=True)[:survey.max_questions()]]
+    return Question.objects.many_with_choices(question_ids, with_votes=with_votes)
+
+@login_required
+def survey_form(request):
+    errors = {}
+    answers = {}
+    if request.method == "POST":
+        question_ids = survey.parse_question_ids(request.POST.get("question_ids"))
+        for question_id in question_ids:
+            choice_id = request.POST.get(f"choice_{question_id}", "")
+            if choice_id.isdigit():
+                answers[question_id] = int(choice_id)
+        voted = load_voted_cookie(request)
+        errors = survey.submit_survey(request.user, answers)
+        if answers and not errors:
+            for question_id in answers:
+                voted.add(question_id)
+            ids = ",".join(str(question_id) for question_id in question_ids)
+            response = redirect(f"{reverse('polls:survey_result')}?ids={ids}")
+            voted_cookie.save(response, request.user.pk, voted)
+            return response
+    else:
+        question_ids = survey.parse_question_ids(request.GET.get("ids"))
+
+    questions = survey_questions(question_ids)
+    voted_ids = survey.voted_question_ids(request.user, [question.pk for question in questions])
+    for question in questions:
+        question.voted = question.pk in voted_ids
+        question.error_message = errors.get(question.pk)
+        question.selected = answers.get(question.pk)
+    return render(request, "polls/survey_form.html", {
+        "questions": questions,
+        "question_ids": ",".join(str(question.pk) for question in questions),
+        "error_message": "보기를 선택하세요." if request.method == "POST" and not answers else None,
+    })
+
+def survey_result(request):
+    questions = survey_questions(survey.parse_question_ids(request.GET.get("ids")), with_votes=True)
+    return render(request, "polls/survey_result.html", {"questions": questions})
+
+
+####################################################
+# 설문 결과 내보내기 (CSV/JSONL 다운로드)
+#
+#  요청 url: polls/export?format=csv|jsonl&since=2025-07-01T00:00:00
+#  view 함수: export_results
+#  응답: StreamingHttpResponse - 전체를 만들어서 응답하지 않고 만드는 대로 한줄씩 전송.
+#  관리자(staff)만 요청 가능 (전체 설문/투표 결과)
+@staff_member_required
+def export_results(request):
+    file_format = request.GET.get("format", "csv")
+    if file_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("format은 csv 또는 jsonl 입니다.")
+    since = request.GET.get("since")
+    try:
+        since = parse_since(since) if since else None
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    content_type = "text/csv" if file_format == "csv" else "application/jsonl"
+    response = StreamingHttpResponse(
+        export_lines(file_format, since), content_type=f"{content_type}; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'attachment; filename="poll_results.{file_format}"'
+    return response
+
+
+####################################################
+# JSON API (읽기 전용)
+#
+#  요청 url: polls/api/questions?cursor=마지막pk&limit=20
+#  view 함수: api_question_list
+#  응답: {"results": [{"id", "question_text", "pub_date"}, ..], "next_cursor": 다음페이지cursor|null}
+#        - keyset paging (pk < cursor)
+#        - ETag(응답 내용의 hash) + Cache-Control: max-age=settings.POLLS_API_LIST_MAX_AGE
+#
+#  요청 url: polls/api/questions/질문id/results
+#  view 함수: api_question_results
+#  응답: {"id", "question_text", "pub_date", "choices": [{"id", "choice_text", "votes"}, ..]}
+#        - ETag/Last-Modified: Question.version/modified_at (투표, 질문/보기 수정시 변경)
+#        - 요청의 If-None-Match/If-Modified-Since가 같으면 질문 조회 한번으로 304 응답.
+
+def api_question_list(request):
+    limit = request.GET.get("limit", "20")
+    cursor = request.GET.get("cursor")
+    if cursor is not None:
+        cursor = parse_cursor(cursor) # pk 범위를 넘는 값 -> None
+    if not limit.isdigit() or (cursor is None and "cursor" in request.GET):
+        return JsonResponse({"error": "cursor, limit은 양의 정수입니다."}, status=400)
+    limit = min(max(int(limit), 1), 100)
+
+    questions = Question.objects.order_by("-pk")
+    if cursor is not None:
+        questions = questions.filter(pk__lt=cursor)
+    # limit + 1 개를 조회 -> 다음 페이지가 있는지 확인
+    rows = questions.values("pk", "question_text", "pub_date")[:limit + 1]
+    has_next = len(rows) > limit # len(): 조회 실행
+    results = [
+        {"id": row["pk"], "question_text": row["question_text"], "pub_date": row["pub_date"]}
+        for row in rows[:limit]
+    ]
+    next_cursor = results[-1]["id"] if has_next else None
+
+    response = JsonResponse({"results": results, "next_cursor": next_cursor})
+    patch_cache_control(response, public=True,
+                        max_age=getattr(settings, "POLLS_API_LIST_MAX_AGE", 30))
+    response["ETag"] = quote_etag(hashlib.md5(response.content).hexdigest())
+    # 같은 ETag로 요청한 경우 304 (본문 전송 생략)
+    return get_conditional_response(request, etag=response["ETag"], response=response)
+
+
+def question_validators(request, question_id):
+    # 질문의 (ETag, Last-Modified) 조회. 질문이 없으면 (None, None)
+    # @condition 이 etag_func, last_modified_func를 각각 호출 -> 요청당 한번만 조회하도록 request에 저장.
+    cache_attr = "_question_validators"
+    if not hasattr(request, cache_attr):
+        questions = Question.objects.filter(pk=question_id)
+        if get_vote_shards() > 1:
+            # 샤드 모드는 투표시 version이 바뀌지 않는다 -> 샤드 count 합계를 ETag에 포함.
+            # (질문 수정은 modified_at만 바뀐다 -> modified_at도 포함. 투표는 modified_at을 바꾸지 않으므로 Last-Modified는 없음)
+            row = questions.annotate(
+                shard_total=Coalesce(Sum("choice__vote_shards__count"), 0)
+            ).values_list("version", "modified_at", "shard_total").first()
+            validators = (None, None) if row is None else \
+                (f"{question_id}-{row[0]}-{row[1].timestamp()}-{row[2]}", None)
+        else:
+            row = questions.values_list("version", "modified_at").first()
+            validators = (None, None) if row is None else \
+                (f"{question_id}-{row[0]}-{row[1].timestamp()}", row[1])
+        setattr(request, cache_attr, validators)
+    return getattr(request, cache_attr)
+
+
+@condition(
+    etag_func=lambda request, question_id: question_validators(request, question_id)[0],
+    last_modified_func=lambda request, question_id: question_validators(request, question_id)[1],
+)
+def api_question_results(request, question_id):
+    question = get_result_question_or_404(question_id)
+    response = JsonResponse(question.results_data())
+    # 캐시는 저장하되 사용할 때마다 서버에 확인(ETag) -> 변경이 없으면 304
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+#  요청 url: polls/api/metadata_cache_stats (관리자만)
+#  view 함수: api_metadata_cache_stats
+#  응답: 이 프로세스의 질문/보기 정보 LRU cache 통계 {"size", "maxsize", "hits", "shared_hits", "misses", "evictions"}
+@staff_member_required
+def api_metadata_cache_stats(request):
+    return JsonResponse(metadata_cache.stats())
+
+
+####################################################
+# 인기 급상승 설문 (polls/trending.py)
+#
+#  요청 url: polls/trending?k=10
+#  view 함수: trending_list
+#  응답 template: polls/trending.html
+#
+#  요청 url: polls/api/trending?k=10
+#  view 함수: api_trending
+#  응답: {"results": [{"id", "question_text", "score"}, ..]} - 점수 내림차순
+#  - 순위는 메모리에서 상위 k개만 읽고(O(k)), 질문 내용은 한번의 query로 조회.
+
+def trending_results(k):
+    k = k if k.isdigit() else "10"
+    entries = trending.top_questions(min(max(int(k), 1), 100))
+    questions = Question.objects.only("question_text").in_bulk([question_id for question_id, _ in entries])
+    return [
+        {"id": question_id, "question_text": questions[question_id].question_text, "score": round(score, 3)}
+        for question_id, score in entries
+        if question_id in questions # 삭제된 질문 제외
+    ]
+
+def trending_list(request):
+    results = trending_results(request.GET.get("k", "10"))
+    return render(request, "polls/trending.html", {"results": results})
+
+def api_trending(request):
+    return JsonResponse({"results": trending_results(request.GET.get("k", "10"))})
@@ -0,0 +1,364 @@
+# polls/vote_buffer.py - 투표 쓰기 지연(write-behind) 버퍼
+#
+# settings.POLLS_VOTE_INGEST = "buffered" 인 경우
+#   - vote View는 DB UPDATE 대신 투표를 로컬 append-only 로그 파일에 한줄 추가하고 바로 응답.
+#   - flusher(백그라운드 thread 또는 python manage.py flush_votes)가
+#     로그를 Choice별 증가량(delta)으로 합쳐서 하나의 transaction으로 DB에 반영.
+#
+# 로그 파일 (settings.POLLS_VOTE_LOG_DIR)
+#   - active-<pid>.log     : 프로세스별로 현재 기록중인 파일. 한줄 = "question_id,choice_id,투표일시(epoch 초)"
+#                            (투표일시 -> 시간대별 투표수(polls/rollups.py)를 반영 일시가 아닌 투표 일시의 구간에.
+#                             예전 형식 "question_id,choice_id" 줄은 반영 일시의 구간)
+#   - segment-<pid>-<ns>.log: 기록이 끝나서 봉인(seal)된 파일. flusher가 DB에 반영한다.
+#   - fsync는 POLLS_VOTE_LOG_FSYNC_EVERY 건 또는 POLLS_VOTE_LOG_FSYNC_INTERVAL 초 마다 묶어서 실행.
+#   - 기록하는 프로세스가 active 파일을 POLLS_VOTE_LOG_ROTATE_BYTES 크기 또는 POLLS_VOTE_LOG_ROTATE_SECONDS 초 마다 봉인.
+#     -> flusher thread가 없어도(POLLS_VOTE_FLUSHER_THREAD = False) flush_votes 명령이 반영할 segment가 생긴다.
+#     (살아있는 다른 프로세스의 active 파일은 flusher가 봉인하지 않는다 - 봉인 후에도 기록이 계속될 수 있으므로)
+#
+# 장애 복구(crash-safe)
+#   - 반영한 segment 이름을 VoteLogSegment 테이블에 delta와 같은 transaction으로 저장.
+#     -> commit 후 파일 삭제 전에 죽어도, 재시작 후 같은 segment를 두번 반영하지 않는다.
+#   - 죽은 프로세스의 active 파일은 다음 flush 때 봉인해서 반영(replay).
+#   - 쓰다가 잘린 마지막 줄은 무시.
+#   - 파일이 삭제된 segment의 기록은 settings.POLLS_VOTE_SEGMENT_RETENTION 이 지나면 삭제.
+#     (다른 flusher가 같은 파일을 읽고 반영하기 전까지는 남겨둔다)
+#
+# 미반영 투표수 (pending_votes - POLLS_RESULT_READ = "merged")
+#   - 파일별로 읽은 위치와 질문/보기별 투표수를 프로세스 안에 저장 -> 새로 추가된 부분만 읽는다.
+#   - 반영(commit)은 되었지만 아직 삭제되지 않은 segment는 제외. (VoteLogSegment)
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import live, rollups
+from .counters import get_vote_shards, increment_choice_votes
+from .page_cache import bump_vote_pages
+from .models import VoteLogSegment
+
+logger = logging.getLogger(__name__)
+
+
+def is_buffered():
+    # 투표를 로그에 기록하는 모드인지 여부.
+    return getattr(settings, "POLLS_VOTE_INGEST", "sync") == "buffered"
+
+
+def get_log_dir():
+    log_dir = Path(getattr(settings, "POLLS_VOTE_LOG_DIR", settings.BASE_DIR / "vote_log"))
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir
+
+
+def _pid_alive(pid):
+    # pid 프로세스가 살아있는지 여부.
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_records(path):
+    # 로그 파일의 (question_id, choice_id, 투표일시(epoch 초) 또는 None) 들을 반환. 잘린 줄/잘못된 줄은 무시.
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    yield from _parse_records(data)
+
+
+def _parse_records(data):
+    for line in data.split(b"\n"):
+        fields = line.split(b",")
+        try:
+            if len(fields) == 3:
+                yield int(fields[0]), int(fields[1]), int(fields[2])
+            elif len(fields) == 2:  # 예전 형식 (투표일시 없음)
+                yield int(fields[0]), int(fields[1]), None
+        except ValueError:
+            continue
+
+
+class VoteLog:
+    # 프로세스당 하나. (get_vote_log() 로 조회)
+
+    def __init__(self, log_dir):
+        self.log_dir = Path(log_dir)
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.file = None
+        self.unsynced = 0           # fsync 안된 기록 수
+        self.last_sync = time.monotonic()
+        self.fsync_every = getattr(settings, "POLLS_VOTE_LOG_FSYNC_EVERY", 64)
+        self.fsync_interval = getattr(settings, "POLLS_VOTE_LOG_FSYNC_INTERVAL", 0.2)
+        self.rotate_bytes = getattr(settings, "POLLS_VOTE_LOG_ROTATE_BYTES", 1024 * 1024)
+        self.rotate_seconds = getattr(settings, "POLLS_VOTE_LOG_ROTATE_SECONDS", 5.0)
+        self.written = 0            # 현재 active 파일에 기록한 bytes
+        self.generation = 0         # active 파일을 새로 열 때마다 증가 (봉인 timer가 다음 파일을 봉인하지 않도록)
+
+    @property
+    def active_path(self):
+        return self.log_dir / f"active-{self.pid}.log"
+
+    def append(self, question_id, choice_id, at=None):
+        # 투표 한건을 로그에 추가. at: 투표 일시(epoch 초, 없으면 현재)
+        line = f"{int(question_id)},{int(choice_id)},{int(at if at is not None else time.time())}\n".encode()
+        with self.lock:
+            if self.file is None:
+                # O_APPEND - 한번의 write는 파일 끝에 통째로 추가된다.
+                self.file = open(self.active_path, "ab", buffering=0)
+                self.written = 0
+                self.generation += 1
+                self._schedule_rotation(self.generation)
+            self.file.write(line)
+            self.written += len(line)
+            self.unsynced += 1
+            if self.written >= self.rotate_bytes:
+                self._seal()
+            elif (self.unsynced >= self.fsync_every
+                    or time.monotonic() - self.last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _schedule_rotation(self, generation):
+        # 파일을 연 후 rotate_seconds 가 지나면 봉인 (더 이상 투표가 없어도 기록이 segment로 넘어간다)
+        if not self.rotate_seconds:
+            return
+        timer = threading.Timer(self.rotate_seconds, self._rotate, args=(generation,))
+        timer.daemon = True
+        timer.start()
+
+    def _rotate(self, generation):
+        with self.lock:
+            if self.generation != generation:
+                return
+            try:
+                self._seal()
+            except OSError:
+                # 다음 기록 때 같은 파일에 이어서 쓴다 -> 다음 봉인(크기, flusher)에 포함
+                logger.exception("투표 로그 봉인 실패")
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def _sync(self):
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def seal(self):
+        # 현재 active 파일을 닫고 segment 파일로 이름을 바꾼다. 다음 기록은 새 active 파일에.
+        with self.lock:
+            self._seal()
+
+    def _seal(self):
+        if self.file is None:
+            return
+        self._sync()
+        self.file.close()
+        self.file = None
+        _seal_file(self.active_path, self.pid)
+
+
+def _seal_file(active_path, pid):
+    segment = active_path.with_name(f"segment-{pid}-{time.time_ns()}.log")
+    os.replace(active_path, segment)
+    _fsync_dir(active_path.parent)
+    return segment
+
+
+def _fsync_dir(path):
+    # rename 결과를 디스크에 반영. (windows는 디렉토리 fsync를 지원하지 않음)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_vote_log = None
+_vote_log_lock = threading.Lock()
+
+
+def get_vote_log():
+    # 현재 프로세스의 VoteLog. fork된 경우(pid 변경) 새로 생성.
+    global _vote_log
+    with _vote_log_lock:
+        if _vote_log is None or _vote_log.pid != os.getpid():
+            _vote_log = VoteLog(get_log_dir())
+            if getattr(settings, "POLLS_VOTE_FLUSHER_THREAD", True):
+                start_flusher()
+    return _vote_log
+
+
+def append_vote(question_id, choice_id, at=None):
+    # vote View에서 호출. DB를 거치지 않고 로그에 기록.
+    get_vote_log().append(question_id, choice_id, at)
+
+
+def _collect_segments(log_dir):
+    # 반영할 segment 파일 목록. 죽은 프로세스의 active 파일도 봉인해서 포함.
+    for active in log_dir.glob("active-*.log"):
+        try:
+            pid = int(active.stem.split("-")[1])
+        except (IndexError, ValueError):
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            try:
+                _seal_file(active, pid)
+            except FileNotFoundError:
+                pass
+    return sorted(log_dir.glob("segment-*.log"))
+
+
+def flush_vote_log():
+    # 봉인된 로그들을 Choice별 delta로 합쳐서 DB에 반영.
+    # 반환: 반영한 투표 수
+    log_dir = get_log_dir()
+    if _vote_log is not None and _vote_log.pid == os.getpid():
+        _vote_log.seal()
+
+    applied = 0
+    for segment in _collect_segments(log_dir):
+        deltas = Counter()   # {(question_id, choice_id): 증가량}
+        minutes = Counter()  # {(question_id, choice_id, 투표 분(epoch 초 // 60) 또는 None): 증가량}
+        for question_id, choice_id, at in _read_records(segment):
+            deltas[question_id, choice_id] += 1
+            minutes[question_id, choice_id, None if at is None else at // 60] += 1
+        try:
+            with transaction.atomic():
+                # 이미 반영된 segment면 IntegrityError -> 건너뛴다.
+                VoteLogSegment.objects.create(name=segment.name)
+                counted = set()
+                for (question_id, choice_id), amount in deltas.items():
+                    # 삭제된 보기에 대한 투표는 increment_choice_votes()가 False 반환 -> 무시
+                    if increment_choice_votes(choice_id, question_id, amount=amount):
+                        counted.add((question_id, choice_id))
+                # 시간대별 투표수 (투표 일시의 구간. 예전 형식의 줄은 반영 일시)
+                for (question_id, choice_id, minute), amount in minutes.items():
+                    if (question_id, choice_id) in counted:
+                        at = None if minute is None else datetime.fromtimestamp(minute * 60, dt_timezone.utc)
+                        rollups.add_votes(question_id, choice_id, amount, at=at)
+        except IntegrityError:
+            pass
+        else:
+            applied += sum(deltas.values())
+            # 실시간 결과 구독자들에게 변경 알림, 결과 페이지 cache 무효화
+            for question_id in {question_id for question_id, _ in deltas}:
+                bump_vote_pages(question_id, ranking=get_vote_shards() <= 1)
+                live.hub.publish(question_id)
+        segment.unlink(missing_ok=True)
+    _prune_segments(log_dir)
+    return applied
+
+
+def _prune_segments(log_dir):
+    # 파일이 삭제된 segment의 반영 기록 삭제. 보관 기간 동안은 남겨둔다.
+    #  (다른 flusher가 삭제 전에 읽은 파일을 다시 반영하려고 하면 막아야 한다)
+    retention = getattr(settings, "POLLS_VOTE_SEGMENT_RETENTION", timedelta(hours=1))
+    VoteLogSegment.objects.filter(applied_at__lt=timezone.now() - retention) \
+                          .exclude(name__in=[path.name for path in log_dir.glob("segment-*.log")]) \
+                          .delete()
+
+
+class PendingIndex:
+    # 로그 파일별 {(question_id, choice_id): 투표수} (프로세스당 하나 - pending_votes 에서 사용)
+    #  - 파일마다 읽은 위치(offset)를 저장 -> 다음 조회때는 추가된 부분만 읽는다.
+    #  - 봉인된 segment는 새 이름 -> 처음부터 다시 읽는다. 없어진 파일은 제거.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}  # {파일 경로: [읽은 위치, Counter]}
+
+    def counts(self, log_dir):
+        # 현재 로그 파일들의 {파일 이름: Counter}
+        paths = [*log_dir.glob("segment-*.log"), *log_dir.glob("active-*.log")]
+        with self.lock:
+            files = {}
+            for path in paths:
+                entry = self.files.get(path) or [0, Counter()]
+                self._read_new(path, entry)
+                files[path] = entry
+            self.files = files
+            return {path.name: counter for path, (_, counter) in files.items()}
+
+    @staticmethod
+    def _read_new(path, entry):
+        # entry[0] 위치부터 마지막 완성된 줄까지 읽어서 entry[1]에 더한다.
+        try:
+            with open(path, "rb") as f:
+                f.seek(entry[0])
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        entry[1].update((question_id, choice_id) for question_id, choice_id, _ in _parse_records(data[:end]))
+        entry[0] += end
+
+
+_pending_index = PendingIndex()
+
+
+def pending_votes(question_id):
+    # 아직 DB에 반영되지 않은 question_id 질문의 투표수를 {choice_id: 증가량} 으로 반환.
+    # (settings.POLLS_RESULT_READ = "merged" 일때 vote_result에서 사용)
+    files = _pending_index.counts(get_log_dir())
+    # 반영(commit)되었지만 아직 삭제되지 않은 segment 제외
+    applied = set(VoteLogSegment.objects.filter(name__in=[name for name in files if name.startswith("segment-")])
+                                        .values_list("name", flat=True))
+    pending = Counter()
+    for name, counter in files.items():
+        if name in applied:
+            continue
+        for (q_id, choice_id), count in counter.items():
+            if q_id == question_id:
+                pending[choice_id] += count
+    return pending
+
+
+########################################
+# 백그라운드 flusher thread
+########################################
+_flusher = None
+
+
+def _flusher_loop(interval):
+    from django.db import close_old_connections
+    while True:
+        time.sleep(interval)
+        try:
+            flush_vote_log()
+        except Exception:
+            # DB 오류등 - 로그는 남아있으므로 다음 주기에 다시 시도.
+            logger.exception("투표 로그 반영 실패")
+        finally:
+            close_old_connections()
+
+
+def start_flusher():
+    # 프로세스당 하나의 flusher thread를 시작. (daemon - 서버 종료시 같이 종료)
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    interval = getattr(settings, "POLLS_VOTE_FLUSH_INTERVAL", 1.0)
+    _flusher = threading.Thread(target=_flusher_loop, args=(interval,),
+                                name="vote-log-flusher", daemon=True)
+    _flusher.start()
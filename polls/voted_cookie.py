@@ -0,0 +1,125 @@
+# polls/voted_cookie.py - 투표한 질문 쿠키 (voted_question)
+#
+# 예전 쿠키: 투표한 질문 ID를 "1,2,3,10,5" 로 계속 이어 붙였다.
+#  -> 투표할수록 커지고(모든 요청 header에 포함), 확인할 때마다 전체를 split 해서 검색.
+# 새 쿠키: 질문 ID bitset (bit i = 질문 ID offset + i)
+#  - 값: "<사용자 ID>.<offset>.<bitmap(base64)>" 를 서명(django.core.signing) -> 변조 불가, 다른 사용자의 쿠키는 무시
+#  - 투표 여부 확인: bitmap에서 bit 하나 확인 (O(1))
+#  - 크기 제한: bitmap이 settings.POLLS_VOTED_COOKIE_MAX_BYTES 보다 커지면 오래된(ID가 작은) 질문부터 뺀다.
+#
+# 쿠키는 DB 조회 없이 "이미 투표한 설문"을 바로 응답하기 위한 것 -> 투표 여부는 Vote 테이블이 기준.
+#  (쿠키에 없는 질문(다른 브라우저에서 투표, 크기 제한으로 빠진 질문)은 Vote 테이블로 확인)
+# 예전 방식의 쿠키는 parse_legacy()로 ID들을 읽어서 새 방식으로 다시 저장한다. (polls.views.load_voted_cookie)
+
+import base64
+import binascii
+import re
+
+from django.conf import settings
+from django.core import signing
+
+COOKIE_NAME = "voted_question"
+COOKIE_MAX_AGE = 60 * 60 * 24 * 365  # 1년
+_SALT = "polls.voted_question"
+_LEGACY_PATTERN = re.compile(r"^[\d,]*$")
+
+
+def _max_bytes():
+    return getattr(settings, "POLLS_VOTED_COOKIE_MAX_BYTES", 512)
+
+
+class VotedQuestions:
+    # 투표한 질문 ID bitset
+
+    def __init__(self, question_ids=(), offset=0, bitmap=b""):
+        self.offset = offset            # bitmap 첫 bit의 질문 ID (8의 배수)
+        self.bitmap = bytearray(bitmap)
+        self.changed = False            # 쿠키를 다시 저장해야 하는지 여부
+        for question_id in question_ids:
+            self.add(question_id)
+
+    def __contains__(self, question_id):
+        index = int(question_id) - self.offset
+        if index < 0 or index >= len(self.bitmap) * 8:
+            return False
+        return bool(self.bitmap[index >> 3] & (1 << (index & 7)))
+
+    def __iter__(self):
+        for byte_index, byte in enumerate(self.bitmap):
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield self.offset + byte_index * 8 + bit
+
+    def add(self, question_id):
+        question_id = int(question_id)
+        if question_id in self:
+            return
+        if not self.bitmap:
+            self.offset = question_id & ~7
+        elif question_id < self.offset:
+            # bitmap 앞쪽으로 확장
+            grow = (self.offset - question_id + 7) >> 3
+            self.bitmap[:0] = bytes(grow)
+            self.offset -= grow * 8
+        index = question_id - self.offset
+        if (index >> 3) >= len(self.bitmap):
+            self.bitmap.extend(bytes((index >> 3) + 1 - len(self.bitmap)))
+        self.bitmap[index >> 3] |= 1 << (index & 7)
+        self.changed = True
+
+    def _trim(self, max_bytes):
+        # 앞/뒤의 빈 byte 제거, 크기 제한을 넘으면 ID가 작은 쪽부터 제거
+        start = 0
+        while start < len(self.bitmap) and not self.bitmap[start]:
+            start += 1
+        end = len(self.bitmap)
+        while end > start and not self.bitmap[end - 1]:
+            end -= 1
+        start = max(start, end - max_bytes)
+        self.offset += start * 8
+        self.bitmap = self.bitmap[start:end]
+
+    def encode(self, user_id, max_bytes=None):
+        # 서명된 쿠키 값
+        self._trim(_max_bytes() if max_bytes is None else max_bytes)
+        data = base64.urlsafe_b64encode(bytes(self.bitmap)).rstrip(b"=").decode()
+        return signing.Signer(salt=_SALT).sign(f"{user_id}.{self.offset}.{data}")
+
+    @classmethod
+    def decode(cls, value, user_id):
+        # 쿠키 값 -> VotedQuestions. 서명이 틀리거나 다른 사용자의 쿠키면 signing.BadSignature
+        payload = signing.Signer(salt=_SALT).unsign(value)
+        try:
+            owner, offset, data = payload.split(".")
+            bitmap = base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+            offset = int(offset)
+        except (ValueError, binascii.Error):
+            raise signing.BadSignature("잘못된 쿠키 형식")
+        if owner != str(user_id):
+            raise signing.BadSignature("다른 사용자의 쿠키")
+        return cls(offset=offset, bitmap=bitmap)
+
+
+def parse_legacy(value):
+    # 예전 방식 쿠키("1,2,3,10,5") -> 질문 ID list. 예전 방식이 아니면 None
+    if not _LEGACY_PATTERN.match(value):
+        return None
+    return [int(v) for v in value.split(",") if v]
+
+
+def load(request):
+    # 요청의 쿠키 -> (VotedQuestions, 예전 방식 쿠키의 질문 ID list 또는 None)
+    value = request.COOKIES.get(COOKIE_NAME)
+    if value is None:
+        return VotedQuestions(), None
+    try:
+        return VotedQuestions.decode(value, request.user.pk), None
+    except signing.BadSignature:
+        voted = VotedQuestions()
+        voted.changed = True  # 예전 방식/잘못된 쿠키 -> 새 방식으로 다시 저장
+        return voted, parse_legacy(value)
+
+
+def save(response, user_id, voted):
+    response.set_cookie(COOKIE_NAME, voted.encode(user_id), max_age=COOKIE_MAX_AGE,
+                        httponly=True, samesite="Lax")